@@ -4,18 +4,216 @@
 # Provides semantic search and analysis for local/remote codebases.
 
 import re
-from typing import List, Dict, Any
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterator, Mapping, Optional, Tuple, Set, Callable
+from knowledge.graph import CompactGraph, module_name
+
+# Blueprint level-of-detail: how far module paths are collapsed before rendering.
+BLUEPRINT_LEVELS = ("package", "directory", "file")
+DEFAULT_BLUEPRINT_TOP_K = 40
+
+def entity_name(source: str, name: str) -> str:
+    """Graph key of a class or function: qualified by its file, so same-named definitions in different files stay distinct."""
+    return f"{source}::{name}"
+
+@dataclass
+class GraphChange:
+    """Notification sent to graph listeners after a mutation is published."""
+    owner: str
+    removed_edges: List[Dict[str, str]]
+    added_edges: List[Dict[str, str]]
+    affected_nodes: Set[str]
+    generation: int = 0 # graph generation right after this change
+
+class GraphSnapshot:
+    """
+    One published graph version. Its maps are never mutated once published;
+    the flat edge list and the CSR view are derived lazily, once per version.
+    """
+    __slots__ = ("generation", "nodes", "edges_by_owner", "_edges", "_compact")
+
+    def __init__(self, generation: int, nodes: Mapping[str, Any], edges_by_owner: Mapping[str, List[Dict[str, str]]]):
+        self.generation = generation
+        self.nodes = nodes
+        self.edges_by_owner = edges_by_owner
+        self._edges: Optional[List[Dict[str, str]]] = None
+        self._compact: Optional[CompactGraph] = None
+
+    @property
+    def edges(self) -> List[Dict[str, str]]:
+        if self._edges is None:
+            self._edges = [e for owned in self.edges_by_owner.values() for e in owned]
+        return self._edges
+
+    def compact(self) -> CompactGraph:
+        if self._compact is None:
+            self._compact = CompactGraph.from_edges(
+                ((e["source"], e["target"], e["relation"]) for e in self.edges),
+                generation=self.generation
+            )
+        return self._compact
 
 class KnowledgeGraph:
+    """
+    Nodes and edges are tagged with the source that owns them, so one file's
+    contributions can be swapped out without touching the rest of the graph.
+
+    Copy-on-write: mutations apply to writer-private maps under a writer lock
+    and are published as a new GraphSnapshot by swapping one reference, so
+    readers iterate a version that cannot change under them. The first write
+    after a publish copies the top-level maps; edge lists are replaced, never
+    appended to. Inside `batch()` many mutations become one version, and
+    listeners are notified once per publish with the changes in order.
+    """
     def __init__(self):
-        self.nodes: Dict[str, Any] = {}
-        self.edges: List[Dict[str, str]] = []
+        # Writer state: only touched under _lock
+        self._nodes: Dict[str, Any] = {}
+        self._edges_by_owner: Dict[str, List[Dict[str, str]]] = {}
+        self._nodes_by_owner: Dict[str, Set[str]] = {} # never published
+        self._generation = 0
+        self._shared = False
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._pending: List[GraphChange] = []
+        self._listeners: List[Callable[[List[GraphChange]], None]] = []
+        self._view = GraphSnapshot(0, MappingProxyType({}), MappingProxyType({}))
+
+    @property
+    def nodes(self) -> Mapping[str, Any]:
+        return self._view.nodes
+
+    @property
+    def edges(self) -> List[Dict[str, str]]:
+        return self._view.edges
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every mutation so derived views (edge list, CSR) know when to rebuild."""
+        return self._view.generation
+
+    def snapshot(self) -> GraphSnapshot:
+        """The current version; hold on to it for reads that must agree with each other."""
+        return self._view
+
+    def subscribe(self, listener: Callable[[List[GraphChange]], None]):
+        self._listeners.append(listener)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Groups mutations into one published version."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._pending:
+                    self._publish()
+
+    def _publish(self):
+        # Caller holds the lock. The maps are handed over; the next write copies them.
+        self._view = GraphSnapshot(self._generation, MappingProxyType(self._nodes), MappingProxyType(self._edges_by_owner))
+        self._shared = True
+        changes, self._pending = self._pending, []
+        for listener in self._listeners:
+            listener(changes)
+
+    def _writable(self):
+        if self._shared:
+            self._nodes = dict(self._nodes)
+            self._edges_by_owner = dict(self._edges_by_owner)
+            self._shared = False
+
+    def _record(self, change: GraphChange) -> GraphChange:
+        self._generation += 1
+        change.generation = self._generation
+        self._pending.append(change)
+        return change
+
+    def add_node(self, name: str, node_type: str, metadata: Dict, owner: Optional[str] = None):
+        owner = owner or metadata.get("source") or name
+        with self.batch():
+            self._writable()
+            self._put_node(name, node_type, metadata, owner)
+            self._record(GraphChange(owner, [], [], {name}))
+
+    def add_edge(self, source: str, target: str, relation: str, owner: Optional[str] = None):
+        edge = {"source": source, "target": target, "relation": relation, "owner": owner or source}
+        with self.batch():
+            self._writable()
+            self._edges_by_owner[edge["owner"]] = self._edges_by_owner.get(edge["owner"], []) + [edge]
+            self._record(GraphChange(edge["owner"], [], [edge], {source, target}))
+
+    def replace_source(self, owner: str, nodes: List[Tuple[str, str, Dict]], edges: List[Tuple[str, str, str]]) -> GraphChange:
+        """
+        Swaps everything `owner` contributed for the given nodes/edges in one step
+        and notifies listeners with the affected node names.
+        """
+        new_edges = [{"source": s, "target": t, "relation": r, "owner": owner} for s, t, r in edges]
+        with self.batch():
+            self._writable()
+            old_edges = self._edges_by_owner.get(owner, [])
+            old_nodes = self._nodes_by_owner.get(owner, set())
+            new_names = {name for name, _, _ in nodes}
+
+            for name in old_nodes - new_names:
+                if self._nodes.get(name, {}).get("owner") == owner:
+                    del self._nodes[name]
+            self._nodes_by_owner.pop(owner, None)
+            for name, node_type, metadata in nodes:
+                self._put_node(name, node_type, metadata, owner)
+            if new_edges:
+                self._edges_by_owner[owner] = new_edges
+            else:
+                self._edges_by_owner.pop(owner, None)
+
+            affected = old_nodes | new_names
+            for e in old_edges + new_edges:
+                affected.add(e["source"])
+                affected.add(e["target"])
+            return self._record(GraphChange(owner, old_edges, new_edges, affected))
+
+    def remove_source(self, owner: str) -> GraphChange:
+        return self.replace_source(owner, [], [])
 
-    def add_node(self, name: str, node_type: str, metadata: Dict):
-        self.nodes[name] = {"type": node_type, "meta": metadata}
+    def owned_edges(self, owner: str) -> List[Dict[str, str]]:
+        """Writer-side view, current even inside an unpublished batch."""
+        with self._lock:
+            return list(self._edges_by_owner.get(owner, []))
 
-    def add_edge(self, source: str, target: str, relation: str):
-        self.edges.append({"source": source, "target": target, "relation": relation})
+    def _put_node(self, name: str, node_type: str, metadata: Dict, owner: str):
+        previous = self._nodes.get(name)
+        if previous and previous.get("owner") != owner:
+            self._nodes_by_owner.get(previous["owner"], set()).discard(name)
+        self._nodes[name] = {"type": node_type, "meta": metadata, "owner": owner}
+        self._nodes_by_owner.setdefault(owner, set()).add(name)
+
+    def compact(self, view: Optional[GraphSnapshot] = None) -> CompactGraph:
+        """CSR view of `view` (default: the current version), built at most once per version."""
+        return (view or self._view).compact()
+
+    def load_compact(self, compact: CompactGraph):
+        """Seeds the graph from the persisted M2 topology (boot without re-ingest); edges are owned by their source."""
+        with self.batch():
+            self._writable()
+            fresh = not self._edges_by_owner
+            loaded = []
+            for source, target, relation in compact.iter_edges():
+                loaded.append({"source": source, "target": target, "relation": relation, "owner": source})
+            by_owner: Dict[str, List[Dict[str, str]]] = {}
+            for edge in loaded:
+                by_owner.setdefault(edge["owner"], []).append(edge)
+            for owner, owned in by_owner.items():
+                self._edges_by_owner[owner] = self._edges_by_owner.get(owner, []) + owned
+            self._record(GraphChange("", [], loaded, set(compact.names)))
+        view = self._view
+        if fresh and view.generation == self._generation:
+            # Nothing else was in memory: the loaded CSR is the published version's view
+            compact.generation = view.generation
+            view._compact = compact
 
     def find_related(self, query: str) -> List[Dict]:
         results = []
@@ -24,22 +222,48 @@ class KnowledgeGraph:
                 results.append({"name": name, "data": data})
         return results
 
+class _DerivedViews:
+    """Read caches for one graph generation. Readers only add entries; a publish replaces the whole object."""
+    def __init__(self, generation: int):
+        self.generation = generation
+        # Blueprint edge weights per (level, expand), patched from graph change notifications
+        self.blueprint_weights: Dict[Tuple, Dict[Tuple[str, str], int]] = {}
+        self.blueprint_renders: Dict[Tuple, str] = {}
+        # Transitive dependents per node and every name the search visited,
+        # evicted when a change touches any of those names
+        self.blast_radius: Dict[str, Tuple[frozenset, frozenset]] = {}
+        self.reverse: Optional[CompactGraph] = None
+
 class RepoAnalyst:
     def __init__(self):
         self.graph = KnowledgeGraph()
         self.trace_log: List[str] = []
+        self._derived = _DerivedViews(self.graph.generation)
+        self.graph.subscribe(self._on_graph_change)
+
+    def _views_for(self, view: GraphSnapshot) -> _DerivedViews:
+        # A reader holding an older (or not yet patched) version gets private, uncached views
+        derived = self._derived
+        return derived if derived.generation == view.generation else _DerivedViews(view.generation)
+
+    def load_topology(self, compact: CompactGraph):
+        if compact.num_edges:
+            self.graph.load_compact(compact)
+            self.log_step(f"Restored {compact.num_edges} persisted edges across {compact.num_nodes} nodes")
 
     def log_step(self, msg: str):
         self.trace_log.append(msg)
 
-    def analyze_chunk(self, content: str, source: str):
+    def analyze_chunk(self, content: str, source: str) -> GraphChange:
         """
-        Extracts entities and adds to graph with heuristics.
+        Extracts entities and replaces this source's contribution to the graph.
         """
         lines = content.split('\n')
         imports = []
         functions = []
         classes = []
+        nodes: List[Tuple[str, str, Dict]] = []
+        edges: List[Tuple[str, str, str]] = []
         
         for line in lines:
             line = line.strip()
@@ -55,14 +279,14 @@ class RepoAnalyst:
                     target_module = parts[1].split('.')[0]
                 
                 if target_module and target_module not in ["os", "sys", "json", "typing", "requests"]:
-                    self.graph.add_edge(source, target_module, "depends_on")
+                    edges.append((source, target_module, "depends_on"))
 
             # Classes
             elif line.startswith('class '):
                 try:
                     name = line.split('class ')[1].split('(')[0].split(':')[0].strip()
                     classes.append(name)
-                    self.graph.add_node(name, "class", {"source": source, "complexity": 1})
+                    nodes.append((entity_name(source, name), "class", {"source": source, "complexity": 1}))
                 except:
                     pass
             # Functions
@@ -70,7 +294,7 @@ class RepoAnalyst:
                 try:
                     name = line.split('def ')[1].split('(')[0].strip()
                     functions.append(name)
-                    self.graph.add_node(name, "function", {"source": source, "complexity": 1})
+                    nodes.append((entity_name(source, name), "function", {"source": source, "complexity": 1}))
                 except:
                     pass
 
@@ -82,13 +306,92 @@ class RepoAnalyst:
         elif len(classes) > 2:
             role = "god_object_candidate"
         
-        self.graph.add_node(source, "file", {
+        nodes.append((source, "file", {
             "role": role, 
             "imports": len(imports),
             "complexity": file_complexity
-        })
-        
+        }))
+
+        change = self.graph.replace_source(source, nodes, edges)
         self.log_step(f"Analyzed {source}: Found {len(classes)} classes, {len(functions)} functions. Role: {role}")
+        return change
+
+    def get_blast_radius(self, node: str, view: Optional[GraphSnapshot] = None) -> frozenset:
+        """
+        Every file that transitively depends on `node` in `view` (default: the
+        current version), cached per version. Import edges run from a file path
+        to a module name, so each dependent file is continued from as the module
+        it defines: pkg/a.py -> pkg.b and pkg/b.py -> pkg.c put both files in
+        the radius of pkg.c.
+        """
+        view = view or self.graph.snapshot()
+        derived = self._views_for(view)
+        cached = derived.blast_radius.get(node)
+        if cached is not None:
+            return cached[0]
+        if derived.reverse is None:
+            derived.reverse = view.compact().reverse()
+        reverse = derived.reverse
+        # Every name looked up, so a later edge into any of them evicts the entry
+        touched = {node, module_name(node)}
+        reached = set()
+        visited = bytearray(reverse.num_nodes)
+        stack = []
+        for name in touched:
+            idx = reverse.node_id(name)
+            if idx is not None and not visited[idx]:
+                visited[idx] = 1
+                stack.append(idx)
+        while stack:
+            for dep in reverse.neighbors(stack.pop()):
+                if visited[dep]:
+                    continue
+                visited[dep] = 1
+                dependent = reverse.names[dep]
+                reached.add(dependent)
+                stack.append(dep)
+                module = module_name(dependent)
+                touched.add(module)
+                idx = reverse.node_id(module)
+                if idx is not None and not visited[idx]:
+                    visited[idx] = 1
+                    stack.append(idx)
+        radius = frozenset(reached - {node})
+        derived.blast_radius[node] = (radius, frozenset(touched | reached))
+        return radius
+
+    def _on_graph_change(self, changes: List[GraphChange]):
+        # Runs on the writer after a publish. Builds the next generation's caches
+        # from the previous ones instead of editing dicts readers may be using.
+        old = self._derived
+        new = _DerivedViews(changes[-1].generation)
+        if old.generation != changes[0].generation - 1:
+            self._derived = new # Missed a version: start cold
+            return
+
+        affected: Set[str] = set()
+        for change in changes:
+            affected |= change.affected_nodes
+        # Blast radius: drop entries rooted at, or passing through, an affected node
+        new.blast_radius = {node: entry for node, entry in dict(old.blast_radius).items()
+                            if entry[1].isdisjoint(affected)}
+
+        # Blueprint: patch cached cluster weights with the edge delta, re-render lazily
+        for (level, expand), cached in dict(old.blueprint_weights).items():
+            weights = dict(cached)
+            for change in changes:
+                for edges, sign in ((change.removed_edges, -1), (change.added_edges, 1)):
+                    for edge in edges:
+                        pair = self._cluster_pair(edge["source"], edge["target"], level, expand)
+                        if pair is None:
+                            continue
+                        weight = weights.get(pair, 0) + sign
+                        if weight > 0:
+                            weights[pair] = weight
+                        else:
+                            weights.pop(pair, None)
+            new.blueprint_weights[(level, expand)] = weights
+        self._derived = new
 
     def get_insights(self, query: str) -> str:
         hits = self.graph.find_related(query)
@@ -112,16 +415,98 @@ class RepoAnalyst:
                 smells.append(f"God Object Risk: {name} handles too many classes.")
         return smells if smells else ["Codebase appears clean based on current heuristics."]
 
-    def get_blueprint(self) -> str:
+    def get_blueprint(self, level: str = "package", expand: Optional[str] = None,
+                      top_k: int = DEFAULT_BLUEPRINT_TOP_K) -> str:
         """
         Generates a Mermaid-compatible dependency graph.
+        Edges are collapsed to `level` ('package', 'directory' or 'file') and weighted
+        by how many file-level edges they represent. `expand` re-opens a single cluster
+        at file level; only the `top_k` heaviest edges are rendered, edges between
+        corpus clusters ahead of edges into external (stdlib, third-party) modules.
         """
-        if not self.graph.edges:
+        view = self.graph.snapshot()
+        if not view.edges:
             return "Insufficient structural data for blueprint."
-        
-        mermaid = "graph TD\n"
-        for edge in self.graph.edges:
-            s = edge['source'].replace('/', '_').replace('.', '_')
-            t = edge['target'].replace('/', '_').replace('.', '_')
-            mermaid += f"  {s} --> {t}\n"
-        return f"```mermaid\n{mermaid}\n```"
+        if level not in BLUEPRINT_LEVELS:
+            level = "package"
+        top_k = max(1, top_k)
+
+        derived = self._views_for(view)
+        key = (level, expand, top_k)
+        if key in derived.blueprint_renders:
+            return derived.blueprint_renders[key]
+
+        weights = self._aggregate_edges(level, expand, view)
+        # A cluster is part of the corpus when it holds at least one ingested file
+        internal = {self._cluster_of(module_name(name), level, expand)
+                    for name, node in view.nodes.items() if node["type"] == "file"}
+        ranked = sorted(weights.items(), key=lambda kv: ((kv[0][0] not in internal) + (kv[0][1] not in internal),
+                                                         -kv[1], kv[0]))
+        shown = ranked[:top_k]
+
+        lines = ["graph TD"]
+        labelled = set()
+        for (s, t), w in shown:
+            for name in (s, t):
+                if name not in labelled:
+                    labelled.add(name)
+                    lines.append(f'  {self._mermaid_id(name)}["{name}"]')
+        for (s, t), w in shown:
+            arrow = f"-->|{w}|" if w > 1 else "-->"
+            lines.append(f"  {self._mermaid_id(s)} {arrow} {self._mermaid_id(t)}")
+        if len(ranked) > len(shown):
+            lines.append(f"  %% {len(ranked) - len(shown)} lighter edges omitted (top_k={top_k})")
+
+        mermaid = "\n".join(lines)
+        rendered = f"```mermaid\n{mermaid}\n```"
+        derived.blueprint_renders[key] = rendered
+        return rendered
+
+    def get_blueprint_clusters(self, level: str = "package") -> Dict[str, int]:
+        """Lists the clusters at `level` with their total edge weight (candidates for `expand`)."""
+        totals: Dict[str, int] = {}
+        for (s, t), w in self._aggregate_edges(level, None, self.graph.snapshot()).items():
+            totals[s] = totals.get(s, 0) + w
+            totals[t] = totals.get(t, 0) + w
+        return totals
+
+    def _aggregate_edges(self, level: str, expand: Optional[str], view: GraphSnapshot) -> Dict[Tuple[str, str], int]:
+        derived = self._views_for(view)
+        key = (level, expand)
+        if key in derived.blueprint_weights:
+            return derived.blueprint_weights[key]
+
+        # Cluster each interned node once, then count edges between cluster ids
+        compact = view.compact()
+        clusters = [self._cluster_of(module_name(name), level, expand) for name in compact.names]
+        weights: Dict[Tuple[str, str], int] = {}
+        for s_id in range(compact.num_nodes):
+            s = clusters[s_id]
+            for t_id in compact.neighbors(s_id):
+                t = clusters[t_id]
+                if s == t:
+                    continue # Internal edge of a collapsed cluster
+                weights[(s, t)] = weights.get((s, t), 0) + 1
+
+        derived.blueprint_weights[key] = weights
+        return weights
+
+    def _cluster_pair(self, source: str, target: str, level: str, expand: Optional[str]) -> Optional[Tuple[str, str]]:
+        s = self._cluster_of(module_name(source), level, expand)
+        t = self._cluster_of(module_name(target), level, expand)
+        return (s, t) if s != t else None
+
+    @staticmethod
+    def _cluster_of(module: str, level: str, expand: Optional[str]) -> str:
+        parts = module.split(".")
+        if expand and (module == expand or module.startswith(expand + ".")):
+            return module
+        if level == "file" or len(parts) == 1:
+            return module
+        if level == "directory":
+            return ".".join(parts[:-1])
+        return parts[0]
+
+    @staticmethod
+    def _mermaid_id(name: str) -> str:
+        return "n_" + re.sub(r"\W", "_", name)
@@ -1,20 +1,128 @@
 
-from typing import List, Dict
-from cognition.models import AnalysisResult
+import builtins
+import fnmatch
+import hashlib
+import io
+import keyword
+import threading
+import tokenize
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterator, List, Dict, Mapping, Tuple, Optional
+from cognition.models import AnalysisResult, ClassInfo, FunctionInfo
+from cognition.baseline import CorpusBaseline
+from knowledge.graph import module_name
+from knowledge.paths import PathIndex
+
+_BUILTINS = frozenset(dir(builtins))
+
+ANALYSIS_TIERS = ("ast", "lexical")
+# Generated modules that are only worth a token scan
+DEFAULT_LEXICAL_PATTERNS = ("*_pb2.py", "*_pb2_grpc.py", "*/migrations/*.py", "migrations/*.py")
+DEFAULT_LEXICAL_SIZE = 256 * 1024 # bytes
+# Statement keywords that count as a branch, matching the AST tier (If/For/While/ExceptHandler)
+_BRANCH_KEYWORDS = frozenset(("if", "elif", "for", "while", "except"))
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """One published corpus version. Never mutated after it is published."""
+    version: int
+    files: Mapping[str, AnalysisResult]
+    stats: Dict[str, float]
+    paths: PathIndex
 
 class CodeAnalyzer:
     """
     LAYER 1: ANALYSIS
     Pure data extraction. No opinions.
+
+    The corpus is copy-on-write. Writers (store/remove) work on private state
+    under a writer lock; readers get an immutable CorpusSnapshot and keep it for
+    as long as they hold it, so a reader never sees a half-applied ingest. The
+    first write after a publish copies the file map (and the path index, if a
+    path is added or removed); publishing swaps one reference. Inside `batch()`
+    a whole ingest becomes a single new version.
     """
-    def __init__(self):
-        self.raw_data: Dict[str, AnalysisResult] = {}
+    def __init__(self, lexical_size: int = DEFAULT_LEXICAL_SIZE,
+                 lexical_patterns: Tuple[str, ...] = DEFAULT_LEXICAL_PATTERNS):
+        # Tier routing: files above lexical_size bytes or matching a pattern get the token scan
+        self.lexical_size = lexical_size
+        self.lexical_patterns = lexical_patterns
+        # Writer state: only touched under _write_lock
+        self._files: Dict[str, AnalysisResult] = {}
+        # Running corpus statistics, kept in step with the files
+        self.baseline = CorpusBaseline()
+        # Target resolution for user-typed paths, kept in step with the files
+        self._paths = PathIndex()
+        self._files_shared = self._paths_shared = False
+        self._write_lock = threading.RLock()
+        self._batch_depth = 0
+        self._corpus = CorpusSnapshot(0, MappingProxyType({}), self.baseline.stats(), PathIndex())
+
+    @property
+    def raw_data(self) -> Mapping[str, AnalysisResult]:
+        """Files of the current snapshot (read-only)."""
+        return self._corpus.files
+
+    @property
+    def paths(self) -> PathIndex:
+        return self._corpus.paths
+
+    def snapshot(self) -> CorpusSnapshot:
+        """The current corpus version; hold on to it for reads that must agree with each other."""
+        return self._corpus
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Groups writes into one published version (readers see all of them or none)."""
+        with self._write_lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._publish()
+
+    def _publish(self):
+        # Caller holds the write lock. The published objects are handed over, not copied;
+        # the next write copies them first.
+        self._corpus = CorpusSnapshot(self._corpus.version + 1, MappingProxyType(self._files),
+                                      self.baseline.stats(), self._paths)
+        self._files_shared = self._paths_shared = True
+
+    def choose_tier(self, source: str, content: str) -> str:
+        path = source.replace("\\", "/")
+        if any(fnmatch.fnmatch(path, pattern) for pattern in self.lexical_patterns):
+            return "lexical"
+        # lexical_size is in bytes; a character encodes to 1-4 of them, so only
+        # the ambiguous middle band needs the actual UTF-8 length
+        if len(content) > self.lexical_size:
+            return "lexical"
+        if len(content) * 4 > self.lexical_size and len(content.encode("utf-8", "replace")) > self.lexical_size:
+            return "lexical"
+        return "ast"
 
-    def analyze(self, content: str, source: str) -> AnalysisResult:
+    def analyze(self, content: str, source: str, tier: Optional[str] = None) -> AnalysisResult:
+        """Layer 1 for one file. `tier` forces 'ast' or 'lexical'; by default it is chosen by size and path."""
         import ast
         
         lines = content.split('\n')
-        result = AnalysisResult(source=source, loc=len(lines), raw_content=content)
+        result = AnalysisResult(source=source, loc=len(lines), raw_content=content,
+                                content_hash=hashlib.sha1(content.encode("utf-8", "replace")).hexdigest())
+        tier = tier or self.choose_tier(source, content)
+        if tier not in ANALYSIS_TIERS:
+            raise ValueError(f"Unknown analysis tier '{tier}'. Options: {', '.join(ANALYSIS_TIERS)}")
+        if tier == "lexical":
+            result.tier = "lexical"
+            try:
+                self._scan_lexical(content, result)
+            except (tokenize.TokenError, IndentationError):
+                print(f"Tokenize error scanning {source}")
+                return result
+            self.store(result)
+            return result
         
         try:
             tree = ast.parse(content)
@@ -56,9 +164,293 @@ class CodeAnalyzer:
                     for alias in node.names:
                         result.imports.append(f"from {module} import {alias.name}")
 
-        self.raw_data[source] = result
+        result.calls = self._extract_calls(tree, source)
+
+        self.store(result)
         return result
 
+    def store(self, result: AnalysisResult):
+        """Adds or replaces a result, keeping the corpus baseline in step."""
+        with self.batch():
+            self._writable_files()[result.source] = result
+            self.baseline.replace(result)
+            if result.source not in self._paths:
+                self._writable_paths().add(result.source)
+
+    def remove(self, source: str):
+        with self.batch():
+            if source in self._files:
+                del self._writable_files()[source]
+                self.baseline.remove(source)
+                self._writable_paths().remove(source)
+
+    def _writable_files(self) -> Dict[str, AnalysisResult]:
+        if self._files_shared:
+            self._files = dict(self._files)
+            self._files_shared = False
+        return self._files
+
+    def _writable_paths(self) -> PathIndex:
+        if self._paths_shared:
+            self._paths = self._paths.copy()
+            self._paths_shared = False
+        return self._paths
+
+    def _scan_lexical(self, content: str, result: AnalysisResult):
+        """
+        Fast tier: one pass over `tokenize` output, no AST. Captures imports,
+        top-level functions, classes with their methods, decorators and a branch
+        count from statement-initial if/elif/for/while/except keywords. Calls are
+        not resolved, so lexical files contribute nothing to the call graph.
+        """
+        depth = 0
+        line_start = True
+        statement: List[tokenize.TokenInfo] = []
+        function: Optional[Tuple[FunctionInfo, int]] = None # innermost tracked def and its header depth
+        cls: Optional[Tuple[ClassInfo, int]] = None
+        awaiting_docstring = None
+        decorators: List[str] = []
+
+        def close_scopes(at_depth: int):
+            nonlocal function, cls
+            if function and at_depth <= function[1]:
+                function = None
+            if cls and at_depth <= cls[1]:
+                cls = None
+
+        def finish(tokens: List[tokenize.TokenInfo], at_depth: int):
+            # Handles one complete logical line
+            nonlocal function, cls, awaiting_docstring
+            names = [t.string for t in tokens]
+            is_async = names[0] == "async" and len(names) > 1
+            if is_async:
+                names = names[1:]
+            head = names[0]
+
+            if head in ("import", "from"):
+                imports = self._lexical_imports(names)
+                result.imports.extend(imports)
+                if at_depth == 0:
+                    # The AST tier lists module-level imports from both of its passes
+                    result.imports.extend(imports)
+            elif head == "@":
+                # Called decorators are named after the callable, as in _get_decorator_name
+                decorators.append("".join(names[1:names.index("(")] if "(" in names else names[1:]))
+                return
+            elif head == "def" and len(names) > 1:
+                info = FunctionInfo(name=names[1], args=self._lexical_args(names), docstring=False,
+                                    is_async=is_async,
+                                    decorators=list(decorators), complexity=1)
+                if at_depth == 0:
+                    result.functions.append(info)
+                    function = (info, at_depth)
+                elif cls and at_depth == cls[1] + 1 and function is None:
+                    cls[0].methods.append(info)
+                    function = (info, at_depth)
+                awaiting_docstring = info if function and function[0] is info else None
+            elif head == "class" and len(names) > 1 and at_depth == 0:
+                info = ClassInfo(name=names[1], bases=self._lexical_bases(names), methods=[],
+                                 docstring=False, decorators=list(decorators))
+                result.classes.append(info)
+                cls = (info, at_depth)
+                awaiting_docstring = info
+            elif head in _BRANCH_KEYWORDS and function and not is_async:
+                # 'async for' is an ast.AsyncFor, which the AST tier does not count
+                function[0].complexity += 1
+                # One-line compound statements ('if x: return') carry no nested branch keywords
+            decorators.clear()
+
+        for tok in tokenize.generate_tokens(io.StringIO(content).readline):
+            if tok.type == tokenize.INDENT:
+                depth += 1
+                continue
+            if tok.type == tokenize.DEDENT:
+                depth -= 1
+                continue
+            if tok.type in (tokenize.NL, tokenize.COMMENT, tokenize.ENCODING):
+                continue
+            if tok.type == tokenize.NEWLINE or tok.type == tokenize.ENDMARKER:
+                if statement:
+                    finish(statement, statement_depth)
+                statement, line_start = [], True
+                continue
+            if line_start:
+                line_start = False
+                statement_depth = depth
+                close_scopes(depth)
+                if awaiting_docstring is not None:
+                    awaiting_docstring.docstring = tok.type == tokenize.STRING
+                    awaiting_docstring = None
+            statement.append(tok)
+
+    @staticmethod
+    def _lexical_imports(names: List[str]) -> List[str]:
+        if names[0] == "import":
+            modules, current, skip = [], "", False
+            for name in names[1:]:
+                if name == ",":
+                    if current: modules.append(current)
+                    current, skip = "", False
+                elif name == "as":
+                    skip = True
+                elif not skip:
+                    current += name
+            if current: modules.append(current)
+            return [f"import {m}" for m in modules]
+
+        split = names.index("import") if "import" in names else len(names)
+        module = "".join(names[1:split]).lstrip(".")
+        imported, skip = [], False
+        for name in names[split + 1:]:
+            if name in ("(", ")"):
+                continue
+            if name == ",":
+                skip = False
+            elif name == "as":
+                skip = True
+            elif not skip:
+                imported.append(name)
+        return [f"from {module} import {n}" for n in imported]
+
+    @staticmethod
+    def _lexical_args(names: List[str]) -> List[str]:
+        # Positional parameter names: identifiers right after '(' or ',' at paren depth 1
+        args, level, previous = [], 0, ""
+        for name in names[2:]:
+            if name in ("(", "[", "{"):
+                level += 1
+            elif name in (")", "]", "}"):
+                level -= 1
+                if level == 0:
+                    break
+            elif level == 1 and previous in ("(", ","):
+                if name in ("*", "**"):
+                    break # keyword-only and variadic parameters are not in ast.arguments.args
+                if name == "/":
+                    args = [] # nor are positional-only ones
+                elif name.isidentifier() and not keyword.iskeyword(name):
+                    args.append(name)
+            previous = name
+        return args
+
+    @staticmethod
+    def _lexical_bases(names: List[str]) -> List[str]:
+        if len(names) < 3 or names[2] != "(":
+            return []
+        bases, current = [], ""
+        for name in names[3:]:
+            if name in (",", ")"):
+                if current: bases.append(current)
+                current = ""
+                if name == ")":
+                    break
+            elif name == "=":
+                current = "\0" # keyword argument such as metaclass=...
+            elif not current.startswith("\0"):
+                current += name
+        return [b for b in bases if not b.startswith("\0")]
+
+    def _extract_calls(self, tree, source: str) -> List[Tuple[str, str]]:
+        """
+        Records (caller, callee) call sites with qualified names such as
+        'core.engine.PrimersEngine.process'. Callees are resolved through the
+        module's imports, its own top-level definitions and `self.` methods;
+        unresolvable dotted calls are kept verbatim, builtins are dropped.
+        """
+        import ast
+
+        module = module_name(source)
+        is_package = source.replace("\\", "/").rsplit("/", 1)[-1] == "__init__.py"
+        aliases = self._import_aliases(tree, module, is_package)
+        local_defs = {n.name for n in tree.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))}
+        calls: Dict[Tuple[str, str], None] = {}
+        # Class -> {attribute: qualified type} from `self.x = SomeClass(...)` assignments
+        attr_types: Dict[str, Dict[str, str]] = {}
+
+        def resolve(func, class_name: Optional[str]) -> Optional[str]:
+            parts = []
+            while isinstance(func, ast.Attribute):
+                parts.append(func.attr)
+                func = func.value
+            if not isinstance(func, ast.Name):
+                return None # Call on a computed value; nothing to anchor it to
+            parts.reverse()
+            root, rest = func.id, ".".join(parts)
+            if root == "self" and class_name and rest:
+                typed = attr_types.get(class_name, {}).get(parts[0])
+                if len(parts) == 1:
+                    base, rest = f"{module}.{class_name}", parts[0]
+                elif typed:
+                    base, rest = typed, ".".join(parts[1:])
+                else:
+                    base = root
+            elif root in aliases:
+                base = aliases[root]
+            elif root in local_defs:
+                base = f"{module}.{root}"
+            elif not rest and root in _BUILTINS:
+                return None
+            else:
+                base = root
+            return f"{base}.{rest}" if rest else base
+
+        def visit(node, scope: str, class_name: Optional[str]):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, ast.ClassDef):
+                    visit(child, f"{scope}.{child.name}", child.name)
+                elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    visit(child, f"{scope}.{child.name}", class_name)
+                else:
+                    if isinstance(child, ast.Call):
+                        callee = resolve(child.func, class_name)
+                        if callee:
+                            calls[(scope, callee)] = None
+                    visit(child, scope, class_name)
+
+        for cls in ast.walk(tree):
+            if isinstance(cls, ast.ClassDef):
+                types = attr_types.setdefault(cls.name, {})
+                for node in ast.walk(cls):
+                    if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+                        for target in node.targets:
+                            if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                                    and target.value.id == "self"):
+                                resolved = resolve(node.value.func, None)
+                                if resolved and not resolved.startswith("self."):
+                                    types[target.attr] = resolved
+
+        visit(tree, module, None)
+        return list(calls)
+
+    def _import_aliases(self, tree, module: str, is_package: bool = False) -> Dict[str, str]:
+        """
+        Local name -> fully qualified name for every import in the module.
+        In a package's `__init__`, `module` is the package itself, so a single
+        leading dot refers to it rather than to its parent.
+        """
+        import ast
+
+        aliases: Dict[str, str] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        aliases[alias.asname] = alias.name
+                    else:
+                        root = alias.name.split(".")[0]
+                        aliases[root] = root
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    parts = module.split(".") if module else []
+                    strip = node.level - 1 if is_package else node.level
+                    package = parts[:len(parts) - strip]
+                    base = ".".join(package + ([base] if base else []))
+                for alias in node.names:
+                    if alias.name != "*":
+                        aliases[alias.asname or alias.name] = f"{base}.{alias.name}" if base else alias.name
+        return aliases
+
     def _extract_function(self, node) -> 'FunctionInfo':
         import ast
         from cognition.models import FunctionInfo
@@ -121,21 +513,9 @@ class CodeAnalyzer:
         return "decorator"
 
     def get_corpus_stats(self) -> Dict[str, float]:
-        """Calculates baseline averages for the current corpus."""
-        if not self.raw_data:
-            return {"avg_complexity": 0, "avg_imports": 0}
-        
-        total_complexity = 0
-        total_imports = 0
-        count = len(self.raw_data)
-
-        for res in self.raw_data.values():
-            # Rough complexity metric for baseline calculation
-            comp = len(res.classes) + len(res.functions) + len(res.imports)
-            total_complexity += comp
-            total_imports += len(res.imports)
-        
-        return {
-            "avg_complexity": total_complexity / count,
-            "avg_imports": total_imports / count
-        }
+        """
+        Baseline statistics for the current corpus: averages plus standard
+        deviations and p50/p75/p90/p99 for complexity, imports and LOC.
+        Maintained incrementally and captured in each snapshot, so reading it is O(1).
+        """
+        return self._corpus.stats
@@ -0,0 +1,167 @@
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from cognition.models import AnalysisResult
+
+BASELINE_METRICS = ("complexity", "imports", "loc")
+BASELINE_QUANTILES = (0.5, 0.75, 0.9, 0.99)
+
+class TDigest:
+    """
+    Merging t-digest (Dunning). Streams values into a bounded set of weighted
+    centroids that stay small near the tails, so extreme quantiles stay accurate.
+    """
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.count = 0.0
+        self._buffer: List[float] = []
+
+    def add(self, value: float):
+        self._buffer.append(float(value))
+        self.count += 1
+        if len(self._buffer) >= 5 * self.compression:
+            self._merge()
+
+    def quantile(self, q: float) -> float:
+        self._merge()
+        if not self.means:
+            return 0.0
+        if len(self.means) == 1:
+            return self.means[0]
+        # Interpolate between centroid centers placed at their cumulative midpoints
+        target = q * self.count
+        cumulative, centers = 0.0, []
+        for w in self.weights:
+            centers.append(cumulative + w / 2)
+            cumulative += w
+        if target <= centers[0]:
+            return self.means[0]
+        if target >= centers[-1]:
+            return self.means[-1]
+        i = bisect_left(centers, target)
+        lo, hi = centers[i - 1], centers[i]
+        frac = (target - lo) / (hi - lo) if hi > lo else 0.0
+        return self.means[i - 1] + frac * (self.means[i] - self.means[i - 1])
+
+    def _merge(self):
+        if not self._buffer:
+            return
+        points = sorted(list(zip(self.means, self.weights)) + [(v, 1.0) for v in self._buffer])
+        self._buffer = []
+        total = sum(w for _, w in points)
+
+        means, weights = [points[0][0]], [points[0][1]]
+        cumulative = 0.0
+        for mean, weight in points[1:]:
+            q = (cumulative + weights[-1] + weight / 2) / total
+            limit = 4 * total * q * (1 - q) / self.compression
+            if weights[-1] + weight <= max(1.0, limit):
+                merged = weights[-1] + weight
+                means[-1] += (mean - means[-1]) * weight / merged
+                weights[-1] = merged
+            else:
+                cumulative += weights[-1]
+                means.append(mean)
+                weights.append(weight)
+        self.means, self.weights = means, weights
+
+class CorpusBaseline:
+    """
+    LAYER 1 SUPPORT: Incrementally maintained corpus statistics.
+    Running sums are updated exactly on add/replace/remove. Quantiles always
+    describe the live set: up to `exact_limit` files they come from sorted
+    value arrays kept in step with every mutation; beyond that from t-digests,
+    which cannot forget values, so they are rebuilt from the live values the
+    first time stats are read after a removal or replacement.
+    """
+    def __init__(self, compression: float = 100.0, exact_limit: int = 20_000):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self._values: Dict[str, Tuple[int, int, int]] = {}
+        self._sums = [0.0] * len(BASELINE_METRICS)
+        self._squares = [0.0] * len(BASELINE_METRICS)
+        self._sorted: Optional[List[List[int]]] = [[] for _ in BASELINE_METRICS] # None once past exact_limit
+        self._digests = [TDigest(compression) for _ in BASELINE_METRICS]
+        self._stale = False
+        self._stats: Optional[Dict[str, float]] = None
+
+    @staticmethod
+    def metrics_of(result: AnalysisResult) -> Tuple[int, int, int]:
+        # Rough complexity metric for baseline calculation
+        complexity = len(result.classes) + len(result.functions) + len(result.imports)
+        return complexity, len(result.imports), result.loc
+
+    def add(self, result: AnalysisResult):
+        if result.source in self._values:
+            self.remove(result.source)
+        values = self.metrics_of(result)
+        self._values[result.source] = values
+        for i, v in enumerate(values):
+            self._sums[i] += v
+            self._squares[i] += v * v
+            if self._sorted is not None:
+                insort(self._sorted[i], v)
+            else:
+                self._digests[i].add(v)
+        if self._sorted is not None and len(self._values) > self.exact_limit:
+            self._sorted = None
+            self._stale = True
+        self._stats = None
+
+    def replace(self, result: AnalysisResult):
+        self.add(result)
+
+    def remove(self, source: str):
+        values = self._values.pop(source, None)
+        if values is None:
+            return
+        for i, v in enumerate(values):
+            self._sums[i] -= v
+            self._squares[i] -= v * v
+            if self._sorted is not None:
+                column = self._sorted[i]
+                del column[bisect_left(column, v)]
+        if self._sorted is None:
+            self._stale = True
+        self._stats = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def stats(self) -> Dict[str, float]:
+        """Means, standard deviations and quantiles; cached until the next mutation."""
+        if self._stats is not None:
+            return self._stats
+        count = len(self._values)
+        if not count:
+            self._stats = {"avg_complexity": 0, "avg_imports": 0}
+            return self._stats
+        if self._stale:
+            self._rebuild()
+
+        stats: Dict[str, float] = {"files": count}
+        for i, metric in enumerate(BASELINE_METRICS):
+            mean = self._sums[i] / count
+            stats[f"avg_{metric}"] = mean
+            stats[f"std_{metric}"] = max(0.0, self._squares[i] / count - mean * mean) ** 0.5
+            for q in BASELINE_QUANTILES:
+                stats[f"p{int(q * 100)}_{metric}"] = (_exact_quantile(self._sorted[i], q) if self._sorted is not None
+                                                      else self._digests[i].quantile(q))
+        self._stats = stats
+        return stats
+
+    def _rebuild(self):
+        self._digests = [TDigest(self.compression) for _ in BASELINE_METRICS]
+        for values in self._values.values():
+            for i, v in enumerate(values):
+                self._digests[i].add(v)
+        self._stale = False
+
+def _exact_quantile(column: List[int], q: float) -> float:
+    """Linear interpolation between the closest ranks of a sorted column."""
+    position = q * (len(column) - 1)
+    lo = int(position)
+    hi = min(lo + 1, len(column) - 1)
+    return column[lo] + (position - lo) * (column[hi] - column[lo])
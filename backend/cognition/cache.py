@@ -0,0 +1,138 @@
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Callable, Dict, List, Tuple
+from cognition.models import AnalysisResult, Interpretation, Judgement, RefactorPlan
+from cognition.heuristics import HEURISTIC_VERSION
+from core.metrics import CACHE_REQUESTS
+
+Assessment = Tuple[Interpretation, Judgement]
+
+class ResultCache:
+    """
+    LAYER 2/3 MEMO: Interpretation + Judgement per file.
+    Keyed by (content hash, analysis tier, baseline bucket, heuristic version), so a repeat
+    analysis only recomputes files whose content changed or whose baseline moved
+    to another bucket. The bucket holds only what the rules can observe: the
+    average complexity on a log scale, and whether this file's import count is
+    over the corpus import limit, so a drifting limit invalidates only the files
+    it moves across. Entries live in an in-memory LRU and, when a store is
+    given, in M2 so they survive restarts. The LRU and the hit/miss counters
+    are shared by every engine worker and only touched under `_lock`; `compute`
+    and the M2 round trips run outside it.
+    """
+    # Baseline averages are bucketed on a 1% log scale
+    BUCKET_STEP = math.log(1.01)
+
+    def __init__(self, capacity: int = 50_000, store=None, version: int = HEURISTIC_VERSION):
+        self.capacity = capacity
+        self.store = store
+        self.version = version
+        self._entries: "OrderedDict[str, Assessment]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def baseline_bucket(cls, baseline: Dict[str, float]) -> str:
+        avg = baseline.get("avg_complexity", 10) or 10
+        return str(round(math.log(avg) / cls.BUCKET_STEP))
+
+    @staticmethod
+    def import_limit(baseline: Dict[str, float]) -> float:
+        # Same limit the role rules compare each file's import count against
+        return baseline.get("p90_imports", baseline.get("avg_imports", 5) * 1.5)
+
+    def key(self, result: AnalysisResult, bucket: str, import_limit: float) -> str:
+        content_hash = result.content_hash or hashlib.sha1(result.raw_content.encode("utf-8", "replace")).hexdigest()
+        over = int(len(result.imports) > import_limit)
+        return hashlib.sha1(f"{self.version}|{bucket}:{over}|{result.tier}|{result.source}|{content_hash}".encode()).hexdigest()
+
+    def resolve(self, results: List[AnalysisResult], baseline: Dict[str, float],
+                compute: Callable[[List[AnalysisResult], Dict[str, float]], List[Assessment]]) -> List[Assessment]:
+        """Returns one (Interpretation, Judgement) per result, calling `compute` only for the misses."""
+        bucket = self.baseline_bucket(baseline)
+        import_limit = self.import_limit(baseline)
+        keys = [self.key(r, bucket, import_limit) for r in results]
+        found: Dict[str, Assessment] = {}
+        with self._lock:
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is not None:
+                    self._entries.move_to_end(k)
+                    found[k] = entry
+
+        missing = [(k, r) for k, r in zip(keys, results) if k not in found]
+        if missing and self.store is not None:
+            persisted = self.store.load_cached_results([k for k, _ in missing])
+            for k, r in missing:
+                if k in persisted:
+                    found[k] = self._decode(persisted[k], r)
+                    self._remember(k, found[k])
+            missing = [(k, r) for k, r in missing if k not in found]
+
+        with self._lock:
+            self.hits += len(results) - len(missing)
+            self.misses += len(missing)
+        CACHE_REQUESTS.inc("result", "hit", amount=len(results) - len(missing))
+        CACHE_REQUESTS.inc("result", "miss", amount=len(missing))
+        if missing:
+            fresh = compute([r for _, r in missing], baseline)
+            for (k, _), entry in zip(missing, fresh):
+                found[k] = entry
+                self._remember(k, entry)
+            if self.store is not None:
+                self.store.save_cached_results([(k, r.source, self._encode(entry, r))
+                                                for (k, r), entry in zip(missing, fresh)])
+
+        return [found[k] for k in keys]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, key: str, entry: Assessment):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _encode(entry: Assessment, result: AnalysisResult) -> str:
+        interp, judgement = entry
+        payload = {"interpretation": asdict(interp), "judgement": asdict(judgement)}
+        plan = payload["judgement"]["refactor_plan"]
+        if plan:
+            # Refactor plans embed the file; persist only what differs from it
+            content = result.raw_content
+            if plan["current_code"] == content:
+                plan["current_code"] = None
+                plan["current_is_content"] = True
+            proposed = plan["proposed_code"]
+            if proposed is not None and proposed.endswith(content):
+                plan["proposed_code"] = None
+                plan["proposed_prefix"] = proposed[:len(proposed) - len(content)]
+        return json.dumps(payload)
+
+    @staticmethod
+    def _decode(raw: str, result: AnalysisResult) -> Assessment:
+        payload = json.loads(raw)
+        judgement = payload["judgement"]
+        plan = judgement.pop("refactor_plan")
+        if plan:
+            content = result.raw_content
+            if plan.pop("current_is_content", False):
+                plan["current_code"] = content
+            prefix = plan.pop("proposed_prefix", None)
+            if prefix is not None:
+                plan["proposed_code"] = prefix + content
+            plan = RefactorPlan(**plan)
+        return Interpretation(**payload["interpretation"]), Judgement(refactor_plan=plan, **judgement)
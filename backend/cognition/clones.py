@@ -0,0 +1,213 @@
+
+import ast
+import threading
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+from cognition.models import AnalysisResult
+
+CLONE_KINDS = ("function", "file")
+
+# Mersenne prime for the universal hash family h(x) = (a*x + b) mod p
+_PRIME = (1 << 31) - 1
+_SHINGLE_BASE = 1_000_003
+# AST node label -> stable token id (crc32, so signatures do not depend on hash seeds)
+_TOKEN_IDS: Dict[str, int] = {}
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+class CloneDetector:
+    """
+    LAYER 1 SUPPORT: Structural clone detection.
+    Functions and files are reduced to shingles of their normalized AST (node
+    kinds and operators, no identifiers or literal values), summarized as MinHash
+    signatures and bucketed with LSH banding. Only items sharing a band bucket
+    are compared, so the cost grows with corpus size rather than with pairs.
+    Signatures are kept per source and recomputed only when content changes.
+    Lexical-tier files carry no parse tree to shingle and are left out; they
+    are counted so callers can say how much of the corpus went unchecked.
+    Refreshes are serialized under a lock and readers cluster a copy of the
+    index taken under it, so concurrent /duplicates calls never see it mid-update.
+    """
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 5,
+                 min_shingles: int = 12, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+        # source -> (content hash, [(kind, name, signature)])
+        self._entries: Dict[str, Tuple[str, List[Tuple[str, str, np.ndarray]]]] = {}
+        self._lexical: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def refresh(self, results: List[AnalysisResult]):
+        """Brings the signature index in line with the corpus: new or changed files are re-fingerprinted, vanished ones dropped."""
+        with self._lock:
+            live = set()
+            for res in results:
+                live.add(res.source)
+                lexical = res.tier == "lexical"
+                cached = self._entries.get(res.source)
+                if (cached is None or cached[0] != res.content_hash or not res.content_hash
+                        or lexical != (res.source in self._lexical)):
+                    self._entries[res.source] = (res.content_hash, [] if lexical else self._fingerprint(res))
+                    if lexical:
+                        self._lexical.add(res.source)
+                    else:
+                        self._lexical.discard(res.source)
+            for source in [s for s in self._entries if s not in live]:
+                del self._entries[source]
+                self._lexical.discard(source)
+
+    def excluded(self) -> int:
+        """Number of indexed files skipped because they were analysed on the lexical tier."""
+        with self._lock:
+            return len(self._lexical)
+
+    def find_clusters(self, kind: str = "function", threshold: float = 0.8, limit: int = 50) -> List[Dict]:
+        """
+        Clusters of near-duplicate functions or files, most similar first. Each
+        cluster lists its members and the mean estimated Jaccard similarity of
+        the verified pairs that joined it.
+        """
+        if kind not in CLONE_KINDS:
+            raise ValueError(f"Unknown clone kind '{kind}'. Options: {', '.join(CLONE_KINDS)}")
+        with self._lock:
+            items = [(source, name, sig) for source, (_, entries) in self._entries.items()
+                     for k, name, sig in entries if k == kind]
+        if len(items) < 2:
+            return []
+        signatures = np.stack([sig for _, _, sig in items])
+
+        # 1. LSH banding: items agreeing on every row of some band share a bucket
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for band in range(self.bands):
+            keys = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for i in range(len(items)):
+                buckets.setdefault((band, keys[i].tobytes()), []).append(i)
+
+        # 2. Verify every pair within each bucket: two near-duplicates may share
+        #    a bucket only with a dissimilar item, so checking against one
+        #    representative would lose them. Members are in ascending index order.
+        uf = _UnionFind(len(items))
+        pair_scores: Dict[Tuple[int, int], float] = {}
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            block = signatures[members]
+            for pos in range(len(members) - 1):
+                a = members[pos]
+                sims = (block[pos + 1:] == block[pos]).mean(axis=1)
+                for b, sim in zip(members[pos + 1:], sims.tolist()):
+                    if sim >= threshold and (a, b) not in pair_scores:
+                        pair_scores[(a, b)] = sim
+                        uf.union(a, b)
+
+        # 3. Connected components become clusters
+        clusters: Dict[int, Dict] = {}
+        for (a, b), sim in pair_scores.items():
+            root = uf.find(a)
+            cluster = clusters.setdefault(root, {"members": set(), "scores": []})
+            cluster["members"].update((a, b))
+            cluster["scores"].append(sim)
+
+        ranked = []
+        for cluster in clusters.values():
+            members = sorted(cluster["members"], key=lambda i: (items[i][0], items[i][1]))
+            ranked.append({
+                "kind": kind,
+                "similarity": round(sum(cluster["scores"]) / len(cluster["scores"]), 3),
+                "members": [{"source": items[i][0], "name": items[i][1]} for i in members]
+            })
+        ranked.sort(key=lambda c: (-c["similarity"], -len(c["members"]), c["members"][0]["source"]))
+        return ranked[:limit]
+
+    def _fingerprint(self, res: AnalysisResult) -> List[Tuple[str, str, np.ndarray]]:
+        try:
+            tree = ast.parse(res.raw_content)
+        except (SyntaxError, ValueError):
+            return []
+
+        # One pre-order walk: every function's subtree is a contiguous token span
+        tokens, spans = self._tokenize(tree)
+        windows = self._window_hashes(tokens)
+        k = self.shingle_size
+
+        entries = []
+        file_sig = self._signature(np.unique(windows))
+        if file_sig is not None:
+            entries.append(("file", res.source, file_sig))
+        for name, start, end in spans:
+            sig = self._signature(np.unique(windows[start:max(start, end - k + 1)]))
+            if sig is not None:
+                entries.append(("function", name, sig))
+        return entries
+
+    @staticmethod
+    def _tokenize(tree: ast.AST) -> Tuple[List[int], List[List]]:
+        # Node kinds in pre-order; operators are kept, identifiers and literals are not
+        tokens: List[int] = []
+        spans: List[List] = []  # [qualified name, first token, end token]
+        stack: List[Tuple[ast.AST, str, int]] = [(tree, "", -1)]
+        while stack:
+            node, prefix, closes = stack.pop()
+            if node is None:
+                spans[closes][2] = len(tokens)
+                continue
+            if isinstance(node, ast.expr_context):
+                continue
+            label = type(node).__name__
+            op = getattr(node, "op", None)
+            if op is not None:
+                label += ":" + type(op).__name__
+            token = _TOKEN_IDS.get(label)
+            if token is None:
+                token = _TOKEN_IDS[label] = zlib.crc32(label.encode()) % _PRIME
+            tokens.append(token)
+
+            child_prefix = prefix
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                spans.append([f"{prefix}{node.name}", len(tokens) - 1, None])
+                stack.append((None, prefix, len(spans) - 1))
+                child_prefix = f"{prefix}{node.name}."
+            elif isinstance(node, ast.ClassDef):
+                child_prefix = f"{prefix}{node.name}."
+            stack.extend((child, child_prefix, -1) for child in reversed(list(ast.iter_child_nodes(node))))
+        return tokens, spans
+
+    def _window_hashes(self, tokens: List[int]) -> np.ndarray:
+        """Polynomial hash of every k-token window (window i starts at token i)."""
+        k = self.shingle_size
+        if len(tokens) < k:
+            return np.zeros(0, dtype=np.int64)
+        seq = np.array(tokens, dtype=np.int64)
+        count = len(seq) - k + 1
+        hashes = np.zeros(count, dtype=np.int64)
+        for j in range(k):
+            hashes = (hashes * _SHINGLE_BASE + seq[j:j + count]) % _PRIME
+        return hashes
+
+    def _signature(self, shingles: np.ndarray) -> Optional[np.ndarray]:
+        if len(shingles) < self.min_shingles:
+            return None
+        # (a*x + b) mod p stays below 2^62, so int64 never overflows
+        return ((self._a[:, None] * shingles[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
@@ -1,6 +1,9 @@
 
-from typing import List, Dict
-from cognition.models import AnalysisResult, ComparisonResult, DiffPoint
+import numpy as np
+from typing import List, Dict, Optional
+from cognition.models import AnalysisResult, ComparisonResult, DiffPoint, RankingResult
+
+RANKING_METRICS = ("Complexity (Structural)", "LOC", "Imports", "Methods")
 
 class Comparator:
     def compare(self, analysis_a: AnalysisResult, analysis_b: AnalysisResult) -> ComparisonResult:
@@ -43,3 +46,43 @@ class Comparator:
             winner=winner,
             rationale=rationale
         )
+
+    def rank(self, analyses: List[AnalysisResult]) -> RankingResult:
+        """
+        N-way comparison: one metrics matrix for all targets, standardized per
+        metric; the composite score is the mean z-score (simpler ranks first).
+        """
+        values = np.array([
+            (len(a.imports) + sum(f.complexity for f in a.functions) + sum(len(c.methods) for c in a.classes),
+             a.loc,
+             len(a.imports),
+             sum(len(c.methods) for c in a.classes))
+            for a in analyses
+        ], dtype=np.float64).reshape(len(analyses), len(RANKING_METRICS))
+
+        mean = values.mean(axis=0) if len(analyses) else np.zeros(len(RANKING_METRICS))
+        std = values.std(axis=0) if len(analyses) else np.zeros(len(RANKING_METRICS))
+        z_scores = np.divide(values - mean, std, out=np.zeros_like(values), where=std > 0)
+        scores = z_scores.mean(axis=1)
+        # Stable sort, so equal scores keep the input order
+        ranking = np.argsort(scores, kind="stable").tolist()
+
+        return RankingResult(
+            targets=[a.source for a in analyses],
+            metrics=list(RANKING_METRICS),
+            values=values,
+            z_scores=z_scores,
+            scores=scores,
+            ranking=ranking
+        )
+
+    @staticmethod
+    def pairwise_deltas(ranking: RankingResult, indices: Optional[List[int]] = None) -> np.ndarray:
+        """
+        (metrics x n x n) percent deltas, entry [m, i, j] = (v[j] - v[i]) / v[i] * 100
+        as in `compare`; restricted to `indices` to keep large rankings small.
+        """
+        values = ranking.values if indices is None else ranking.values[indices]
+        base = values.T[:, :, None]
+        other = values.T[:, None, :]
+        return np.divide((other - base) * 100.0, base, out=np.zeros((values.shape[1], len(values), len(values))), where=base > 0)
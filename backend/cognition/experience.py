@@ -1,22 +1,69 @@
 
+import atexit
 import json
 import os
-from typing import Dict, Any, List
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
 EXP_FILE = "experience_m3.json"
+# Snapshot key holding the sequence number of the last delta folded into it
+SNAPSHOT_SEQ_KEY = "_seq"
+# "sqlite": shared counters, safe across threads and worker processes (default)
+# "json": snapshot + delta log, single process only
+M3_STORES = ("sqlite", "json")
+
+# Same running-average update as _apply, evaluated inside SQLite so concurrent
+# writers never overwrite each other. SET expressions see the pre-update row.
+_UPSERT = """
+    INSERT INTO heuristic_stats (name, uses, avg_confidence, success_rate)
+    VALUES (:name, 1, :confidence, CASE WHEN :confirmed THEN 1.0 ELSE 0.0 END)
+    ON CONFLICT(name) DO UPDATE SET
+        uses = uses + 1,
+        avg_confidence = ((avg_confidence * uses) + :confidence) / (uses + 1),
+        success_rate = CASE WHEN :confirmed THEN success_rate
+                            ELSE ((success_rate * uses) + 0.0) / (uses + 1) END
+"""
 
 class ExperienceMonitor:
     """
     PHASE 5: EXPERIENCE (M3)
     Statistical feedback loop. Not narrative.
+
+    Updates are applied to the in-memory stats immediately and buffered
+    (write-behind) until `flush_every` events or `flush_interval` seconds.
+
+    With the "sqlite" store a flush applies the buffered events as UPSERTs in
+    one transaction on `experience_m3.db` and reloads the shared totals, so
+    uvicorn workers and threads all add to the same counters. A legacy JSON
+    file is imported the first time the table is empty.
+
+    With the "json" store a flush appends the events to a delta log
+    (`<file>.log`, one JSON line per event); every `snapshot_every` events the
+    stats are written to a temp file and renamed over the snapshot, and the log
+    is truncated. On load the snapshot is read and the log replayed, skipping
+    events the snapshot already contains and any torn trailing line.
     """
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, flush_every: int = 256, flush_interval: float = 2.0,
+                 snapshot_every: int = 4096, exp_file: Optional[str] = None, store: Optional[str] = None):
         self.enabled = enabled
         self.stats: Dict[str, Dict[str, Any]] = {}
-        
+        self.store = store or os.getenv("PRIMERS_M3_STORE", "sqlite")
+        if self.store not in M3_STORES:
+            raise ValueError(f"Unknown M3 store '{self.store}'. Options: {', '.join(M3_STORES)}")
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self._pending: List[Tuple[str, float, bool]] = []
+        self._seq = 0            # sequence number of the last applied event
+        self._snapshot_seq = 0   # sequence number folded into the snapshot on disk
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
         # Vercel fix: Use /tmp for writeable JSON
-        self.exp_file = EXP_FILE
-        if os.getenv("VERCEL"):
+        self.exp_file = exp_file or EXP_FILE
+        if exp_file is None and os.getenv("VERCEL"):
             tmp_file = os.path.join("/tmp", EXP_FILE)
             if os.path.exists(EXP_FILE) and not os.path.exists(tmp_file):
                 import shutil
@@ -25,9 +72,49 @@ class ExperienceMonitor:
                 except:
                     pass
             self.exp_file = tmp_file
-            
+        self.log_file = self.exp_file + ".log"
+        self.db_path = os.path.splitext(self.exp_file)[0] + ".db"
+
         if self.enabled:
-            self._load()
+            if self.store == "sqlite":
+                self._init_db()
+            else:
+                self._load()
+            atexit.register(self.flush)
+
+    def _init_db(self):
+        try:
+            with sqlite3.connect(self.db_path, timeout=10) as conn:
+                # WAL lets readers in other workers proceed while one process writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS heuristic_stats (
+                        name TEXT PRIMARY KEY,
+                        uses INTEGER,
+                        avg_confidence REAL,
+                        success_rate REAL
+                    )
+                """)
+                # Import the legacy JSON once; BEGIN IMMEDIATE so only one worker does it
+                conn.execute("BEGIN IMMEDIATE")
+                empty = conn.execute("SELECT 1 FROM heuristic_stats LIMIT 1").fetchone() is None
+                if empty and os.path.exists(self.exp_file):
+                    self._load()
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO heuristic_stats VALUES (?, ?, ?, ?)",
+                        [(name, e["uses"], e["avg_confidence"], e["success_rate"]) for name, e in self.stats.items()]
+                    )
+            self._reload(conn)
+        except sqlite3.Error as e:
+            print(f"M3 Init Error: {e}")
+
+    def _reload(self, conn: sqlite3.Connection):
+        """Replaces the in-memory view with the shared totals."""
+        self.stats = {
+            name: {"uses": uses, "avg_confidence": avg, "success_rate": rate}
+            for name, uses, avg, rate in conn.execute(
+                "SELECT name, uses, avg_confidence, success_rate FROM heuristic_stats")
+        }
 
     def _load(self):
         if os.path.exists(self.exp_file):
@@ -36,21 +123,28 @@ class ExperienceMonitor:
                     self.stats = json.load(f)
             except:
                 self.stats = {}
+        self._snapshot_seq = int(self.stats.pop(SNAPSHOT_SEQ_KEY, 0) or 0)
+        self._seq = self._snapshot_seq
+        self._replay()
 
-    def _save(self):
-        if not self.enabled: return
+    def _replay(self):
+        """Re-applies logged events newer than the snapshot (crash recovery)."""
+        if not os.path.exists(self.log_file):
+            return
         try:
-            with open(self.exp_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
-        except:
-            pass # Silent failure on read-only environments if /tmp fails
-
-    def log_heuristic_result(self, heuristic_name: str, confidence: float, confirmed: bool = True):
-        """
-        Updates statistical priors for a heuristic.
-        """
-        if not self.enabled: return
+            with open(self.log_file, 'r') as f:
+                for line in f:
+                    try:
+                        seq, name, confidence, confirmed = json.loads(line)
+                    except (ValueError, TypeError):
+                        break # Torn write at the tail: everything before it is intact
+                    if seq > self._seq:
+                        self._apply(name, confidence, confirmed)
+                        self._seq = seq
+        except OSError as e:
+            print(f"M3 Replay Error: {e}")
 
+    def _apply(self, heuristic_name: str, confidence: float, confirmed: bool):
         if heuristic_name not in self.stats:
             self.stats[heuristic_name] = {
                 "uses": 0,
@@ -60,25 +154,105 @@ class ExperienceMonitor:
 
         entry = self.stats[heuristic_name]
         n = entry["uses"]
-        
+
         # update running avg
         new_conf = ((entry["avg_confidence"] * n) + confidence) / (n + 1)
-        
+
         entry["uses"] += 1
         entry["avg_confidence"] = new_conf
-        
+
         # very basic success tracking, in real v5 confirmed comes from user feedback
         if not confirmed:
              # penalize success rate
              entry["success_rate"] = ((entry["success_rate"] * n) + 0.0) / (n + 1)
-        
-        self._save()
+
+    def log_heuristic_result(self, heuristic_name: str, confidence: float, confirmed: bool = True):
+        """
+        Updates statistical priors for a heuristic. Persistence is deferred
+        until the buffer reaches `flush_every` events or `flush_interval` seconds.
+        """
+        if not self.enabled: return
+
+        with self._lock:
+            self._apply(heuristic_name, confidence, confirmed)
+            self._seq += 1
+            self._pending.append((heuristic_name, confidence, confirmed))
+            due = (len(self._pending) >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Persists buffered events to the configured store."""
+        if not self.enabled: return
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            if self.store == "sqlite":
+                self._flush_db()
+            else:
+                self._flush_log()
+
+    def _flush_db(self):
+        # Caller holds the lock. One transaction per flush; the pending events
+        # stay buffered if the database is locked past the timeout.
+        try:
+            with sqlite3.connect(self.db_path, timeout=10) as conn:
+                conn.executemany(_UPSERT, [{"name": name, "confidence": conf, "confirmed": ok}
+                                           for name, conf, ok in self._pending])
+                self._pending = []
+                self._reload(conn)
+        except sqlite3.Error as e:
+            print(f"M3 Flush Error: {e}")
+
+    def _flush_log(self):
+        # Caller holds the lock. Appends to the delta log; snapshots when the log is long enough.
+        first = self._seq - len(self._pending) + 1
+        lines = "".join(json.dumps([first + i, name, conf, ok]) + "\n"
+                        for i, (name, conf, ok) in enumerate(self._pending))
+        self._pending = []
+        try:
+            with open(self.log_file, 'a') as f:
+                f.write(lines)
+        except OSError:
+            pass # Silent failure on read-only environments if /tmp fails
+        if self._seq - self._snapshot_seq >= self.snapshot_every:
+            self._snapshot()
+
+    def pending(self) -> int:
+        """Events buffered and not yet persisted."""
+        return len(self._pending)
+
+    def _snapshot(self):
+        # Caller holds the lock. Temp file + rename, so readers never see a partial snapshot.
+        tmp_file = self.exp_file + ".tmp"
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump({**self.stats, SNAPSHOT_SEQ_KEY: self._seq}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.exp_file)
+            self._snapshot_seq = self._seq
+            # A crash before this truncation is harmless: replay skips seq <= snapshot
+            open(self.log_file, 'w').close()
+        except OSError:
+            pass
+
+    def _save(self):
+        """Persists buffered events; the json store also writes a full snapshot."""
+        if not self.enabled: return
+        self.flush()
+        if self.store != "json":
+            return
+        with self._lock:
+            self._snapshot()
 
     def get_calibration(self, heuristic_name: str) -> float:
         """Returns complex calibration factor based on experience."""
         if heuristic_name not in self.stats:
              return 1.0
-        
+
         entry = self.stats[heuristic_name]
         # If confidence is historically high but success rate is low, reduce trust
         return entry["success_rate"]
@@ -1,7 +1,12 @@
 
+import numpy as np
 from typing import Dict, List
 from cognition.models import AnalysisResult, Interpretation
 
+# Bump whenever interpretation or judgement rules change; memoized results keyed
+# on an older version are ignored.
+HEURISTIC_VERSION = 1
+
 class HeuristicEngine:
     """
     LAYER 2: INTERPRETATION
@@ -20,8 +25,11 @@ class HeuristicEngine:
         relative_complexity = raw_complexity / avg
 
         # 3. Assign Role
+        # Import fan-out is judged against the corpus p90 when the baseline has
+        # quantiles (robust to a few huge files); otherwise 1.5x the mean.
         role = "worker"
-        if len(data.imports) > (baseline.get("avg_imports", 5) * 1.5):
+        import_limit = baseline.get("p90_imports", baseline.get("avg_imports", 5) * 1.5)
+        if len(data.imports) > import_limit:
             role = "coordinator"
         if relative_complexity > 2.0:
             role = "god_object_candidate"
@@ -56,3 +64,91 @@ class HeuristicEngine:
             smells=smells,
             relative_complexity=relative_complexity
         )
+
+    def interpret_batch(self, results: List[AnalysisResult], baseline: Dict[str, float]) -> List[Interpretation]:
+        """
+        Corpus-wide equivalent of `interpret`: features for every file (and every
+        function, class and method) go into flat NumPy arrays, rules run as array
+        masks, and only flagged entries are turned into smell strings. Output is
+        identical to calling `interpret` per file.
+        """
+        if not results:
+            return []
+
+        # 1. Feature matrix: one row per file; ragged per-function/class/method arrays
+        n_imports = np.array([len(r.imports) for r in results], dtype=np.int64)
+        n_classes = np.array([len(r.classes) for r in results], dtype=np.int64)
+        n_functions = np.array([len(r.functions) for r in results], dtype=np.int64)
+        loc = np.array([r.loc for r in results], dtype=np.int64)
+
+        functions = [f for r in results for f in r.functions]
+        func_file = np.repeat(np.arange(len(results)), n_functions)
+        func_cc = np.array([f.complexity for f in functions], dtype=np.int64)
+        func_doc = np.array([bool(f.docstring) for f in functions], dtype=bool)
+
+        classes = [c for r in results for c in r.classes]
+        class_file = np.repeat(np.arange(len(results)), n_classes)
+        class_methods = np.array([len(c.methods) for c in classes], dtype=np.int64)
+        method_offsets = np.concatenate(([0], np.cumsum(class_methods)))
+        methods = [m for c in classes for m in c.methods]
+        method_class = np.repeat(np.arange(len(classes)), class_methods)
+        method_cc = np.array([m.complexity for m in methods], dtype=np.int64)
+
+        # 2. Raw complexity and baseline comparison
+        func_sum = np.bincount(func_file, weights=func_cc, minlength=len(results)).astype(np.int64)
+        method_sum = np.bincount(class_file[method_class], weights=method_cc, minlength=len(results)).astype(np.int64)
+        raw_complexity = n_imports + func_sum + method_sum + n_classes
+
+        avg = baseline.get("avg_complexity", 10)
+        if avg == 0: avg = 10
+        relative = raw_complexity / avg
+
+        # 3. Roles (later rules win, as in `interpret`)
+        import_limit = baseline.get("p90_imports", baseline.get("avg_imports", 5) * 1.5)
+        roles = np.select(
+            [loc < 10, relative > 2.0, n_imports > import_limit],
+            ["stub", "god_object_candidate", "coordinator"],
+            default="worker"
+        )
+
+        # 4. Smell masks
+        excessive = relative > 2.5
+        mixed = (n_classes > 1) & (n_functions > 10)
+        func_complex = func_cc > 10
+        func_undocumented = ~func_doc & (func_cc > 5)
+        class_large = class_methods > 20
+        method_complex = method_cc > 10
+        class_flagged = class_large | (np.bincount(method_class[method_complex], minlength=len(classes)) > 0)
+
+        smells: List[List[str]] = [[] for _ in results]
+        relative_list = relative.tolist()
+        for i in np.nonzero(excessive | mixed)[0].tolist():
+            if excessive[i]:
+                smells[i].append(f"Excessive Complexity ({relative_list[i]:.1f}x avg)")
+            if mixed[i]:
+                smells[i].append("Mixed Responsibilities (Classes + many functions)")
+        for j in np.nonzero(func_complex | func_undocumented)[0].tolist():
+            f = functions[j]
+            if func_complex[j]:
+                smells[func_file[j]].append(f"Complex Function '{f.name}' (CC: {f.complexity})")
+            if func_undocumented[j]:
+                smells[func_file[j]].append(f"Undocumented Complex Function '{f.name}'")
+        for k in np.nonzero(class_flagged)[0].tolist():
+            c, bucket = classes[k], smells[class_file[k]]
+            if class_large[k]:
+                bucket.append(f"Large Class '{c.name}' ({len(c.methods)} methods)")
+            start = method_offsets[k]
+            for m_idx in np.nonzero(method_complex[start:method_offsets[k + 1]])[0].tolist():
+                m = methods[start + m_idx]
+                bucket.append(f"Complex Method '{c.name}.{m.name}' (CC: {m.complexity})")
+
+        return [
+            Interpretation(
+                source=r.source,
+                complexity_score=float(raw),
+                role=role,
+                smells=smells[i],
+                relative_complexity=rel
+            )
+            for i, (r, raw, role, rel) in enumerate(zip(results, raw_complexity.tolist(), roles.tolist(), relative_list))
+        ]
@@ -1,7 +1,9 @@
 
 import os
+import time
 import requests
 from typing import Dict, Any, Optional, List
+from core.metrics import LLM_CALL_SECONDS, LLM_FAILURES
 
 class LocalLLMConnector:
     """
@@ -132,13 +134,21 @@ class LocalLLMConnector:
             "temperature": 0.5
         }
 
+        start = time.perf_counter()
         try:
             # tailored for OpenAI compatible API (Ollama v1)
             res = requests.post(self.endpoint, json=payload, headers=headers, timeout=15)
             if res.status_code == 200:
                 data = res.json()
                 return data['choices'][0]['message']['content']
+            LLM_FAILURES.inc(f"http_{res.status_code}")
+        except requests.Timeout:
+            LLM_FAILURES.inc("timeout")
+            raise
         except Exception:
+            LLM_FAILURES.inc("error")
             raise
+        finally:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - start)
         
         return None
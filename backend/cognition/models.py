@@ -1,6 +1,6 @@
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 @dataclass
 class FunctionInfo:
@@ -27,6 +27,9 @@ class AnalysisResult:
     imports: List[str] = field(default_factory=list)
     loc: int = 0
     raw_content: str = ""
+    calls: List[Tuple[str, str]] = field(default_factory=list) # (caller qualname, callee qualname)
+    content_hash: str = "" # sha1 of raw_content
+    tier: str = "ast" # 'ast' (full parse) or 'lexical' (token scan; approximate, no call graph)
 
 @dataclass
 class Interpretation:
@@ -67,3 +70,12 @@ class ComparisonResult:
     diffs: List[DiffPoint]
     winner: str # 'target_a', 'target_b', 'tie'
     rationale: str
+
+@dataclass
+class RankingResult:
+    targets: List[str]
+    metrics: List[str]
+    values: Any # (targets x metrics) ndarray
+    z_scores: Any # (targets x metrics) ndarray, per-metric standardization
+    scores: Any # composite score per target (mean z-score); lower is simpler
+    ranking: List[int] # target indices, simplest first
@@ -0,0 +1,114 @@
+
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from cognition.models import AnalysisResult, ClassInfo, FunctionInfo, Interpretation, Judgement, RefactorPlan
+from cognition.heuristics import HeuristicEngine
+from cognition.judge import JudgementCore
+
+EXECUTOR_MODES = ("serial", "thread", "process")
+
+# Worker-side layers; both are stateless, so one instance per process is enough
+_HEURISTICS = HeuristicEngine()
+_JUDGE = JudgementCore()
+
+def assess_chunk(results: List[AnalysisResult], baseline: Dict[str, float]) -> List[Tuple[Interpretation, Judgement]]:
+    """Layer 2 (vectorized over the chunk) followed by Layer 3 for each result."""
+    interpretations = _HEURISTICS.interpret_batch(results, baseline)
+    return [(interp, _JUDGE.assess(interp, analysis.raw_content if hasattr(analysis, "raw_content") else ""))
+            for analysis, interp in zip(results, interpretations)]
+
+# Process pools pickle every chunk both ways; plain tuples pickle several times
+# faster than dataclass instances, so chunks cross the boundary in this form.
+def _pack_result(r: AnalysisResult) -> tuple:
+    return (r.source, len(r.imports), r.loc, r.raw_content,
+            [(f.name, f.complexity, f.docstring) for f in r.functions],
+            [(c.name, [(m.name, m.complexity, m.docstring) for m in c.methods]) for c in r.classes])
+
+def _unpack_result(packed: tuple) -> AnalysisResult:
+    # Only the fields Layers 2/3 read are carried over
+    source, imports, loc, content, functions, classes = packed
+    return AnalysisResult(
+        source=source,
+        imports=[""] * imports,
+        loc=loc,
+        raw_content=content,
+        functions=[FunctionInfo(name, [], doc, False, [], cc) for name, cc, doc in functions],
+        classes=[ClassInfo(name, [], [FunctionInfo(m, [], doc, False, [], cc) for m, cc, doc in methods], False, [])
+                 for name, methods in classes]
+    )
+
+def _pack_assessment(entry: Tuple[Interpretation, Judgement]) -> tuple:
+    i, j = entry
+    plan = j.refactor_plan
+    return ((i.source, i.complexity_score, i.role, i.smells, i.relative_complexity),
+            (j.summary, j.risks, j.recommendations, j.confidence_score,
+             None if plan is None else (plan.goal, plan.steps, plan.risk, plan.expected_gain, plan.current_code, plan.proposed_code)))
+
+def _unpack_assessment(packed: tuple) -> Tuple[Interpretation, Judgement]:
+    (source, score, role, smells, relative), (summary, risks, recommendations, confidence, plan) = packed
+    return (Interpretation(source, score, role, smells, relative),
+            Judgement(summary, risks, recommendations, RefactorPlan(*plan) if plan else None, confidence))
+
+def assess_packed(packed: List[tuple], baseline: Dict[str, float]) -> List[tuple]:
+    """Process-pool entry point: assess_chunk over the tuple wire format."""
+    return [_pack_assessment(entry) for entry in assess_chunk([_unpack_result(p) for p in packed], baseline)]
+
+class AssessmentExecutor:
+    """
+    LAYER 2/3 FAN-OUT
+    Interpretation and judgement are pure functions of an AnalysisResult and the
+    baseline, so the corpus is split into fixed-size chunks and evaluated on a
+    thread or process pool. Chunks are merged back in submission order, so the
+    output is identical to a serial run. Engine workers share one executor, so
+    the pool is created and shut down under `_pool_lock`.
+    """
+    def __init__(self, mode: str = "serial", workers: Optional[int] = None, chunk_size: int = 2000):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}'. Options: {', '.join(EXECUTOR_MODES)}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+
+    def assess(self, results: List[AnalysisResult], baseline: Dict[str, float]) -> List[Tuple[Interpretation, Judgement]]:
+        # Corpora that fit in one chunk are not worth the hand-off
+        if self.mode == "serial" or self.workers < 2 or len(results) <= self.chunk_size:
+            return assess_chunk(results, baseline)
+
+        chunks = [results[i:i + self.chunk_size] for i in range(0, len(results), self.chunk_size)]
+        pool = self._get_pool()
+        merged: List[Tuple[Interpretation, Judgement]] = []
+        if self.mode == "process":
+            futures = [pool.submit(assess_packed, [_pack_result(r) for r in chunk], baseline) for chunk in chunks]
+            for future in futures:
+                merged.extend(_unpack_assessment(p) for p in future.result())
+        else:
+            futures = [pool.submit(assess_chunk, chunk, baseline) for chunk in chunks]
+            for future in futures:
+                merged.extend(future.result())
+        return merged
+
+    def queue_depth(self) -> int:
+        """Chunks submitted but not yet picked up by a worker."""
+        pool = self._pool
+        if pool is None:
+            return 0
+        if isinstance(pool, ThreadPoolExecutor):
+            return pool._work_queue.qsize()
+        return len(getattr(pool, "_pending_work_items", ()))
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                pool_cls = ProcessPoolExecutor if self.mode == "process" else ThreadPoolExecutor
+                self._pool = pool_cls(max_workers=self.workers)
+            return self._pool
@@ -33,7 +33,7 @@ OPERATOR_REGISTRY = {
 TIER_PERMISSIONS = {
     1: ["triage", "voice_guardian", "view_alerts"],
     2: ["triage", "voice_guardian", "view_alerts", "detr_scan", "export_report"],
-    3: ["triage", "voice_guardian", "view_alerts", "detr_scan", "export_report", "system_health", "manage_users"]
+    3: ["triage", "voice_guardian", "view_alerts", "detr_scan", "export_report", "system_health", "manage_users", "profile_requests"]
 }
 
 # Sovereign session store — in-memory, no external dependency
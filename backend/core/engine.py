@@ -1,23 +1,30 @@
 
 import os
+import time
+import uuid
 from typing import Dict, Any, List, Optional
 # Import strict types
 from core.types import EngineResponse, IntelligenceLevel, TraceLog, Tone
 from core.intent import IntentRouter, Intent
-from core.memory import SessionContext
+from core.memory import SessionStore
 from core.reasoning import ReasoningGraph
 from core.governance import Governance
+from core import metrics
 
 # Import the new 3-layer stack + Comparator
-from cognition.analyzer import CodeAnalyzer
+from cognition.analyzer import CodeAnalyzer, CorpusSnapshot
 from cognition.heuristics import HeuristicEngine
 from cognition.judge import JudgementCore
+from cognition.cache import ResultCache
+from cognition.parallel import AssessmentExecutor
+from cognition.clones import CloneDetector
 from cognition.comparator import Comparator
 from cognition.analyst import RepoAnalyst
 from core.guard import PolicyGuard, PolicySeverity
 
 # Phase 5 Components
 from knowledge.store import KnowledgeStore
+from knowledge.graph import module_name
 from cognition.experience import ExperienceMonitor
 from cognition.local_llm import LocalLLMConnector
 from knowledge.github import GitHubConnector
@@ -25,6 +32,9 @@ from cognition.auditor import AutonomousAuditor
 from core.insights import ExecutiveInsights
 from cognition.emergency import EmergencyIntelligence
 
+# Rows of each list (hotspots, smells, violations) shown in the chat summary of an analysis run
+ANALYSIS_SUMMARY_LIMIT = 10
+
 class PrimersEngine:
     def __init__(self):
         # Phase 5: Governance FIRST (The Source of Truth)
@@ -35,17 +45,24 @@ class PrimersEngine:
         self.heuristics = HeuristicEngine() # Layer 2
         self.judge = JudgementCore() # Layer 3
         self.comparator = Comparator()
+        self.clones = CloneDetector()
         self.repo_analyst = RepoAnalyst() # Structural Intelligence
         
         # Internal Systems
         self.router = IntentRouter()
-        self.session = SessionContext()
         self.github = GitHubConnector()
         
         # M2: Persistent Factual Memory
         self.m2 = KnowledgeStore(
             enabled=self.gov.is_enabled("persistent_memory_m2")
         )
+        # M1: one bounded session per caller, LRU/TTL evicted; idle ones spill to M2
+        self.sessions = SessionStore(
+            max_sessions=int(os.getenv("PRIMERS_SESSION_LIMIT", "1000")),
+            ttl=float(os.getenv("PRIMERS_SESSION_TTL", "3600")),
+            spill_after=float(os.getenv("PRIMERS_SESSION_SPILL_AFTER", "300")),
+            store=self.m2
+        )
         
         # M3: Experience & Calibration
         self.m3 = ExperienceMonitor(
@@ -58,23 +75,74 @@ class PrimersEngine:
         )
         self.guard = PolicyGuard()
         self.auditor = AutonomousAuditor(self.m2)
-        self.insights = ExecutiveInsights(self.m2)
+
+        # Layer 2/3 memo: "memory" keeps it in-process only, "m2" also persists it
+        cache_mode = os.getenv("PRIMERS_RESULT_CACHE", "m2")
+        self.result_cache = ResultCache(store=self.m2 if cache_mode == "m2" else None)
+        # Layer 2/3 fan-out: "serial", "thread" or "process"
+        self.assessor = AssessmentExecutor(
+            mode=os.getenv("PRIMERS_ASSESS_EXECUTOR", "serial"),
+            workers=int(os.getenv("PRIMERS_ASSESS_WORKERS", "0")) or None
+        )
+
+        # M2 Topology: restore the persisted graph (CSR) so blueprint, guard and
+        # risk scoring work right after boot, before any re-ingest.
+        self.repo_analyst.load_topology(self.m2.load_graph())
+        # M2 Call Graph: function-level call edges recorded by the AST pass
+        self.call_graph = self.m2.load_call_graph()
+        # Persisted so a re-analysis after a restart keys files exactly as their ingest did
+        self.ingest_roots: List[str] = self.m2.load_ingest_roots()
+        self.insights = ExecutiveInsights(self.m2, graph_provider=self.repo_analyst.graph.compact)
         
         self.emergency = EmergencyIntelligence()
         # Sovereign mode: No external cloud dependencies
         self.model = None
-
-    def process(self, input_text: str, mode: str = "default") -> EngineResponse:
-        trace = TraceLog(session_id="current_session")
+        self._register_metrics()
+
+    def _register_metrics(self):
+        """Scrape-time gauges for /metrics: cache hit ratio and queue depths."""
+        def hit_ratio():
+            lookups = self.result_cache.hits + self.result_cache.misses
+            return {("result",): self.result_cache.hits / lookups if lookups else 0.0}
+
+        def queue_depth():
+            return {
+                ("in_flight",): metrics.PROCESS_STARTED.value() - metrics.PROCESS_SECONDS.count(),
+                ("assess",): self.assessor.queue_depth(),
+                ("m3_write_behind",): self.m3.pending()
+            }
+
+        metrics.CACHE_HIT_RATIO.add_source(hit_ratio)
+        metrics.QUEUE_DEPTH.add_source(queue_depth)
+
+    def process(self, input_text: str, mode: str = "default", session_id: str = "default_session") -> EngineResponse:
+        trace = TraceLog(session_id=session_id)
         graph = ReasoningGraph(trace)
+        metrics.PROCESS_STARTED.inc()
+        start = time.perf_counter()
+        try:
+            with graph.span("process"):
+                response = self._process(input_text, mode, session_id, graph)
+        finally:
+            # Always on, independent of PRIMERS_TRACE_TIMING
+            metrics.PROCESS_SECONDS.observe(time.perf_counter() - start, graph.intent.name if graph.intent else "UNROUTED")
+        if graph.timing:
+            # Per-request latency breakdown; totals are keyed by the routed intent
+            response.meta["timings"] = graph.timings()
+        return response
+
+    def _process(self, input_text: str, mode: str, session_id: str, graph: ReasoningGraph) -> EngineResponse:
+        trace = graph.trace
+        with graph.span("session.get"):
+            session = self.sessions.get(session_id)
         
         # Step 0: Record Message to Session (Layer 1 Memory)
-        self.session.add_message("user", input_text)
+        session.add_message("user", input_text)
         
         # Step 0.5: Context Retrieval (ChatGPT-like awareness)
         # Search the knowledge base for topics mentioned in the input
-        graph.add_step(Intent.VALIDATION, "Context_Retrieval", 1.0, "Searching M2 Knowledge Store for relevant entities")
-        context_snippets = self.m2.search_entities(input_text, limit=3)
+        with graph.step(Intent.VALIDATION, "Context_Retrieval", 1.0, "Searching M2 Knowledge Store for relevant entities"):
+            context_snippets = self.m2.search_entities(input_text, limit=3)
         if context_snippets:
             graph.add_step(Intent.VALIDATION, "Context_Match", 1.0, f"Found {len(context_snippets)} relevant code entities")
             # Inject context into the temporary prompt context (not saved to session history)
@@ -84,27 +152,52 @@ class PrimersEngine:
             input_text_with_context = input_text
 
         # Step 1: Intent Routing
-        intent = self.router.route(input_text)
-        graph.add_step(intent, "Routing", 1.0, f"Classified intent as {intent.name}")
+        with graph.span("routing"):
+            command = self.router.parse(input_text)
+        intent, args = command.intent, command.args
+        graph.intent = intent
+        graph.add_step(intent, "Routing", 1.0, f"Classified intent as {intent.name} ({command.name})")
         
         response = None
 
-        if intent == Intent.EMPIRICAL_ANALYSIS:
-            target = input_text.split(" ")[-1] if " " in input_text else "corpus"
-            response = self._handle_analysis(target, graph)
+        if command.name == "blueprint":
+            graph.add_step(Intent.EMPIRICAL_ANALYSIS, "Graph Assembly", 1.0, f"Generating architectural blueprint ({args['level']}, top {args['top_k']})")
+            blueprint = self.repo_analyst.get_blueprint(level=args["level"], expand=args["expand"], top_k=args["top_k"])
+            response = EngineResponse(f"### ARCHITECTURAL BLUEPRINT\n{blueprint}", "analysis", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
+
+        elif command.name == "health":
+            response = self._handle_health_check(graph)
+
+        elif command.name == "audit":
+            target = self.auditor.identify_primary_debt()
+            if target:
+                graph.add_step(Intent.EMPIRICAL_ANALYSIS, "Audit Initiation", 1.0, f"Autonomous trigger for {target['source']}")
+                response = self._handle_analysis(f"analyze {target['source']}", graph)
+                response.content = f"### AUTONOMOUS AUDIT INITIATED\nI am prioritizing `{target['source']}` due to high architectural debt. " + response.content
+            else:
+                response = EngineResponse("No significant architectural debt detected currently.", "info", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CALM, graph.trace)
+
+        elif intent == Intent.EMPIRICAL_ANALYSIS:
+            response = self._handle_analysis(args["target"], graph)
         
         elif intent == Intent.PLANNING:
-            target_file = input_text.split("refactor")[-1].strip()
-            response = self._handle_refactor_plan(target_file, graph)
+            response = self._handle_refactor_plan(args["target"], graph)
         elif intent == Intent.COMPARATIVE_REASONING:
-            parts = input_text.lower().replace("compare", "").split("vs")
-            if len(parts) == 2:
-                response = self._handle_comparison(parts[0].strip(), parts[1].strip(), graph)
+            if "b" in args:
+                response = self._handle_comparison(args["a"], args["b"], graph)
+            elif args.get("pattern"):
+                response = self._handle_ranking(args["pattern"], graph)
             else:
                 response = self._local_reflex("help", graph)
 
+        elif intent == Intent.CALL_GRAPH:
+            response = self._handle_call_graph(args["symbol"], args["callees"], graph)
+
+        elif intent == Intent.FIND_DUPLICATES:
+            response = self._handle_duplicates(args["kind"], args["threshold"], graph)
+
         elif intent == Intent.EXPLANATION:
-             last_entry = self.session.get_last_entry()
+             last_entry = session.get_last_entry()
              if not last_entry:
                   response = EngineResponse("No previous context to explain.", "explanation", 1.0, IntelligenceLevel.SYMBOLIC, Tone.INCONCLUSIVE, graph.trace)
              else:
@@ -127,25 +220,23 @@ class PrimersEngine:
                   response = EngineResponse(explanation, "explanation", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
 
         elif intent == Intent.INGESTION:
-            target_path = input_text.split("ingest")[-1].strip()
-            if not target_path:
-                response = EngineResponse("Usage: ingest <path_to_directory>", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, trace)
+            if not args["path"]:
+                response = EngineResponse("Usage: ingest <path_to_directory> [--fast|--full]", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, trace)
             else:
-                response = self._handle_ingest(target_path, graph)
+                response = self._handle_ingest(args["path"], graph, tier=args["tier"])
 
         elif intent == Intent.KNOWLEDGE_ACQUISITION:
-            if "sync ecosystem" in input_text.lower():
+            if command.name == "ecosystem_sync":
                 return self._handle_ecosystem_sync(graph)
             
-            parts = input_text.split("github")
-            target = parts[-1].strip() if len(parts) > 1 else ""
+            target = args["username"]
             if not target:
                 response = EngineResponse("Usage: learn from github <username>", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
             else:
                 response = self._handle_github_learning(target, graph)
 
         elif intent == Intent.EMERGENCY_TRIAGE:
-            report = input_text.split("triage")[-1].strip()
+            report = args["report"]
             if not report:
                 response = EngineResponse("Provide emergency report text for triage.", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
             else:
@@ -158,7 +249,7 @@ class PrimersEngine:
                 response = EngineResponse(msg, "triage", res['confidence'], IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace, meta=res)
 
         elif intent == Intent.RESCUE_LOGIC:
-            situation = input_text.split("rescue")[-1].strip()
+            situation = args["situation"]
             graph.add_step(Intent.RESCUE_LOGIC, "DAN-Qwen Logic", 1.0, "Generating rescue protocol via DAN-Qwen")
             logic = self.emergency.generate_rescue_logic(situation)
             response = EngineResponse(logic, "rescue", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
@@ -177,25 +268,8 @@ class PrimersEngine:
             msg = f"### VOICE GUARDIAN TRANSCRIPT\n\"{transcription}\""
             response = EngineResponse(msg, "voice", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
 
-        elif "show blueprint" in input_text.lower():
-            graph.add_step(Intent.EMPIRICAL_ANALYSIS, "Graph Assembly", 1.0, "Generating architectural blueprint")
-            blueprint = self.repo_analyst.get_blueprint()
-            response = EngineResponse(f"### ARCHITECTURAL BLUEPRINT\n{blueprint}", "analysis", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
-
-        elif "show health" in input_text.lower() or "check health" in input_text.lower():
-            response = self._handle_health_check(graph)
-
-        elif "proactive audit" in input_text.lower():
-            target = self.auditor.identify_primary_debt()
-            if target:
-                graph.add_step(Intent.SELF_CORRECTION, "Audit Initiation", 1.0, f"Autonomous trigger for {target['source']}")
-                response = self._handle_analysis(f"analyze {target['source']}", graph)
-                response.content = f"### AUTONOMOUS AUDIT INITIATED\nI am prioritizing `{target['source']}` due to high architectural debt. " + response.content
-            else:
-                response = EngineResponse("No significant architectural debt detected currently.", "info", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CALM, graph.trace)
-
         elif intent == Intent.TEACHING:
-            knowledge = input_text.split("teach:")[-1].strip()
+            knowledge = args["knowledge"]
             if knowledge:
                 self.m2.save_interaction(knowledge, knowledge, 1.0) # Self-referential teaching
                 graph.add_step(Intent.TEACHING, "Memory Update", 1.0, "Writing new pattern to Sovereign Memory")
@@ -230,10 +304,10 @@ class PrimersEngine:
 
         elif intent == Intent.APPLY_REFACTOR:
             # The frontend should send "apply refactor to [file]"
-            target_file = input_text.split("refactor to")[-1].strip()
+            target_file = args["target"]
             # We need the proposed code. In a real session, this would be in memory.
             # For now, we'll try to find the last refactor plan for this file in M1 session context.
-            last_entry = self.session.get_last_entry()
+            last_entry = session.get_last_entry()
             if last_entry and last_entry.get("meta", {}).get("target_file") == target_file:
                 proposed_code = last_entry["meta"].get("proposed_code")
                 if proposed_code:
@@ -243,9 +317,7 @@ class PrimersEngine:
 
         elif intent == Intent.UPLOAD:
             # Format: upload file: [filename]\ncontent: [content]
-            lines = input_text.split("\n")
-            filename = lines[0].replace("upload file:", "").strip()
-            content = "\n".join(lines[1:]).replace("content:", "", 1).strip()
+            filename, content = args["filename"], args["content"]
             
             graph.add_step(Intent.UPLOAD, "File Acquisition", 1.0, f"Synthesizing knowledge from uploaded file: {filename}")
             # Add to memory with the content itself as the "query" surrogate for search, or use a better topic name
@@ -262,38 +334,45 @@ class PrimersEngine:
             graph.add_step(Intent.FALLBACK, "Sovereign Chat", 0.8, "Processing via Symbolic Reasoning")
             
             # SELF-EVOLUTION: Search for similar past interactions first
-            learned = self.m2.search_interactions(input_text)
+            with graph.span("m2.search_interactions"):
+                learned = self.m2.search_interactions(input_text)
             learned_context = ""
             if learned:
                 graph.add_step(Intent.FALLBACK, "Pattern_Match", 0.9, f"Found {len(learned)} learned patterns")
                 learned_context = "\n\nLearned Knowledge from past interactions:\n" + \
                     "\n".join([f"- Previous Query: {l['query']}\n  Response: {l['response']}" for l in learned])
             
-            chat_res = self.local_llm.chat(input_text_with_context + learned_context, history=self.session.get_messages())
+            with graph.span("llm.chat"):
+                chat_res = self.local_llm.chat(input_text_with_context + learned_context, history=session.get_messages())
             response = EngineResponse(chat_res, "chat", 0.8, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
 
         if not response:
              response = self._local_reflex(input_text, graph)
 
         # M1 Update
-        self.session.log_command({
+        entry = {
             "input": input_text,
             "intent": intent.name,
             "confidence": response.confidence,
             "response_summary": response.content[:50]
-        })
-        self.session.add_message("assistant", response.content)
-        self.session.update_confidence(response.confidence)
+        }
+        if intent == Intent.PLANNING and response.meta.get("proposed_code"):
+            # Kept so 'apply refactor to <file>' works on the next turn, even after a spill
+            entry["meta"] = {"target_file": response.meta["target_file"], "proposed_code": response.meta["proposed_code"]}
+        session.log_command(entry)
+        session.add_message("assistant", response.content)
+        session.update_confidence(response.confidence)
 
         # Phase 5+: SELF-EVOLUTION - Store successful interactions in M2
         # Only store FALLBACK (Chat) responses where the AI actually learned something new or gave a good answer.
         # Avoid storing system confirmations as "knowledge".
         if response.confidence > 0.6 and intent == Intent.FALLBACK:
-            self.m2.save_interaction(input_text, response.content, response.confidence)
+            with graph.span("m2.save_interaction"):
+                self.m2.save_interaction(input_text, response.content, response.confidence)
 
         return response
 
-    def _handle_ingest(self, target_path: str, graph: ReasoningGraph) -> EngineResponse:
+    def _handle_ingest(self, target_path: str, graph: ReasoningGraph, tier: Optional[str] = None) -> EngineResponse:
         import glob
         
         if not os.path.exists(target_path):
@@ -301,92 +380,186 @@ class PrimersEngine:
              
         # Normalize path
         target_path = os.path.abspath(target_path)
+
+        if os.path.isfile(target_path):
+            return self._handle_reanalysis(target_path, graph, tier=tier)
+        if target_path not in self.ingest_roots:
+            self.ingest_roots.append(target_path)
+        self.m2.save_ingest_root(target_path)
         
         # Simple recursive walk
         count = 0
         total_loc = 0
-        
-        # Walk directory
-        for root, dirs, files in os.walk(target_path):
-            if "venv" in root or "__pycache__" in root or ".git" in root:
-                continue
-                
-            for file in files:
-                if file.endswith(".py"):
-                    full_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(full_path, target_path)
-                    try:
-                        with open(full_path, "r", encoding="utf-8") as f:
-                            content = f.read()
-                            res = self.analyzer.analyze(content, rel_path) # Layer 1
-                            self.repo_analyst.analyze_chunk(content, rel_path) # Graph Layer
+        ingested = []
+        lexical = 0
+        start = time.perf_counter()
+        
+        # Walk directory. The whole walk is published as one corpus/graph version,
+        # so concurrent readers see the previous tree until it is complete.
+        with graph.span("ingest.walk"), self.analyzer.batch(), self.repo_analyst.graph.batch():
+            for root, dirs, files in os.walk(target_path):
+                if "venv" in root or "__pycache__" in root or ".git" in root:
+                    continue
+                    
+                for file in files:
+                    if file.endswith(".py"):
+                        full_path = os.path.join(root, file)
+                        rel_path = os.path.relpath(full_path, target_path)
+                        try:
+                            res, _ = self._ingest_file(full_path, rel_path, tier=tier)
+                            ingested.append(rel_path)
                             count += 1
                             total_loc += res.loc
-                    except Exception as e:
-                        print(f"Failed to read {file}: {e}")
+                            lexical += res.tier == "lexical"
+                        except Exception as e:
+                            print(f"Failed to read {file}: {e}")
 
         if count == 0:
              return EngineResponse(f"No Python files found in {target_path}", "warning", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
 
+        # Persist edges and call edges for the whole walk, one batched transaction each
+        with graph.span("m2.persist_graph"):
+            self.m2.replace_relationships({src: self.repo_analyst.graph.owned_edges(src) for src in ingested})
+            self.m2.save_call_graph(self.call_graph, ingested)
+        elapsed = time.perf_counter() - start
+        metrics.INGEST_SECONDS.observe(elapsed)
+        metrics.INGEST_FILES.inc(amount=count)
+        metrics.INGEST_FILES_PER_SECOND.set(count / elapsed if elapsed > 0 else 0.0)
+
         # Baseline update
         baseline = self.analyzer.get_corpus_stats()
         
         msg = f"Ingested {count} files ({total_loc} lines). Corpus baseline updated (Avg Complexity: {baseline['avg_complexity']:.1f}). Ready for analysis."
+        if lexical:
+            msg += f" {lexical} file(s) used the fast lexical tier (approximate metrics, no call graph)."
         graph.add_step(Intent.INGESTION, "File Walk", 1.0, f"Scanned {count} files")
         
         return EngineResponse(msg, "ingestion", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
 
+    def _ingest_file(self, full_path: str, rel_path: str, tier: Optional[str] = None):
+        """Runs Layer 1, the graph layer and the call graph for one file, replacing its previous contribution."""
+        with open(full_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        res = self.analyzer.analyze(content, rel_path, tier=tier) # Layer 1 (tier routed by size/path unless forced)
+        change = self.repo_analyst.analyze_chunk(content, rel_path) # Graph Layer
+        self.call_graph.replace_file(rel_path, res.calls) # Call Graph
+        return res, change
+
+    def _handle_reanalysis(self, full_path: str, graph: ReasoningGraph, tier: Optional[str] = None) -> EngineResponse:
+        """
+        Incremental path: re-analyses a single file and swaps only its nodes and
+        edges, in memory and in M2, instead of re-ingesting the whole tree.
+        """
+        root = max((r for r in self.ingest_roots if full_path.startswith(r + os.sep)), key=len, default=os.getcwd())
+        rel_path = os.path.relpath(full_path, root)
+        try:
+            res, change = self._ingest_file(full_path, rel_path, tier=tier)
+        except Exception as e:
+            return EngineResponse(f"Failed to re-analyze {rel_path}: {e}", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
+
+        self.m2.replace_relationships({rel_path: self.repo_analyst.graph.owned_edges(rel_path)})
+        self.m2.save_call_graph(self.call_graph, [rel_path])
+
+        graph.add_step(Intent.INGESTION, "Incremental Update", 1.0, f"Replaced graph contribution of {rel_path}")
+        msg = (f"Re-analyzed `{rel_path}` ({res.loc} lines, {res.tier} tier): {len(change.removed_edges)} edges replaced by "
+               f"{len(change.added_edges)}, {len(change.affected_nodes)} nodes affected.")
+        return EngineResponse(msg, "ingestion", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace,
+                              meta={"source": rel_path, "tier": res.tier, "affected_nodes": sorted(change.affected_nodes)})
+
     def _handle_analysis(self, target: str, graph: ReasoningGraph) -> EngineResponse:
         # Check M2: Have we seen this before?
         known_baseline = self.m2.get_baseline(target)
         if known_baseline:
              graph.add_step(Intent.EMPIRICAL_ANALYSIS, "Memory Retrieval (M2)", 1.0, f"Found existing analysis for {target}")
 
-        if not self.analyzer.raw_data:
+        # One corpus version and one graph version for the whole run, whatever
+        # ingestion does meanwhile. Ingest publishes them one after the other,
+        # so the pair can straddle at most the ingest in flight at request start.
+        corpus = self.analyzer.snapshot()
+        topology = self.repo_analyst.graph.snapshot()
+        if not corpus.files:
             return EngineResponse("No active workspace content. Run ingestion first.", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
 
-        baseline = self.analyzer.get_corpus_stats()
+        baseline = corpus.stats
         graph.add_step(Intent.EMPIRICAL_ANALYSIS, "Baseline", 1.0, f"Baseline established: complexity~{baseline['avg_complexity']:.1f}")
         
-        full_report = "### COGNITIVE REVIEW\n"
-        targets = self.analyzer.raw_data.values() 
+        targets = list(corpus.files.values())
         overall_confidence = 0.0
         count = 0
 
-        for analysis in targets:
-            # Layer 2: Interpret
-            interp = self.heuristics.interpret(analysis, baseline)
-            
+        # Layers 2+3: reuse memoized results for unchanged files, assess the rest in one pass
+        # Counted through the compute callback: the cache's own counters are shared with other workers
+        assessed = []
+        def assess(misses, baseline):
+            assessed.append(len(misses))
+            return self._interpret_and_judge(misses, baseline)
+        with graph.span("assess"):
+            assessments = self.result_cache.resolve(targets, baseline, assess)
+        # Reported in the response meta: a reasoning step here would exceed the depth guardrail
+        reused = len(targets) - sum(assessed)
+
+        # Phase 8: Architectural Guard, evaluated once and indexed by source
+        with graph.span("guard.build_index"):
+            violation_index = self.guard.build_index(targets, topology.compact())
+
+        # Per-file results become structured rows of the run, not report text
+        rows: List[Dict[str, Any]] = []
+        snapshots: List[tuple] = []
+        role_counts: Dict[str, int] = {}
+        for analysis, (interp, judgement) in zip(targets, assessments):
             # Phase 5: Update M3 (Experience)
             # Log usage for heuristics used in interpretation
             self.m3.log_heuristic_result("complexity_heuristic", 0.8) # Mock heuristic name
             
-            # Layer 3: Judge
-            judgement = self.judge.assess(interp, analysis.raw_content if hasattr(analysis, "raw_content") else "")
-            
-            self.m2.save_analysis(analysis.source, {
+            file_health = self.guard.get_health_score(violation_index.for_source(analysis.source))
+            snapshots.append((analysis.source, {
                 "loc": analysis.loc,
                 "complexity": analysis.loc, # Compatibility
                 "role": interp.role,
                 "class_count": len(analysis.classes),
                 "function_count": len(analysis.functions),
-                "health_score": self.guard.get_health_score(self.guard.check_drift([analysis], self.repo_analyst.graph.edges))
-            })
+                "health_score": file_health
+            }))
 
             # graph.add_step moved outside to avoid RecursionError on large repos
             
-            full_report += f"\n**File**: {analysis.source}\n"
-            full_report += f"- Role: {interp.role.upper()}\n"
-            full_report += f"- Judgment: {judgement.summary}\n"
+            rows.append({
+                "file": analysis.source,
+                "role": interp.role,
+                "judgement": judgement.summary,
+                "smells": interp.smells,
+                "health": file_health,
+                "complexity": interp.relative_complexity,
+                "confidence": judgement.confidence_score
+            })
+            role_counts[interp.role] = role_counts.get(interp.role, 0) + 1
             
             overall_confidence += judgement.confidence_score
             count += 1
 
         avg_conf = overall_confidence / count if count > 0 else 0.5
-        
-        # Phase 9: Persist Relationships for Global Topology
-        for edge in self.repo_analyst.graph.edges:
-            self.m2.save_relationship(edge['source'], edge['target'], edge['relation'])
+
+        # Phase 8: Architectural Guard (Drift Check)
+        violations = violation_index.violations()
+        health_score = self.guard.get_health_score(violations)
+
+        # M2 persistence batched after the loop: one transaction per table group
+        run_id = uuid.uuid4().hex[:12]
+        with graph.span("m2.persist_run"):
+            self.m2.save_analyses(snapshots)
+            self.m2.save_analysis_run(run_id, target, health_score, avg_conf, rows)
+            # M3 is write-behind; push this run's events to the store in one batch
+            self.m3.flush()
+
+        full_report = "### COGNITIVE REVIEW\n"
+        full_report += f"**Run**: `{run_id}` ({count} files, {reused} reused from cache)\n"
+        full_report += "**Roles**: " + ", ".join(f"{role.upper()} {n}" for role, n in sorted(role_counts.items(), key=lambda kv: -kv[1])) + "\n"
+        hotspots = sorted(rows, key=lambda r: -r["complexity"])[:ANALYSIS_SUMMARY_LIMIT]
+        full_report += "\n**Hotspots** (highest relative complexity):\n"
+        for r in hotspots:
+            full_report += f"- {r['file']}: {r['role'].upper()}, {r['complexity']:.1f}x baseline, health {r['health']}/100\n"
+        if self.m2.enabled:
+            full_report += f"\nPer-file results: `GET /analysis/{run_id}?page=1&sort=-complexity`\n"
         
         # Add Graph Insights
         full_report += "\n### STRUCTURAL INSIGHTS (Knowledge Graph)\n"
@@ -395,20 +568,19 @@ class PrimersEngine:
         smells = self.repo_analyst.get_smells()
         if smells:
             full_report += "\n### ARCHITECTURAL SMELLS\n"
-            for s in smells:
+            for s in smells[:ANALYSIS_SUMMARY_LIMIT]:
                 full_report += f"- {s}\n"
+            if len(smells) > ANALYSIS_SUMMARY_LIMIT:
+                full_report += f"- ...and {len(smells) - ANALYSIS_SUMMARY_LIMIT} more\n"
 
         graph.add_step(Intent.EMPIRICAL_ANALYSIS, "Graph Synthesis", avg_conf, f"Synthesized {len(smells)} structural smells")
-
-        # Phase 8: Architectural Guard (Drift Check)
-        violations = self.guard.check_drift(list(targets), self.repo_analyst.graph.edges)
-        health_score = self.guard.get_health_score(violations)
         
         full_report += f"\n### SYSTEM HEALTH: {health_score}/100\n"
-        if violations:
-            for v in violations:
-                full_report += f"- [{v.severity.value.upper()}] **{v.policy_id}**: {v.message}\n"
-                full_report += f"  *Mitigation: {v.mitigation}*\n"
+        for v in violations[:ANALYSIS_SUMMARY_LIMIT]:
+            full_report += f"- [{v.severity.value.upper()}] **{v.policy_id}**: {v.message}\n"
+            full_report += f"  *Mitigation: {v.mitigation}*\n"
+        if len(violations) > ANALYSIS_SUMMARY_LIMIT:
+            full_report += f"- ...and {len(violations) - ANALYSIS_SUMMARY_LIMIT} more violations\n"
 
         # Phase 5: Local LLM Summary if enabled
         if self.local_llm.enabled:
@@ -417,22 +589,24 @@ class PrimersEngine:
              if llm_out['speculation']:
                   avg_conf += llm_out['conf_adj']
 
-        return EngineResponse(full_report, "analysis", avg_conf, IntelligenceLevel.HEURISTIC, graph.derive_tone(Intent.EMPIRICAL_ANALYSIS, avg_conf), graph.trace)
+        meta = {"run_id": run_id, "files": count, "reused": reused, "health_score": health_score, "roles": role_counts}
+        return EngineResponse(full_report, "analysis", avg_conf, IntelligenceLevel.HEURISTIC, graph.derive_tone(Intent.EMPIRICAL_ANALYSIS, avg_conf), graph.trace, meta=meta)
+
+    def _interpret_and_judge(self, results: List[Any], baseline: Dict[str, float]) -> List[Any]:
+        # Layers 2+3 for results the cache could not serve, fanned out by the assessor
+        return self.assessor.assess(results, baseline)
 
     def _handle_refactor_plan(self, target_file: str, graph: ReasoningGraph) -> EngineResponse:
         # Same logic as before, but ensure we don't auto-apply unless governed
-        analysis = None
-        for src, data in self.analyzer.raw_data.items():
-            if target_file in src:
-                analysis = data
-                break
-        
-        if not analysis:
-            return EngineResponse(f"File '{target_file}' not found.", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
+        corpus = self.analyzer.snapshot()
+        topology = self.repo_analyst.graph.snapshot()
+        source, error = self._resolve_target(target_file, graph, corpus)
+        if error:
+            return error
+        analysis = corpus.files[source]
 
-        baseline = self.analyzer.get_corpus_stats()
-        interp = self.heuristics.interpret(analysis, baseline)
-        judgement = self.judge.assess(interp, analysis.raw_content if hasattr(analysis, "raw_content") else "")
+        baseline = corpus.stats
+        interp, judgement = self.result_cache.resolve([analysis], baseline, self._interpret_and_judge)[0]
         
         graph.add_step(Intent.PLANNING, "Plan Generation", judgement.confidence_score, "Generated refactor plan")
         
@@ -446,10 +620,22 @@ class PrimersEngine:
 
         plan = judgement.refactor_plan
         content = f"### REFACTOR PLAN: {target_file}\n"
+        if analysis.tier == "lexical":
+            content += "*Lexical tier: metrics are approximate and call impact is unavailable. Re-ingest with --full for exact data.*\n"
         content += f"**Goal**: {plan.goal}\n"
         content += "**Steps**:\n"
         for i, step in enumerate(plan.steps):
             content += f"{i+1}. {step}\n"
+
+        dependents = self.repo_analyst.get_blast_radius(module_name(analysis.source), view=topology)
+        if dependents:
+            content += f"**Blast Radius**: {len(dependents)} file(s) depend on this module transitively.\n"
+
+        impact = self._call_impact(analysis)
+        if impact:
+            content += "**Call Impact** (callers affected by a signature change):\n"
+            for symbol, count in impact:
+                content += f"- `{symbol}`: {count} call site(s)\n"
             
         meta = {
             "target_file": target_file,
@@ -459,25 +645,89 @@ class PrimersEngine:
             
         return EngineResponse(content, "plan", judgement.confidence_score, IntelligenceLevel.HEURISTIC, graph.derive_tone(Intent.PLANNING, judgement.confidence_score), graph.trace, meta=meta)
 
+    def rank_targets(self, pattern: str, offset: int = 0, limit: int = 100, delta_k: int = 10) -> Dict[str, Any]:
+        """
+        N-way comparison of every ingested file matching `pattern` (a glob, or a
+        directory prefix when it has no wildcard). Returns a page of the ranking
+        plus pairwise percent deltas among the `delta_k` simplest files.
+        """
+        import fnmatch
+        pattern = pattern.strip().strip("`'\"").replace("\\", "/")
+        if not any(ch in pattern for ch in "*?["):
+            pattern = pattern.rstrip("/") + "/*"
+        lowered = pattern.lower()
+        analyses = [data for src, data in self.analyzer.snapshot().files.items()
+                    if fnmatch.fnmatchcase(src.replace("\\", "/").lower(), lowered)]
+
+        ranking = self.comparator.rank(analyses)
+        rows = []
+        for position, idx in enumerate(ranking.ranking[offset:offset + limit], start=offset + 1):
+            rows.append({
+                "rank": position,
+                "source": ranking.targets[idx],
+                "score": round(float(ranking.scores[idx]), 3),
+                "metrics": dict(zip(ranking.metrics, ranking.values[idx].tolist())),
+                "z_scores": {m: round(z, 3) for m, z in zip(ranking.metrics, ranking.z_scores[idx].tolist())}
+            })
+        head = ranking.ranking[:delta_k]
+        deltas = self.comparator.pairwise_deltas(ranking, head)
+        return {
+            "pattern": pattern,
+            "count": len(analyses),
+            "metrics": ranking.metrics,
+            "ranking": rows,
+            "deltas": {
+                "targets": [ranking.targets[i] for i in head],
+                "matrices": {m: deltas[k].round(1).tolist() for k, m in enumerate(ranking.metrics)}
+            }
+        }
+
+    def _handle_ranking(self, pattern: str, graph: ReasoningGraph) -> EngineResponse:
+        result = self.rank_targets(pattern, limit=ANALYSIS_SUMMARY_LIMIT)
+        if result["count"] < 2:
+            return EngineResponse(f"Need at least two ingested files matching '{result['pattern']}' to rank (found {result['count']}).", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
+
+        graph.add_step(Intent.COMPARATIVE_REASONING, "N-way Ranking", 1.0, f"Ranked {result['count']} files matching {result['pattern']}")
+        content = f"### COMPARATIVE RANKING: `{result['pattern']}` ({result['count']} files)\n"
+        content += "Simplest first; score is the mean z-score across " + ", ".join(result["metrics"]) + ".\n\n"
+        for row in result["ranking"]:
+            m = row["metrics"]
+            content += (f"{row['rank']}. `{row['source']}`: score {row['score']:+.2f} "
+                        f"(complexity {m['Complexity (Structural)']:.0f}, {m['LOC']:.0f} LOC)\n")
+        if result["count"] > len(result["ranking"]):
+            content += f"\n...{result['count'] - len(result['ranking'])} more via `GET /compare?pattern={result['pattern']}&offset={len(result['ranking'])}`\n"
+
+        self.m3.log_heuristic_result("comparator", 0.9)
+        return EngineResponse(content, "comparison", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace,
+                              meta={"pattern": result["pattern"], "count": result["count"]})
+
+    def _resolve_target(self, target: str, graph: ReasoningGraph, corpus: Optional[CorpusSnapshot] = None):
+        """Resolves a user-typed file target through the path index; returns (source, None) or (None, error response)."""
+        resolution = (corpus or self.analyzer.snapshot()).paths.resolve(target)
+        if not resolution.candidates:
+            return None, EngineResponse(f"File '{target}' not found.", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
+        if resolution.ambiguous:
+            return None, self._ambiguous_target(resolution, graph)
+        return resolution.match, None
+
+    def _ambiguous_target(self, resolution, graph: ReasoningGraph) -> EngineResponse:
+        content = f"'{resolution.target}' matches several files. Please be more specific:\n"
+        content += "\n".join(f"- `{c}`" for c in resolution.candidates)
+        return EngineResponse(content, "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace,
+                              meta={"target": resolution.target, "candidates": resolution.candidates})
+
     def _handle_comparison(self, target_a: str, target_b: str, graph: ReasoningGraph) -> EngineResponse:
         # Resolve targets to AnalysisResults
-        data_a, data_b = None, None
-        
-        # Simple fuzzy match helper
-        def find_target(t: str) -> Optional[Any]:
-            for src, data in self.analyzer.raw_data.items():
-                if t in src:
-                    return data
-            return None
-
-        data_a = find_target(target_a)
-        data_b = find_target(target_b)
-
-        if not data_a or not data_b:
-            missing = []
-            if not data_a: missing.append(target_a)
-            if not data_b: missing.append(target_b)
+        corpus = self.analyzer.snapshot()
+        resolutions = [corpus.paths.resolve(target_a), corpus.paths.resolve(target_b)]
+        missing = [r.target for r in resolutions if not r.candidates]
+        if missing:
             return EngineResponse(f"Comparison targets not found: {', '.join(missing)}", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
+        ambiguous = [r for r in resolutions if r.ambiguous]
+        if ambiguous:
+            return self._ambiguous_target(ambiguous[0], graph)
+
+        data_a, data_b = (corpus.files[r.match] for r in resolutions)
 
         # Execute Comparison
         result = self.comparator.compare(data_a, data_b)
@@ -500,6 +750,57 @@ class PrimersEngine:
         
         return EngineResponse(content, "comparison", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace)
 
+    def _call_impact(self, analysis, limit: int = 5):
+        """Top functions/methods of a file ranked by how many symbols call them."""
+        module = module_name(analysis.source)
+        symbols = [f"{module}.{f.name}" for f in analysis.functions]
+        symbols += [f"{module}.{c.name}.{m.name}" for c in analysis.classes for m in c.methods]
+        counts = [(s, self.call_graph.caller_count(s)) for s in symbols]
+        return sorted([c for c in counts if c[1] > 0], key=lambda c: -c[1])[:limit]
+
+    def _handle_call_graph(self, symbol: str, wants_callees: bool, graph: ReasoningGraph) -> EngineResponse:
+        if not symbol:
+            return EngineResponse("Usage: callers of <function> | callees of <function>", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
+
+        results = self.call_graph.callees(symbol) if wants_callees else self.call_graph.callers(symbol)
+        direction = "CALLEES" if wants_callees else "CALLERS"
+        graph.add_step(Intent.CALL_GRAPH, "Call Graph Lookup", 1.0, f"Resolved {len(results)} symbol(s) for '{symbol}'")
+
+        if not results:
+            return EngineResponse(f"No call-graph entries found for '{symbol}'. Ingest the workspace first.", "call_graph", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
+
+        content = f"### {direction}: `{symbol}`\n"
+        for resolved, related in results.items():
+            content += f"\n**{resolved}** ({len(related)})\n"
+            content += "\n".join(f"- `{r}`" for r in related) + "\n" if related else "- (none)\n"
+        return EngineResponse(content, "call_graph", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace, meta={"symbol": symbol, direction.lower(): results})
+
+    def find_duplicates(self, kind: str = "function", threshold: float = 0.8, limit: int = 50) -> List[Dict[str, Any]]:
+        # Signatures are refreshed only for files whose content changed since the last query
+        self.clones.refresh(list(self.analyzer.raw_data.values()))
+        return self.clones.find_clusters(kind=kind, threshold=threshold, limit=limit)
+
+    def _handle_duplicates(self, kind: str, threshold: float, graph: ReasoningGraph) -> EngineResponse:
+        if not self.analyzer.raw_data:
+            return EngineResponse("No active workspace content. Run ingestion first.", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.ASSERTIVE, graph.trace)
+
+        clusters = self.find_duplicates(kind=kind, threshold=threshold, limit=ANALYSIS_SUMMARY_LIMIT)
+        excluded = self.clones.excluded()
+        graph.add_step(Intent.FIND_DUPLICATES, "Clone Detection", 1.0, f"Found {len(clusters)} {kind} clone cluster(s) at similarity >= {threshold}")
+        # Lexical-tier files have no AST to compare, so say they were not checked
+        note = f"\n_{excluded} lexical-tier file(s) excluded; re-ingest with --full to include them._\n" if excluded else ""
+
+        if not clusters:
+            return EngineResponse(f"No duplicate {kind}s found at similarity >= {threshold}.{note}", "duplicates", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace, meta={"clusters": [], "excluded_lexical": excluded})
+
+        content = f"### DUPLICATE {kind.upper()}S (similarity >= {threshold})\n{note}"
+        for i, cluster in enumerate(clusters, 1):
+            content += f"\n**Cluster {i}** ({len(cluster['members'])} members, ~{cluster['similarity']:.0%} similar)\n"
+            for member in cluster["members"]:
+                label = member["source"] if kind == "file" else f"{member['source']}: {member['name']}"
+                content += f"- `{label}`\n"
+        return EngineResponse(content, "duplicates", 1.0, IntelligenceLevel.HEURISTIC, Tone.ASSERTIVE, graph.trace, meta={"clusters": clusters, "excluded_lexical": excluded})
+
     def _local_reflex(self, text: str, graph: ReasoningGraph) -> EngineResponse:
         triggers = {
             "status": "Cognition Stack: ONLINE. Governance: ACTIVE.",
@@ -557,7 +858,7 @@ class PrimersEngine:
                 data.get("class_count", 0)
             ))
 
-        violations = self.guard.check_drift(targets, self.repo_analyst.graph.edges)
+        violations = self.guard.check_drift(targets, self.repo_analyst.graph.compact())
         score = self.guard.get_health_score(violations)
         
         content = f"### ARCHITECTURAL HEALTH SCORE: {score}/100\n"
@@ -625,11 +926,9 @@ class PrimersEngine:
         try:
             # 1. Resolve Path (fuzzy match as we do in ingest)
             # Find the actual path from analyzer
-            full_path = None
-            for src in self.analyzer.raw_data.keys():
-                if target_file in src:
-                    full_path = src
-                    break
+            full_path, error = self._resolve_target(target_file, graph)
+            if error:
+                return error
             
             if not full_path or not os.path.exists(full_path):
                  return EngineResponse(f"Security Block: Could not verify absolute path for '{target_file}'", "error", 1.0, IntelligenceLevel.SYMBOLIC, Tone.CAUTIOUS, graph.trace)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, Iterator, Tuple
 import enum
+from knowledge.graph import CompactGraph
 
 class PolicySeverity(enum.Enum):
     INFO = "info"
@@ -17,6 +18,27 @@ class PolicyViolation:
     target: str # File or module name
     mitigation: str
 
+class ViolationIndex:
+    """Violations bucketed by the source file they belong to."""
+    def __init__(self):
+        self._files: Dict[str, List[PolicyViolation]] = {}
+        self._edges: Dict[str, List[PolicyViolation]] = {}
+
+    def add_file(self, source: str, violations: List[PolicyViolation]):
+        if violations:
+            self._files.setdefault(source, []).extend(violations)
+
+    def add_edges(self, source: str, violations: List[PolicyViolation]):
+        if violations:
+            self._edges.setdefault(source, []).extend(violations)
+
+    def for_source(self, source: str) -> List[PolicyViolation]:
+        return self._files.get(source, []) + self._edges.get(source, [])
+
+    def violations(self) -> List[PolicyViolation]:
+        """All violations: file rules in result order, then edge rules grouped by source."""
+        return [v for vs in self._files.values() for v in vs] + [v for vs in self._edges.values() for v in vs]
+
 class PolicyGuard:
     """
     PHASE 8: ARCHITECTURAL GUARD
@@ -32,51 +54,92 @@ class PolicyGuard:
                 "cognition": ["main"]
             }
         }
+        self._edge_graph: Optional[CompactGraph] = None
+        self._edge_generation = -1
+        self._edge_cache: Dict[str, List[PolicyViolation]] = {}
 
-    def check_drift(self, analysis_results: List[Any], edges: List[Dict[str, str]]) -> List[PolicyViolation]:
-        violations = []
-        
+    def check_drift(self, analysis_results: List[Any], edges: Union[CompactGraph, List[Dict[str, str]]]) -> List[PolicyViolation]:
+        return self.build_index(analysis_results, edges).violations()
+
+    def build_index(self, analysis_results: List[Any], edges: Union[CompactGraph, List[Dict[str, str]]]) -> ViolationIndex:
+        """
+        Evaluates file rules per result and edge rules once over the graph, bucketing
+        every violation under the source it belongs to. Per-file health then costs
+        a dictionary lookup instead of another scan of the edges.
+        """
+        index = ViolationIndex()
         # 1. Inspect Results
         for res in analysis_results:
-            # Check LOC
-            if res.loc > self.rules["MAX_LOC"]:
-                violations.append(PolicyViolation(
-                    "MAX_LOC",
-                    f"Module '{res.source}' exceeds LOC budget ({res.loc}/{self.rules['MAX_LOC']})",
-                    PolicySeverity.WARNING,
-                    res.source,
-                    "Consider splitting into smaller sub-modules."
-                ))
-            
-            # Check Cohesion (God Object Lite)
-            class_count = len(res.classes)
-            if class_count > self.rules["COHESION_THRESHOLD"]:
-                violations.append(PolicyViolation(
-                    "LOW_COHESION",
-                    f"Module '{res.source}' contains {class_count} classes. High risk of low cohesion.",
-                    PolicySeverity.WARNING,
-                    res.source,
-                    "Group related classes into a new package."
-                ))
-
+            index.add_file(res.source, self._check_result(res))
         # 2. Inspect Dependencies (Edges)
-        for edge in edges:
-            source = edge["source"].lower()
-            target = edge["target"].lower()
-            
-            for base, forbidden in self.rules["FORBIDDEN_DEPS"].items():
-                if base in source:
-                    if any(f in target for f in forbidden):
-                        violations.append(PolicyViolation(
-                            "DEPENDENCY_INVERSION_VIOLATION",
-                            f"Architetcural Leak: Lower-level '{source}' depends on higher-level '{target}'",
-                            PolicySeverity.BLOCKER,
-                            source,
-                            "Refactor interfaces to use dependency injection or abstract base classes."
-                        ))
+        for source, violations in self._edge_violations(edges).items():
+            index.add_edges(source, violations)
+        return index
+
+    def _check_result(self, res: Any) -> List[PolicyViolation]:
+        violations = []
+        # Check LOC
+        if res.loc > self.rules["MAX_LOC"]:
+            violations.append(PolicyViolation(
+                "MAX_LOC",
+                f"Module '{res.source}' exceeds LOC budget ({res.loc}/{self.rules['MAX_LOC']})",
+                PolicySeverity.WARNING,
+                res.source,
+                "Consider splitting into smaller sub-modules."
+            ))
         
+        # Check Cohesion (God Object Lite)
+        class_count = len(res.classes)
+        if class_count > self.rules["COHESION_THRESHOLD"]:
+            violations.append(PolicyViolation(
+                "LOW_COHESION",
+                f"Module '{res.source}' contains {class_count} classes. High risk of low cohesion.",
+                PolicySeverity.WARNING,
+                res.source,
+                "Group related classes into a new package."
+            ))
         return violations
 
+    def _edge_violations(self, edges: Union[CompactGraph, List[Dict[str, str]]]) -> Dict[str, List[PolicyViolation]]:
+        """Edge-rule violations keyed by edge source; cached per CompactGraph generation."""
+        if isinstance(edges, CompactGraph) and edges is self._edge_graph and edges.generation == self._edge_generation:
+            return self._edge_cache
+
+        by_source: Dict[str, List[PolicyViolation]] = {}
+        rules = self.rules["FORBIDDEN_DEPS"].items()
+        # Which rules apply depends only on the source, so resolve them once per source
+        applicable: Dict[str, List[List[str]]] = {}
+        for raw_source, raw_target in self._iter_edges(edges):
+            forbidden_sets = applicable.get(raw_source)
+            if forbidden_sets is None:
+                lowered = raw_source.lower()
+                forbidden_sets = applicable[raw_source] = [forbidden for base, forbidden in rules if base in lowered]
+            if not forbidden_sets:
+                continue
+            source, target = raw_source.lower(), raw_target.lower()
+            for forbidden in forbidden_sets:
+                if any(f in target for f in forbidden):
+                    by_source.setdefault(raw_source, []).append(PolicyViolation(
+                        "DEPENDENCY_INVERSION_VIOLATION",
+                        f"Architetcural Leak: Lower-level '{source}' depends on higher-level '{target}'",
+                        PolicySeverity.BLOCKER,
+                        source,
+                        "Refactor interfaces to use dependency injection or abstract base classes."
+                    ))
+
+        if isinstance(edges, CompactGraph):
+            self._edge_graph, self._edge_generation, self._edge_cache = edges, edges.generation, by_source
+        return by_source
+
+    @staticmethod
+    def _iter_edges(edges: Union[CompactGraph, List[Dict[str, str]]]) -> Iterator[Tuple[str, str]]:
+        if isinstance(edges, CompactGraph):
+            for source, target, _ in edges.iter_edges():
+                yield source, target
+        else:
+            for edge in edges:
+                yield edge["source"], edge["target"]
+
     def get_health_score(self, violations: List[PolicyViolation]) -> int:
         score = 100
         for v in violations:
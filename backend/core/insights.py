@@ -11,13 +11,18 @@ class ExecutiveInsights:
     COMMERCIAL LAYER: Transforms raw architectural data into high-level business intelligence.
     Designed for CTO/VPE personas to track ROI, Risk, and Velocity.
     """
-    def __init__(self, m2_store):
+    def __init__(self, m2_store, graph_provider=None):
         self.m2 = m2_store
+        # Shared CSR topology (engine graph); falls back to loading it from M2
+        self.graph_provider = graph_provider or m2_store.load_graph
         self.guardrails = SovereignGuardrails()
         # Initialize Risk Engine with scratch root
         current_dir = os.path.dirname(__file__)
         scratch_root = os.path.abspath(os.path.join(current_dir, "..", "..", ".."))
-        self.risk_engine = RiskScoringCore(scratch_root)
+        self.risk_engine = RiskScoringCore(
+            scratch_root,
+            criticality_measure=os.getenv("PRIMERS_CRITICALITY_MEASURE", "reach")
+        )
 
     def generate_report(self) -> Dict[str, Any]:
         """
@@ -54,7 +59,7 @@ class ExecutiveInsights:
         compliance_score = max(0, 100 - (len(violations) * 2))
 
         # 7. Systemic Fragility Mapping (V4 Core)
-        graph = self.m2.get_graph()
+        graph = self.graph_provider()
         risk_nodes = self.risk_engine.compute_risk(analyses, graph)
         
         # Extract Top 3 Hotspots (Highest Total Risk)
@@ -1,5 +1,8 @@
 
+import re
+from dataclasses import dataclass, field
 from enum import Enum, auto
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 class Intent(Enum):
     EMPIRICAL_ANALYSIS = auto()
@@ -17,54 +20,225 @@ class Intent(Enum):
     RESCUE_LOGIC = auto()
     VISION_WITNESS = auto()
     VOICE_GUARDIAN = auto()
+    CALL_GRAPH = auto()
+    FIND_DUPLICATES = auto()
     FALLBACK = auto()
 
+@dataclass
+class Command:
+    intent: Intent
+    name: str # the matching CommandSpec; several commands can share an intent
+    args: Dict[str, Any] = field(default_factory=dict)
+
+# Keyword hits for one input: keyword -> [(start, end)] character spans, in order
+Hits = Dict[str, List[Tuple[int, int]]]
+ArgParser = Callable[[str, Hits], Dict[str, Any]]
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """
+    One row of the command table. A spec matches when the input starts with
+    one of `leading`, or when every clause of `when` is satisfied; a clause is
+    a tuple of alternative keywords. Keywords are whole words or two-word
+    phrases; a trailing '*' matches any word starting with the stem.
+    """
+    name: str
+    intent: Intent
+    when: Tuple[Tuple[str, ...], ...] = ()
+    leading: Tuple[str, ...] = ()
+    args: Optional[ArgParser] = None
+
+def _after(text: str, hits: Hits, *keywords: str) -> str:
+    """Text following the last occurrence of any of `keywords` (all of `text` if none occurred)."""
+    ends = [end for kw in keywords for _, end in hits.get(kw, ())]
+    return text[max(ends):].strip() if ends else text.strip()
+
+def _rest(name: str, *keywords: str) -> ArgParser:
+    return lambda text, hits: {name: _after(text, hits, *keywords)}
+
+def _strip_prefix(text: str, prefix: str) -> str:
+    return text.strip()[len(prefix):].strip()
+
+def _ingest_args(text: str, hits: Hits) -> Dict[str, Any]:
+    # Path follows the first 'ingest'; later ones may be part of the path itself.
+    # Per-ingest tier flags: --fast (token scan for every file), --full (AST for every file)
+    spans = hits.get("ingest*")
+    words = (text[spans[0][1]:] if spans else _strip_prefix(text, "ingest")).split()
+    tier = None
+    for flag, forced in (("--fast", "lexical"), ("--full", "ast")):
+        if flag in words:
+            tier = forced
+            words = [w for w in words if w != flag]
+    return {"path": " ".join(words), "tier": tier}
+
+def _upload_args(text: str, hits: Hits) -> Dict[str, Any]:
+    # Format: upload file: [filename]\ncontent: [content]
+    lines = text.split("\n")
+    return {
+        "filename": lines[0].strip()[len("upload file:"):].strip(),
+        "content": "\n".join(lines[1:]).replace("content:", "", 1).strip()
+    }
+
+def _call_graph_args(text: str, hits: Hits) -> Dict[str, Any]:
+    wants_callees = "callees of" in hits
+    if not wants_callees and "callers of" not in hits:
+        symbol = _strip_prefix(text, "who calls")
+    else:
+        symbol = _after(text, hits, "callees of" if wants_callees else "callers of")
+    return {"symbol": symbol.strip(" `'\":?"), "callees": wants_callees}
+
+def _duplicates_args(text: str, hits: Hits) -> Dict[str, Any]:
+    normalized = text.lower()
+    match = re.search(r"\b(0?\.\d+|1\.0)\b", normalized)
+    return {
+        "kind": "file" if re.search(r"\bfiles?\b", normalized) else "function",
+        "threshold": float(match.group(1)) if match else 0.8
+    }
+
+def _compare_args(text: str, hits: Hits) -> Dict[str, Any]:
+    # 'compare <a> vs <b>' is a pairwise comparison; 'compare <glob>' ranks a set
+    spans = hits.get("vs", [])
+    if len(spans) == 1:
+        start, end = spans[0]
+        leads = [e for _, e in hits.get("compare*", ()) if e <= start]
+        return {"a": text[leads[0] if leads else 0:start].strip(), "b": text[end:].strip()}
+    if text.strip().lower().startswith("compare "):
+        return {"pattern": _strip_prefix(text, "compare")}
+    return {}
+
+def _analysis_args(text: str, hits: Hits) -> Dict[str, Any]:
+    return {"target": text.split(" ")[-1] if " " in text else "corpus"}
+
+def _apply_args(text: str, hits: Hits) -> Dict[str, Any]:
+    # 'apply refactor to <file>'
+    target = _after(text, hits, "refactor*")
+    return {"target": target[3:].strip() if target.lower().startswith("to ") else target}
+
+def _blueprint_args(text: str, hits: Hits) -> Dict[str, Any]:
+    """'show blueprint [package|directory|file] [expand <cluster>] [top <k>]'."""
+    from cognition.analyst import BLUEPRINT_LEVELS, DEFAULT_BLUEPRINT_TOP_K
+
+    raw = _after(text, hits, "show blueprint")
+    args = raw.lower()
+    # Cluster names are matched case-sensitively, so keep the original spelling
+    expand_match = re.search(r"\bexpand\s+(\S+)", raw, re.IGNORECASE)
+    top_match = re.search(r"\btop\s+(\d+)", args)
+    return {
+        "level": next((l for l in BLUEPRINT_LEVELS if re.search(rf"\b{l}\b", args)), "package"),
+        "expand": expand_match.group(1) if expand_match else None,
+        "top_k": int(top_match.group(1)) if top_match else DEFAULT_BLUEPRINT_TOP_K
+    }
+
+# Highest priority first: when several specs match, the earliest row wins.
+COMMAND_TABLE: Tuple[CommandSpec, ...] = (
+    # Priority 0: Prefixed commands and conversational fillers
+    CommandSpec("teach", Intent.TEACHING, leading=("teach:",), args=lambda text, hits: {"knowledge": _strip_prefix(text, "teach:")}),
+    CommandSpec("upload", Intent.UPLOAD, leading=("upload file:",), args=_upload_args),
+    # Paths may contain other command words ('analyzer.py')
+    CommandSpec("ingest", Intent.INGESTION, leading=("ingest ",), args=_ingest_args),
+    CommandSpec("filler", Intent.FALLBACK, leading=("hey", "hello", "hi", "how are you", "who are you", "good morning")),
+
+    # Priority 1: Technical Commands
+    CommandSpec("call_graph", Intent.CALL_GRAPH, when=(("callers of", "callees of"),), leading=("who calls",), args=_call_graph_args),
+    CommandSpec("duplicates", Intent.FIND_DUPLICATES, when=(("duplicate*", "clones"),), args=_duplicates_args),
+    CommandSpec("compare", Intent.COMPARATIVE_REASONING, when=(("compare*", "vs"),), args=_compare_args),
+    CommandSpec("blueprint", Intent.EMPIRICAL_ANALYSIS, when=(("show blueprint",),), args=_blueprint_args),
+    CommandSpec("health", Intent.VALIDATION, when=(("show health", "check health"),)),
+    CommandSpec("audit", Intent.EMPIRICAL_ANALYSIS, when=(("proactive audit",),)),
+    CommandSpec("plan", Intent.PLANNING, when=(("plan", "plans", "planning"), ("refactor*",)), args=_rest("target", "refactor*")),
+    CommandSpec("apply", Intent.APPLY_REFACTOR, when=(("apply",), ("refactor*",)), args=_apply_args),
+    CommandSpec("analyze", Intent.EMPIRICAL_ANALYSIS, when=(("analyze*", "review*"),), args=_analysis_args),
+    CommandSpec("explain", Intent.EXPLANATION, when=(("why", "explain*"),)),
+    CommandSpec("validate", Intent.VALIDATION, when=(("validate*", "check*"),)),
+    CommandSpec("ingest_any", Intent.INGESTION, when=(("ingest*",),), args=_ingest_args),
+    CommandSpec("ecosystem_sync", Intent.KNOWLEDGE_ACQUISITION, when=(("sync",), ("ecosystem",))),
+    CommandSpec("learn", Intent.KNOWLEDGE_ACQUISITION, when=(("learn*", "github"),), args=lambda text, hits: {"username": _after(text, hits, "github") if "github" in hits else ""}),
+    CommandSpec("executive", Intent.EXECUTIVE_INSIGHTS, when=(("executive", "report*", "cto"),)),
+    CommandSpec("triage", Intent.EMERGENCY_TRIAGE, when=(("triage", "emergency"),), args=_rest("report", "triage")),
+    CommandSpec("rescue", Intent.RESCUE_LOGIC, when=(("rescue", "logic", "protocol*"),), args=_rest("situation", "rescue")),
+    CommandSpec("witness", Intent.VISION_WITNESS, when=(("witness", "image*", "detect*"),)),
+    CommandSpec("voice", Intent.VOICE_GUARDIAN, when=(("audio", "voice", "listen*"),)),
+)
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
 class IntentRouter:
+    """
+    Compiles the command table once. Leading forms become one anchored regex;
+    keywords go into hash tables (exact words and two-word phrases, plus stems
+    bucketed by length). Routing tokenizes the input in a single pass and does
+    a fixed number of lookups per word, so its cost depends on the input, not
+    on how many commands the table holds.
+    """
+    def __init__(self, table: Tuple[CommandSpec, ...] = COMMAND_TABLE):
+        self.table = table
+        self._exact: Dict[str, List[Tuple[int, int]]] = {}  # keyword -> [(spec index, clause index)]
+        self._stems: Dict[str, List[Tuple[int, int]]] = {}
+        leading = []
+        for i, spec in enumerate(table):
+            for j, clause in enumerate(spec.when):
+                for keyword in clause:
+                    target = self._stems if keyword.endswith("*") else self._exact
+                    target.setdefault(keyword.rstrip("*"), []).append((i, j))
+            for k, lead in enumerate(spec.leading):
+                # Leading words must end at a word boundary ('who calls?', 'who calls:');
+                # 'teach:' style prefixes need not. An argument-less filler must be
+                # followed by a space, so 'hi, can you analyze corpus' is routed on its keywords.
+                if not lead[-1].isalnum():
+                    tail = ""
+                else:
+                    tail = r"(?=\W|$)" if spec.args else r"(?=\s|$)"
+                leading.append(f"(?P<l{i}_{k}>{re.escape(lead)}{tail})")
+        self._leading = re.compile("|".join(leading)) if leading else None
+        self._stem_lengths = sorted({len(s) for s in self._stems})
+
     def route(self, user_input: str) -> Intent:
-        normalized = user_input.lower().strip()
-        
-        # Priority 0: Conversational Fillers (Always Fallback)
-        if normalized.startswith("teach:"):
-            return Intent.TEACHING
-        if normalized.startswith("upload file:"):
-            return Intent.UPLOAD
-
-        fillers = ["hey", "hello", "hi", "how are you", "who are you", "good morning"]
-        if any(normalized == f or normalized.startswith(f + " ") for f in fillers):
-            return Intent.FALLBACK
-
-        # Priority 1: Technical Commands
-        if "compare" in normalized or "vs" in normalized:
-            return Intent.COMPARATIVE_REASONING
-        if "plan" in normalized and "refactor" in normalized:
-            return Intent.PLANNING
-        if "analyze" in normalized or "review" in normalized:
-            return Intent.EMPIRICAL_ANALYSIS
-        if "why" in normalized or "explain" in normalized:
-            return Intent.EXPLANATION
-        if "validate" in normalized or "check" in normalized:
-            return Intent.VALIDATION
-        if "ingest" in normalized:
-            return Intent.INGESTION
-        if "learn" in normalized or "github" in normalized:
-            return Intent.KNOWLEDGE_ACQUISITION
-        
-        if "executive" in normalized or "report" in normalized or "cto" in normalized:
-            return Intent.EXECUTIVE_INSIGHTS
-            
-        if "sync" in normalized and "ecosystem" in normalized:
-            return Intent.KNOWLEDGE_ACQUISITION
-            
-        if "apply" in normalized and "refactor" in normalized:
-            return Intent.APPLY_REFACTOR
-            
-        if "triage" in normalized or "emergency" in normalized:
-            return Intent.EMERGENCY_TRIAGE
-        if "rescue" in normalized or "logic" in normalized or "protocol" in normalized:
-            return Intent.RESCUE_LOGIC
-        if "witness" in normalized or "image" in normalized or "detect" in normalized:
-            return Intent.VISION_WITNESS
-        if "audio" in normalized or "voice" in normalized or "listen" in normalized:
-            return Intent.VOICE_GUARDIAN
-            
-        return Intent.FALLBACK
+        return self.parse(user_input).intent
+
+    def parse(self, user_input: str) -> Command:
+        """Intent plus typed arguments for `user_input`."""
+        text = user_input.strip()
+        normalized = text.lower()
+        # Argument spans index into the original text unless lowercasing changed its length
+        source = text if len(normalized) == len(text) else normalized
+
+        best: Optional[int] = None
+        if self._leading is not None:
+            match = self._leading.match(normalized)
+            if match:
+                best = int(match.lastgroup[1:].split("_")[0])
+
+        hits: Hits = {}
+        satisfied: Dict[int, set] = {}
+
+        def record(keyword: str, entries: List[Tuple[int, int]], start: int, end: int):
+            hits.setdefault(keyword, []).append((start, end))
+            for spec, clause in entries:
+                satisfied.setdefault(spec, set()).add(clause)
+
+        words = [(m.group(), m.start(), m.end()) for m in _WORD.finditer(normalized)]
+        for n, (word, start, end) in enumerate(words):
+            entries = self._exact.get(word)
+            if entries:
+                record(word, entries, start, end)
+            if n + 1 < len(words):
+                phrase = f"{word} {words[n + 1][0]}"
+                entries = self._exact.get(phrase)
+                if entries:
+                    record(phrase, entries, start, words[n + 1][2])
+            for length in self._stem_lengths:
+                if length > len(word):
+                    break
+                entries = self._stems.get(word[:length])
+                if entries:
+                    record(word[:length] + "*", entries, start, end)
+
+        for spec, clauses in satisfied.items():
+            if (best is None or spec < best) and len(clauses) == len(self.table[spec].when):
+                best = spec
+
+        if best is None:
+            return Command(Intent.FALLBACK, "fallback")
+        spec = self.table[best]
+        args = spec.args(source, hits) if spec.args else {}
+        return Command(spec.intent, spec.name, args)
@@ -1,29 +1,266 @@
 
-from typing import Dict, List, Any, Optional
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Any, Optional, Tuple
+
+# Per-session buffer bounds
+MESSAGE_LIMIT = 20
+HISTORY_LIMIT = 50
+CONFIDENCE_LIMIT = 100
+# Strings at least this long are spilled as content-addressed blobs, not inline
+BLOB_THRESHOLD = 4096
+SESSION_STATE_VERSION = 1
+
+def _entry_size(entry: Any) -> int:
+    """Approximate footprint of a buffered entry: its strings dominate."""
+    if isinstance(entry, str):
+        return sys.getsizeof(entry)
+    if isinstance(entry, dict):
+        return sys.getsizeof(entry) + sum(_entry_size(k) + _entry_size(v) for k, v in entry.items())
+    if isinstance(entry, (list, tuple)):
+        return sys.getsizeof(entry) + sum(_entry_size(v) for v in entry)
+    return sys.getsizeof(entry)
 
 class SessionContext:
     def __init__(self):
         self.active_repo: Optional[str] = None
-        self.history: List[Dict[str, Any]] = [] # Command metadata
-        self.messages: List[Dict[str, str]] = [] # Full conversation history
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_LIMIT) # Command metadata
+        self.messages: Deque[Dict[str, str]] = deque(maxlen=MESSAGE_LIMIT) # Recent conversation
         self.cached_graphs: Dict[str, Any] = {}
-        self.confidence_trend: List[float] = []
+        self.confidence_trend: Deque[float] = deque(maxlen=CONFIDENCE_LIMIT)
+        self.last_seen = time.monotonic()
+        self.nbytes = 0 # Running estimate of the buffered payloads
+
+    def _push(self, buffer: deque, entry: Any):
+        # A full deque drops its oldest entry on append; keep the estimate in step
+        if len(buffer) == buffer.maxlen:
+            self.nbytes -= _entry_size(buffer[0])
+        buffer.append(entry)
+        self.nbytes += _entry_size(entry)
 
     def update_confidence(self, score: float):
-        self.confidence_trend.append(score)
+        self._push(self.confidence_trend, score)
 
     def log_command(self, step_data: Dict[str, Any]):
-        self.history.append(step_data)
+        self._push(self.history, step_data)
 
     def add_message(self, role: str, content: str):
-        self.messages.append({"role": role, "content": content})
-        # Keep history manageable (last 20 messages)
-        if len(self.messages) > 20:
-            self.messages.pop(0)
+        self._push(self.messages, {"role": role, "content": content})
 
     def get_messages(self) -> List[Dict[str, str]]:
-        return self.messages
+        return list(self.messages)
 
     def get_last_entry(self) -> Optional[Dict[str, Any]]:
         return self.history[-1] if self.history else None
 
+    def to_state(self) -> Tuple[str, Dict[str, str]]:
+        """
+        Compact JSON for spilling, plus the blobs it references. Long strings
+        (refactor code, long replies) become {"$blob": sha1} so identical
+        payloads are stored once however many sessions hold them.
+        """
+        blobs: Dict[str, str] = {}
+
+        def externalize(value: Any) -> Any:
+            if isinstance(value, str) and len(value) >= BLOB_THRESHOLD:
+                digest = hashlib.sha1(value.encode("utf-8", "surrogatepass")).hexdigest()
+                blobs[digest] = value
+                return {"$blob": digest}
+            if isinstance(value, dict):
+                return {k: externalize(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [externalize(v) for v in value]
+            return value
+
+        state = {
+            "v": SESSION_STATE_VERSION,
+            "active_repo": self.active_repo,
+            "history": externalize(list(self.history)),
+            "messages": externalize(list(self.messages)),
+            "confidence": list(self.confidence_trend)
+        }
+        return json.dumps(state, separators=(",", ":")), blobs
+
+    @classmethod
+    def from_state(cls, payload: str, blobs: Dict[str, str]) -> "SessionContext":
+        def internalize(value: Any) -> Any:
+            if isinstance(value, dict):
+                if len(value) == 1 and "$blob" in value:
+                    return blobs.get(value["$blob"], "")
+                return {k: internalize(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [internalize(v) for v in value]
+            return value
+
+        state = json.loads(payload)
+        session = cls()
+        session.active_repo = state.get("active_repo")
+        for entry in internalize(state.get("history", [])):
+            session.log_command(entry)
+        for message in internalize(state.get("messages", [])):
+            session.add_message(message["role"], message["content"])
+        for score in state.get("confidence", []):
+            session.update_confidence(score)
+        return session
+
+class SessionStore:
+    """
+    M1 SESSION STORE
+    One SessionContext per caller (auth token or client id). Sessions are kept
+    in least-recently-used order, so idle ones sit at the front: anything past
+    `ttl` seconds is dropped from there, then the oldest until the store is
+    within `max_sessions` and `max_bytes`. The session being served is never
+    evicted by its own request.
+
+    With an M2 `store`, sessions idle for `spill_after` seconds (or pushed out
+    by the limits) are serialized to M2 instead of dropped, and rehydrated on
+    the caller's next request; spilled sessions expire `ttl` after they were
+    last seen. M2 reads and writes happen outside the session lock, under a
+    separate I/O lock: a session whose spill is still being written stays in
+    `_spilling` and is taken back from there if its caller returns meanwhile.
+    """
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600.0, max_bytes: int = 64 * 1024 * 1024,
+                 spill_after: float = 300.0, store=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.spill_after = spill_after
+        self.store = store if store is not None and store.enabled else None
+        self._sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        # Evicted sessions whose M2 write is not yet committed, with a token per eviction
+        self._spilling: Dict[str, Tuple[SessionContext, object]] = {}
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self.evictions = 0
+        self.spilled = 0
+        self.rehydrated = 0
+
+    def get(self, session_id: str) -> SessionContext:
+        """The caller's session, created (or rehydrated from M2) on first use and marked most recently used."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._claim(session_id)
+        if session is None and self.store is not None:
+            with self._io_lock:
+                # Re-checked under the I/O lock, so two first requests cannot both rehydrate
+                with self._lock:
+                    session = self._claim(session_id)
+                if session is None:
+                    session = self._rehydrate(session_id) or SessionContext()
+                    with self._lock:
+                        self._sessions[session_id] = session
+        with self._lock:
+            # It may have been evicted by another request since it was found
+            current = self._claim(session_id)
+            session = current or session or SessionContext()
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            victims = self._evict(now)
+        self._spill(victims)
+        return session
+
+    def _claim(self, session_id: str) -> Optional[SessionContext]:
+        # Caller holds the lock. A session still being spilled is taken back into memory.
+        session = self._sessions.get(session_id)
+        if session is None:
+            staged = self._spilling.pop(session_id, None)
+            if staged is not None:
+                session = self._sessions[session_id] = staged[0]
+        return session
+
+    def _rehydrate(self, session_id: str) -> Optional[SessionContext]:
+        # Caller holds the I/O lock
+        spilled = self.store.pop_session(session_id)
+        if spilled is None:
+            return None
+        self.rehydrated += 1
+        return SessionContext.from_state(*spilled)
+
+    def _evict(self, now: float) -> List[Tuple[str, object, tuple]]:
+        # Caller holds the lock. The newest entry is the caller's own session.
+        # Returns the victims to spill, serialized here so the state is consistent.
+        idle_limit = self.ttl if self.store is None else min(self.ttl, self.spill_after)
+        total = self._total_bytes()
+        victims: List[Tuple[str, object, tuple]] = []
+        while len(self._sessions) > 1:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if (now - oldest.last_seen <= idle_limit
+                    and len(self._sessions) <= self.max_sessions
+                    and total <= self.max_bytes):
+                break
+            del self._sessions[oldest_id]
+            total -= oldest.nbytes
+            self.evictions += 1
+            if self.store is not None:
+                victims.append(self._stage(oldest_id, oldest))
+        return victims
+
+    def _stage(self, session_id: str, session: SessionContext) -> Tuple[str, object, tuple]:
+        # Caller holds the lock. Spilled rows carry wall-clock last_seen, so M2 expiry is `ttl` after it.
+        token = object()
+        self._spilling[session_id] = (session, token)
+        last_seen = time.time() - (time.monotonic() - session.last_seen)
+        return session_id, token, (session_id, *session.to_state(), last_seen)
+
+    def _spill(self, victims: List[Tuple[str, object, tuple]]):
+        if not victims:
+            return
+        with self._io_lock:
+            self.store.save_sessions([row for _, _, row in victims], max_age=self.ttl)
+            with self._lock:
+                reclaimed = []
+                for session_id, token, _ in victims:
+                    staged = self._spilling.get(session_id)
+                    if staged is not None and staged[1] is token:
+                        del self._spilling[session_id]
+                    else:
+                        reclaimed.append(session_id)
+                self.spilled += len(victims) - len(reclaimed)
+            # Sessions whose callers came back mid-write are live again: their rows are stale
+            for session_id in reclaimed:
+                self.store.pop_session(session_id)
+
+    def spill_all(self):
+        """Moves every in-memory session to M2 (shutdown)."""
+        with self._lock:
+            victims = list(self._sessions.items())
+            self._sessions.clear()
+            staged = [self._stage(session_id, session) for session_id, session in victims] if self.store is not None else []
+        self._spill(staged)
+
+    def _total_bytes(self) -> int:
+        return sum(s.nbytes for s in self._sessions.values())
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._spilling.pop(session_id, None)
+        if self.store is not None:
+            with self._io_lock:
+                self.store.pop_session(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory accounting for /stats."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._total_bytes(),
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "spill_after_seconds": self.spill_after if self.store is not None else None,
+                "evictions": self.evictions,
+                "spilled": self.spilled,
+                "rehydrated": self.rehydrated
+            }
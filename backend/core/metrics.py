@@ -0,0 +1,212 @@
+
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds; spans sub-millisecond SQLite reads up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    """
+    Values live in per-thread shards: a thread only ever writes its own dict,
+    so recording takes no lock. The registration lock is taken once per thread
+    per metric; a scrape merges the shards.
+    """
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], list]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, ...], list]:
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        merged: Dict[Tuple[str, ...], list] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, values in list(shard.items()):
+                values = list(values)
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = values
+                else:
+                    for i, v in enumerate(values):
+                        total[i] += v
+        return merged
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            shard[labels] = [amount]
+        else:
+            values[0] += amount
+
+    def value(self, *labels: str) -> float:
+        return self._merged().get(labels, [0.0])[0]
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (value,) in sorted(self._merged().items()):
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {value}")
+        return lines
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            # [per-bucket counts..., +Inf count, sum]
+            values = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def count(self) -> int:
+        """Observations across all label values."""
+        return sum(sum(values[:-1]) for values in self._merged().values())
+
+    def time(self, *labels: str) -> "_Timer":
+        """`with HISTOGRAM.time("label"): ...` observes the block's wall time."""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, values in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            cumulative += values[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {values[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+class Gauge(_Metric):
+    """Last value set, or read at scrape time from callbacks returning {label values: value}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._sources: List[Callable[[], Dict[Tuple[str, ...], float]]] = []
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value # Single dict store; last writer wins
+
+    def add_source(self, source: Callable[[], Dict[Tuple[str, ...], float]]):
+        self._sources.append(source)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        values = dict(self._values)
+        for source in list(self._sources):
+            try:
+                values.update(source())
+            except Exception as e:
+                print(f"Gauge {self.name} failed: {e}")
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {value}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+PROCESS_STARTED = REGISTRY.register(Counter("primers_process_started_total", "engine.process calls started"))
+PROCESS_SECONDS = REGISTRY.register(Histogram("primers_process_seconds", "engine.process latency by routed intent", ("intent",)))
+STORE_QUERY_SECONDS = REGISTRY.register(Histogram("primers_store_query_seconds", "KnowledgeStore (M2) call latency by method", ("method",)))
+STORE_ERRORS = REGISTRY.register(Counter("primers_store_errors_total", "KnowledgeStore calls that raised", ("method",)))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram("primers_llm_call_seconds", "Local LLM request latency"))
+LLM_FAILURES = REGISTRY.register(Counter("primers_llm_failures_total", "Local LLM requests that failed", ("reason",)))
+INGEST_SECONDS = REGISTRY.register(Histogram("primers_ingest_seconds", "Directory ingest duration"))
+INGEST_FILES = REGISTRY.register(Counter("primers_ingest_files_total", "Files analyzed by ingest"))
+INGEST_FILES_PER_SECOND = REGISTRY.register(Gauge("primers_ingest_files_per_second", "Throughput of the most recent directory ingest"))
+CACHE_REQUESTS = REGISTRY.register(Counter("primers_cache_requests_total", "Cache lookups by cache and outcome", ("cache", "outcome")))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge("primers_cache_hit_ratio", "Hits over lookups since start, by cache", ("cache",)))
+QUEUE_DEPTH = REGISTRY.register(Gauge("primers_queue_depth", "Items waiting, by queue", ("queue",)))
+
+def instrument_methods(cls, histogram: Histogram = STORE_QUERY_SECONDS, errors: Counter = STORE_ERRORS):
+    """Wraps every public method of `cls` so its latency is observed under the method name."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not callable(method):
+            continue
+        setattr(cls, name, _instrumented(method, name, histogram, errors))
+    return cls
+
+def _instrumented(method: Callable, name: str, histogram: Histogram, errors: Counter) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            errors.inc(name)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start, name)
+    return wrapper
@@ -0,0 +1,147 @@
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+# Sampling period for the stack sampler, seconds
+SAMPLE_INTERVAL = float(os.getenv("PRIMERS_PROFILE_INTERVAL", "0.001"))
+PROFILE_TOP_K = 25
+# Collapsed stacks are also written here, one .folded file per profiled request
+PROFILE_DIR = os.getenv("PRIMERS_PROFILE_DIR", "/tmp/primers_profiles" if os.getenv("VERCEL") else "profiles")
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    background thread and counts identical stacks. The profiled thread is
+    never interrupted, so its overhead is close to nil at the default rate.
+    """
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="primers-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        # Stacks are rooted at the profiled function: walking outwards stops at
+        # the first frame of this module. Samples taken while the sampler itself
+        # starts or stops (rooted at __enter__/__exit__) are dropped.
+        while frame is not None and frame.f_code.co_filename != __file__:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        if stack and frame is not None and frame.f_code is _PROFILE_CALL_CODE:
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: 'frame;frame;frame count' per line, hottest first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+@dataclass
+class ProfileReport:
+    wall_ms: float
+    samples: int
+    interval_ms: float
+    collapsed: str # flamegraph.pl / speedscope input
+    top_functions: List[Dict[str, Any]] = field(default_factory=list)
+    file: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_ms": round(self.wall_ms, 3),
+            "samples": self.samples,
+            "interval_ms": self.interval_ms,
+            "top_functions": self.top_functions,
+            "collapsed": self.collapsed,
+            "file": self.file
+        }
+
+def _top_functions(stacks: Counter, wall_ms: float, k: int) -> List[Dict[str, Any]]:
+    """
+    Self and inclusive sample counts per function, from the sampled stacks.
+    Time is apportioned from the measured wall time by share of samples, so
+    the profiled entry point's cumulative time is close to the wall time.
+    """
+    total = sum(stacks.values())
+    if not total:
+        return []
+    inclusive: Counter = Counter()
+    own: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames): # recursion counts once per sample
+            inclusive[frame] += count
+    ms_per_sample = wall_ms / total
+    return [
+        {
+            "function": frame,
+            "samples": samples,
+            "self_samples": own[frame],
+            "total_ms": round(own[frame] * ms_per_sample, 3),
+            "cumulative_ms": round(samples * ms_per_sample, 3)
+        }
+        for frame, samples in sorted(inclusive.items(), key=lambda item: (-item[1], -own[item[0]], item[0]))[:k]
+    ]
+
+def profile_call(fn: Callable, *args, top_k: int = PROFILE_TOP_K, interval: float = SAMPLE_INTERVAL,
+                 **kwargs) -> Tuple[Any, ProfileReport]:
+    """
+    Runs `fn` once under the stack sampler. The sampled stacks give both the
+    collapsed stacks (flamegraph) and the top functions by cumulative time.
+    Only the calling thread is sampled, so concurrent requests on other
+    workers never show up in the profile. No deterministic profiler is used:
+    on 3.12+ cProfile records every thread into one call stack. The collapsed
+    stacks are stored under PROFILE_DIR as well as returned.
+    """
+    start = time.perf_counter()
+    with StackSampler(threading.get_ident(), interval) as sampler:
+        result = fn(*args, **kwargs)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    report = ProfileReport(
+        wall_ms=wall_ms,
+        samples=sampler.samples,
+        interval_ms=interval * 1000,
+        collapsed=sampler.collapsed(),
+        top_functions=_top_functions(sampler.stacks, wall_ms, top_k)
+    )
+    report.file = _store(report)
+    return result, report
+
+_PROFILE_CALL_CODE = profile_call.__code__
+
+def _store(report: ProfileReport) -> str:
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(4).hex()}.folded")
+        with open(path, "w") as f:
+            f.write(report.collapsed + "\n")
+        return path
+    except OSError as e:
+        print(f"Profile Store Error: {e}")
+        return ""
@@ -1,16 +1,65 @@
 
-from typing import List, Dict, Any, Callable
+import os
+import time
+from typing import List, Dict, Any, Callable, Optional
 from collections import deque
-from core.types import ReasoningStep, TraceLog, Tone
+from core.types import ReasoningStep, Span, TraceLog, Tone
 from core.intent import Intent
 
+# Span timing is on unless PRIMERS_TRACE_TIMING is "0"/"false"/"off"
+TIMING_ENABLED = os.getenv("PRIMERS_TRACE_TIMING", "1").lower() not in ("0", "false", "off")
+
+class _NullSpan:
+    """Shared no-op context when timing is disabled: no allocation, no clock reads."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _SpanContext:
+    __slots__ = ("graph", "name", "step", "index", "_wall", "_cpu")
+
+    def __init__(self, graph: "ReasoningGraph", name: str, step: Optional[ReasoningStep] = None):
+        self.graph = graph
+        self.name = name
+        self.step = step
+
+    def __enter__(self):
+        graph = self.graph
+        stack = graph._stack
+        span = Span(self.name, depth=len(stack), parent=stack[-1] if stack else None)
+        self.index = len(graph.trace.spans)
+        graph.trace.spans.append(span)
+        stack.append(self.index)
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self.step if self.step is not None else span
+
+    def __exit__(self, *exc):
+        wall_ms = (time.perf_counter() - self._wall) * 1000.0
+        cpu_ms = (time.thread_time() - self._cpu) * 1000.0
+        span = self.graph.trace.spans[self.index]
+        span.wall_ms, span.cpu_ms = wall_ms, cpu_ms
+        if self.step is not None:
+            self.step.wall_ms, self.step.cpu_ms = wall_ms, cpu_ms
+        self.graph._stack.pop()
+        return False
+
 class ReasoningGraph:
-    def __init__(self, trace: TraceLog):
+    def __init__(self, trace: TraceLog, timing: Optional[bool] = None):
         self.trace = trace
         self.steps: List[ReasoningStep] = []
         self._max_depth = 6 # Guardrail
+        self.timing = TIMING_ENABLED if timing is None else timing
+        self.intent: Optional[Intent] = None # routed intent, for per-intent timing totals
+        self._stack: List[int] = [] # indices of the open spans
 
-    def add_step(self, intent: Intent, action: str, confidence: float, summary: str, meta: Dict = None):
+    def add_step(self, intent: Intent, action: str, confidence: float, summary: str, meta: Dict = None) -> ReasoningStep:
         if len(self.steps) >= self._max_depth:
             raise RecursionError("Max reasoning depth exceeded.")
             
@@ -24,6 +73,34 @@ class ReasoningGraph:
         )
         self.steps.append(step)
         self.trace.add(step)
+        return step
+
+    def span(self, name: str):
+        """
+        Times a sub-operation: `with graph.span("m2.save_analyses"): ...`.
+        Spans nest; each records wall and thread CPU time in milliseconds.
+        """
+        return _SpanContext(self, name) if self.timing else _NULL_SPAN
+
+    def step(self, intent: Intent, action: str, confidence: float = 1.0, summary: str = "", meta: Dict = None):
+        """
+        Adds a reasoning step and times the block it wraps. The step is yielded,
+        so the block can fill in `output_summary` once the result is known.
+        """
+        step = self.add_step(intent, action, confidence, summary, meta)
+        return _SpanContext(self, action, step) if self.timing else _StepOnly(step)
+
+    def timings(self) -> Dict[str, Any]:
+        """Totals for the request: root spans summed, plus every span in start order."""
+        spans = self.trace.spans
+        roots = [s for s in spans if s.parent is None]
+        return {
+            "intent": self.intent.name if self.intent else None,
+            "wall_ms": round(sum(s.wall_ms for s in roots), 3),
+            "cpu_ms": round(sum(s.cpu_ms for s in roots), 3),
+            "spans": [{"name": s.name, "depth": s.depth, "wall_ms": round(s.wall_ms, 3), "cpu_ms": round(s.cpu_ms, 3)}
+                      for s in spans]
+        }
         
     def get_aggregated_confidence(self) -> float:
         if not self.steps: return 0.0
@@ -42,3 +119,16 @@ class ReasoningGraph:
         if confidence >= 0.8: return Tone.ASSERTIVE
         if confidence >= 0.6: return Tone.CAUTIOUS
         return Tone.INCONCLUSIVE
+
+class _StepOnly:
+    """step() with timing disabled: yields the step, records nothing else."""
+    __slots__ = ("step",)
+
+    def __init__(self, step: ReasoningStep):
+        self.step = step
+
+    def __enter__(self):
+        return self.step
+
+    def __exit__(self, *exc):
+        return False
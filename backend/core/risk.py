@@ -3,8 +3,11 @@ import os
 import subprocess
 import json
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
+import numpy as np
+from knowledge.graph import CompactGraph, module_name
+from core.centrality import CentralityEngine, CENTRALITY_MEASURES
 
 @dataclass
 class RiskNode:
@@ -21,20 +24,25 @@ class RiskScoringCore:
     V4 CORE: The mathematical engine for systemic fragility mapping.
     Uses normalized sub-scores: RiskIndex = 100 * (wS*S + wV*V + wK*K + wC*C)
     """
-    def __init__(self, workspace_root: str):
+    def __init__(self, workspace_root: str, criticality_measure: str = "reach"):
         self.workspace_root = workspace_root
         self.risk_data: Dict[str, RiskNode] = {}
         # V4 Weights
         self.wS, self.wV, self.wK, self.wC = 0.30, 0.30, 0.15, 0.25
+        # C source: "reach" (transitive fan-in) or any CENTRALITY_MEASURES entry
+        self.criticality_measure = criticality_measure
+        self.centrality = CentralityEngine()
 
-    def compute_risk(self, analyses: Dict[str, Any], ecosystem_graph: Dict[str, List[str]]) -> Dict[str, RiskNode]:
+    def compute_risk(self, analyses: Dict[str, Any], ecosystem_graph: Union[CompactGraph, Dict[str, List[str]]],
+                     criticality_measure: Optional[str] = None) -> Dict[str, RiskNode]:
         """
         Computes multi-dimensional risk for every node in the ecosystem.
         - S: Structural (Normalized LOC/Complexity)
         - V: Volatility (Churn Percentile)
         - K: Knowledge (Bus Factor proxy)
-        - C: Criticality (Visibility Fan-in Percentile)
+        - C: Criticality (Visibility Fan-in, PageRank, Betweenness or Degree Percentile)
         """
+        measure = criticality_measure or self.criticality_measure
         # 1. S: Structural Risk
         s_scores = []
         for source, data in analyses.items():
@@ -49,8 +57,11 @@ class RiskScoringCore:
         # 2. V & K: Volatility and Knowledge Risk
         self._calculate_git_metrics()
 
-        # 3. C: Criticality Risk (Visibility Fan-in / Transitive Reach)
-        self._calculate_visibility_fanin(ecosystem_graph)
+        # 3. C: Criticality Risk (Visibility Fan-in / Transitive Reach, or a centrality measure)
+        if measure in CENTRALITY_MEASURES:
+            self._calculate_centrality(ecosystem_graph, measure)
+        else:
+            self._calculate_visibility_fanin(ecosystem_graph)
 
         # 4. Percentile Normalization (V4 Stability)
         self._normalize_scores()
@@ -76,12 +87,12 @@ class RiskScoringCore:
     def _normalize_scores(self):
         """Robust percentile normalization to prevent ecosystem-size inflation."""
         def get_percentiles(attr):
-            values = sorted([getattr(n, attr) for n in self.risk_data.values()])
-            if not values: return
-            for node in self.risk_data.values():
-                val = getattr(node, attr)
-                # Percentile rank
-                rank = sum(1 for v in values if v < val) / len(values)
+            nodes = list(self.risk_data.values())
+            if not nodes: return
+            values = np.array([getattr(n, attr) for n in nodes], dtype=np.float64)
+            # Percentile rank: share of nodes strictly below each value
+            ranks = np.searchsorted(np.sort(values), values, side="left") / len(values)
+            for node, rank in zip(nodes, ranks.tolist()):
                 setattr(node, attr, rank)
 
         for attr in ["structural_risk", "volatility_risk", "criticality_risk"]:
@@ -122,29 +133,55 @@ class RiskScoringCore:
                     else: node.knowledge_risk = 0.1
         except Exception: pass
 
-    def _calculate_visibility_fanin(self, graph: Dict[str, List[str]]):
+    def _calculate_visibility_fanin(self, graph: Union[CompactGraph, Dict[str, List[str]]]):
         """
         Computes Transitive Reach (how many nodes indirectly depend on this).
         This is a robust measure of 'Blast Radius'.
         """
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_edges((src, tgt, "depends") for src, targets in graph.items() for tgt in targets)
+
         # Reverse the graph to find dependents (transitive fan-in)
-        reverse_graph = {}
-        for src, targets in graph.items():
-            for tgt in targets:
-                if tgt not in reverse_graph: reverse_graph[tgt] = []
-                reverse_graph[tgt].append(src)
-        
-        def count_reach(node, visited):
-            if node not in reverse_graph: return 0
-            count = 0
-            for dep in reverse_graph[node]:
-                if dep not in visited:
-                    visited.add(dep)
-                    count += 1 + count_reach(dep, visited)
+        reverse_graph = graph.reverse()
+        hubs = [i for i in range(reverse_graph.num_nodes) if reverse_graph.offsets[i] != reverse_graph.offsets[i + 1]]
+
+        def count_reach(start: int) -> int:
+            visited = bytearray(reverse_graph.num_nodes)
+            visited[start] = 1
+            stack, count = [start], 0
+            while stack:
+                for dep in reverse_graph.neighbors(stack.pop()):
+                    if not visited[dep]:
+                        visited[dep] = 1
+                        count += 1
+                        stack.append(dep)
             return count
 
         for node_path, node in self.risk_data.items():
             # Extract possible key from path
-            graph_key = next((k for k in reverse_graph.keys() if k in node_path), None)
-            if graph_key:
-                node.criticality_risk = count_reach(graph_key, {graph_key})
+            graph_key = next((i for i in hubs if reverse_graph.names[i] in node_path), None)
+            if graph_key is not None:
+                node.criticality_risk = count_reach(graph_key)
+
+    def _calculate_centrality(self, graph: Union[CompactGraph, Dict[str, List[str]]], measure: str):
+        """
+        Uses a CentralityEngine measure as C. Files are matched to the module node
+        other files import ('core/engine.py' -> 'core.engine'), falling back to the path node.
+        """
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_edges((src, tgt, "depends") for src, targets in graph.items() for tgt in targets)
+        scores = self.centrality.compute(graph, measure)
+
+        nodes = list(self.risk_data.values())
+        ids = np.array([self._graph_id(graph, node.source) for node in nodes], dtype=np.int64)
+        values = np.where(ids >= 0, scores[np.maximum(ids, 0)] if scores.size else 0.0, 0.0)
+        for node, value in zip(nodes, values.tolist()):
+            node.criticality_risk = value
+
+    @staticmethod
+    def _graph_id(graph: CompactGraph, path: str) -> int:
+        for key in (module_name(path), path):
+            idx = graph.node_id(key)
+            if idx is not None:
+                return idx
+        return -1
@@ -24,11 +24,22 @@ class ReasoningStep:
     confidence: float
     output_summary: str
     metadata: Dict[str, Any] = field(default_factory=dict)
+    wall_ms: Optional[float] = None # set for steps recorded through ReasoningGraph.step()
+    cpu_ms: Optional[float] = None
+
+@dataclass
+class Span:
+    name: str
+    depth: int = 0
+    parent: Optional[int] = None # index of the enclosing span in TraceLog.spans
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0 # CPU time of the calling thread
 
 @dataclass
 class TraceLog:
     steps: List[ReasoningStep] = field(default_factory=list)
     session_id: str = "default_session"
+    spans: List[Span] = field(default_factory=list)
     
     def add(self, step: ReasoningStep):
         self.steps.append(step)
@@ -0,0 +1,114 @@
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Intents that hold the engine longest get their own ceilings; the rest share the pool
+DEFAULT_INTENT_CAPS = {"INGESTION": 1, "KNOWLEDGE_ACQUISITION": 1, "EMPIRICAL_ANALYSIS": 2, "APPLY_REFACTOR": 1,
+                       "FIND_DUPLICATES": 1}
+
+def parse_intent_caps(spec: str) -> Dict[str, int]:
+    """'INGESTION=1,EMPIRICAL_ANALYSIS=2' -> {"INGESTION": 1, "EMPIRICAL_ANALYSIS": 2}."""
+    caps = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, limit = item.partition("=")
+        caps[name.strip().upper()] = int(limit)
+    return caps
+
+class PoolSaturated(Exception):
+    """Raised instead of queueing; `status_code` is 429 for an intent cap, 503 for a full queue."""
+    def __init__(self, status_code: int, detail: str, retry_after: int = 1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+class EngineWorkerPool:
+    """
+    ENGINE WORKER POOL
+    Runs synchronous engine calls on `workers` threads so async endpoints never
+    block the event loop. At most `workers + queue_limit` calls are admitted at
+    once, and at most `intent_caps[intent]` of them per intent. Anything beyond
+    that is refused at admission (PoolSaturated) rather than left to wait, so a
+    burst of heavy commands cannot starve /stats, /auth or /metrics.
+    """
+    def __init__(self, workers: int = 4, queue_limit: int = 32, intent_caps: Optional[Dict[str, int]] = None):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.intent_caps = dict(DEFAULT_INTENT_CAPS if intent_caps is None else intent_caps)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="primers-engine")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._per_intent: Dict[str, int] = {}
+        self.rejected = {429: 0, 503: 0}
+
+    @classmethod
+    def from_env(cls) -> "EngineWorkerPool":
+        caps = os.getenv("PRIMERS_INTENT_CAPS")
+        return cls(
+            workers=int(os.getenv("PRIMERS_ENGINE_WORKERS", "4")),
+            queue_limit=int(os.getenv("PRIMERS_ENGINE_QUEUE", "32")),
+            intent_caps=parse_intent_caps(caps) if caps is not None else None
+        )
+
+    def _admit(self, intent: str):
+        with self._lock:
+            cap = self.intent_caps.get(intent)
+            if cap is not None and self._per_intent.get(intent, 0) >= cap:
+                self.rejected[429] += 1
+                raise PoolSaturated(429, f"Too many concurrent {intent} requests (limit {cap})")
+            if self._admitted >= self.workers + self.queue_limit:
+                self.rejected[503] += 1
+                raise PoolSaturated(503, "Engine queue is full", retry_after=5)
+            self._admitted += 1
+            self._per_intent[intent] = self._per_intent.get(intent, 0) + 1
+
+    def _release(self, intent: str):
+        with self._lock:
+            self._admitted -= 1
+            self._per_intent[intent] -= 1
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run(self, intent: str, fn: Callable, *args, **kwargs) -> Any:
+        """Awaits `fn(*args, **kwargs)` on a worker thread, or raises PoolSaturated."""
+        self._admit(intent)
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except RuntimeError:
+            self._release(intent)
+            raise PoolSaturated(503, "Engine is shutting down")
+        # Released when the work finishes (or is cancelled before starting),
+        # not when the client stops waiting for it
+        future.add_done_callback(lambda _: self._release(intent))
+        return await asyncio.wrap_future(future)
+
+    def queue_depth(self) -> int:
+        """Admitted calls still waiting for a worker."""
+        with self._lock:
+            return self._admitted - self._running
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "per_intent": {k: v for k, v in self._per_intent.items() if v},
+                "intent_caps": self.intent_caps,
+                "rejected": {str(code): count for code, count in self.rejected.items()}
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,114 @@
+
+import threading
+from array import array
+from typing import Dict, List, Iterable, Iterator, Optional, Tuple
+from knowledge.graph import CompactGraph
+
+class CallGraphIndex:
+    """
+    M2 CALL GRAPH
+    Function-level call edges between interned symbol ids. Edges are grouped by
+    the file that owns them, so re-analysing a file swaps only its own calls.
+    Caller/callee queries run against CSR views rebuilt once per generation.
+    Ingest mutates the index while engine workers query it, so every access to
+    the symbol tables and owned edges goes through one lock; the CSR views are
+    immutable once built and are read outside it.
+    """
+    def __init__(self):
+        self.symbols: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._by_basename: Dict[str, List[int]] = {}
+        # owner file -> (caller ids, callee ids)
+        self._owned: Dict[str, Tuple[array, array]] = {}
+        self.generation = 0
+        self._views: Optional[Tuple[CompactGraph, CompactGraph]] = None
+        self._lock = threading.RLock()
+
+    def intern(self, name: str) -> int:
+        with self._lock:
+            idx = self._ids.get(name)
+            if idx is None:
+                idx = self._ids[name] = len(self.symbols)
+                self.symbols.append(name)
+                self._by_basename.setdefault(name.rsplit(".", 1)[-1], []).append(idx)
+            return idx
+
+    def replace_file(self, owner: str, calls: Iterable[Tuple[str, str]]):
+        callers, callees = array("i"), array("i")
+        with self._lock:
+            for caller, callee in calls:
+                callers.append(self.intern(caller))
+                callees.append(self.intern(callee))
+            self.replace_file_ids(owner, callers, callees)
+
+    def replace_file_ids(self, owner: str, callers: array, callees: array):
+        with self._lock:
+            if callers:
+                self._owned[owner] = (callers, callees)
+            else:
+                self._owned.pop(owner, None)
+            self.generation += 1
+
+    def remove_file(self, owner: str):
+        with self._lock:
+            if self._owned.pop(owner, None) is not None:
+                self.generation += 1
+
+    @property
+    def num_edges(self) -> int:
+        with self._lock:
+            return sum(len(callers) for callers, _ in self._owned.values())
+
+    def owners(self) -> List[str]:
+        with self._lock:
+            return list(self._owned)
+
+    def edges_of(self, owner: str) -> Iterator[Tuple[str, str]]:
+        # Owned arrays are replaced, never mutated, and symbols only grow
+        callers, callees = self._owned.get(owner, (array("i"), array("i")))
+        for caller, callee in zip(callers, callees):
+            yield self.symbols[caller], self.symbols[callee]
+
+    def resolve(self, name: str) -> List[str]:
+        """Exact qualified name, or every symbol whose dotted suffix matches ('Engine.process')."""
+        with self._lock:
+            if name in self._ids:
+                return [name]
+            suffix = "." + name
+            return [self.symbols[i] for i in self._by_basename.get(name.rsplit(".", 1)[-1], [])
+                    if self.symbols[i].endswith(suffix)]
+
+    def callers(self, name: str, limit: int = 50) -> Dict[str, List[str]]:
+        return self._query(name, reverse=True, limit=limit)
+
+    def callees(self, name: str, limit: int = 50) -> Dict[str, List[str]]:
+        return self._query(name, reverse=False, limit=limit)
+
+    def caller_count(self, name: str) -> int:
+        forward, reverse = self._csr()
+        idx = reverse.node_id(name)
+        return len(reverse.neighbors(idx)) if idx is not None else 0
+
+    def _query(self, name: str, reverse: bool, limit: int) -> Dict[str, List[str]]:
+        views = self._csr()
+        view = views[1] if reverse else views[0]
+        results: Dict[str, List[str]] = {}
+        for symbol in self.resolve(name):
+            idx = view.node_id(symbol)
+            if idx is None:
+                continue
+            results[symbol] = sorted(view.names[i] for i in view.neighbors(idx))[:limit]
+        return results
+
+    def _csr(self) -> Tuple[CompactGraph, CompactGraph]:
+        with self._lock:
+            views = self._views
+            if views is None or views[0].generation != self.generation:
+                callers, callees = array("i"), array("i")
+                for owned_callers, owned_callees in self._owned.values():
+                    callers.extend(owned_callers)
+                    callees.extend(owned_callees)
+                forward = CompactGraph.from_ids(list(self.symbols), callers, callees,
+                                                generation=self.generation, ids=dict(self._ids))
+                views = self._views = (forward, forward.reverse())
+            return views
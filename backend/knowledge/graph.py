@@ -0,0 +1,132 @@
+
+from array import array
+from typing import Dict, List, Iterable, Iterator, Optional, Tuple
+
+def module_name(path: str) -> str:
+    """Maps file paths ('core/engine.py', 'core\\engine.py') and module names ('core.engine') onto one namespace."""
+    name = path.replace("\\", "/")
+    if name.endswith(".py"):
+        name = name[:-3]
+    if name.endswith("/__init__"):
+        name = name[:-len("/__init__")]
+    return name.strip("./").replace("/", ".")
+
+class CompactGraph:
+    """
+    M2 TOPOLOGY (CSR)
+    Immutable adjacency in compressed sparse row form: the out-edges of node `i`
+    are targets[offsets[i]:offsets[i+1]]. Node names and relation types are
+    interned once, so the structure costs a few bytes per edge.
+    """
+    def __init__(self, names: List[str], offsets: array, targets: array,
+                 relations: array, relation_names: List[str], generation: int = 0,
+                 ids: Optional[Dict[str, int]] = None):
+        self.names = names
+        self.offsets = offsets
+        self.targets = targets
+        self.relations = relations
+        self.relation_names = relation_names
+        self.generation = generation
+        self._ids: Dict[str, int] = ids if ids is not None else {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[str, str, str]], generation: int = 0) -> "CompactGraph":
+        """Builds the CSR arrays from (source, target, relation) triples in one pass plus a counting sort."""
+        names: List[str] = []
+        ids: Dict[str, int] = {}
+        relation_names: List[str] = []
+        relation_ids: Dict[str, int] = {}
+        src, tgt, rel = array("i"), array("i"), array("i")
+
+        def intern(table: Dict[str, int], values: List[str], key: str) -> int:
+            idx = table.get(key)
+            if idx is None:
+                idx = table[key] = len(values)
+                values.append(key)
+            return idx
+
+        for source, target, relation in edges:
+            src.append(intern(ids, names, source))
+            tgt.append(intern(ids, names, target))
+            rel.append(intern(relation_ids, relation_names, relation or ""))
+
+        return cls.from_ids(names, src, tgt, rel, relation_names, generation, ids=ids)
+
+    @classmethod
+    def from_ids(cls, names: List[str], src: array, tgt: array, rel: Optional[array] = None,
+                 relation_names: Optional[List[str]] = None, generation: int = 0,
+                 ids: Optional[Dict[str, int]] = None) -> "CompactGraph":
+        """Builds the CSR arrays from parallel node-id arrays (names already interned)."""
+        if rel is None:
+            rel, relation_names = array("i", [0]) * len(src), [""]
+        n = len(names)
+        offsets = array("i", [0]) * (n + 1)
+        for s in src:
+            offsets[s + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        cursor = array("i", offsets[:n])
+        targets = array("i", [0]) * len(src)
+        relations = array("i", [0]) * len(src)
+        for s, t, r in zip(src, tgt, rel):
+            pos = cursor[s]
+            targets[pos] = t
+            relations[pos] = r
+            cursor[s] = pos + 1
+
+        return cls(names, offsets, targets, relations, relation_names, generation, ids=ids)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def node_id(self, name: str) -> Optional[int]:
+        return self._ids.get(name)
+
+    def neighbors(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def reverse(self) -> "CompactGraph":
+        """Transposed graph (dependents instead of dependencies), sharing the intern tables."""
+        n = self.num_nodes
+        offsets = array("i", [0]) * (n + 1)
+        for t in self.targets:
+            offsets[t + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        cursor = array("i", offsets[:n])
+        targets = array("i", [0]) * self.num_edges
+        relations = array("i", [0]) * self.num_edges
+        for s in range(n):
+            for pos in range(self.offsets[s], self.offsets[s + 1]):
+                t = self.targets[pos]
+                targets[cursor[t]] = s
+                relations[cursor[t]] = self.relations[pos]
+                cursor[t] += 1
+
+        rev = CompactGraph.__new__(CompactGraph)
+        rev.names, rev.offsets, rev.targets = self.names, offsets, targets
+        rev.relations, rev.relation_names = relations, self.relation_names
+        rev.generation, rev._ids = self.generation, self._ids
+        return rev
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, str]]:
+        names, rel_names = self.names, self.relation_names
+        for s in range(self.num_nodes):
+            for pos in range(self.offsets[s], self.offsets[s + 1]):
+                yield names[s], names[self.targets[pos]], rel_names[self.relations[pos]]
+
+    def to_adjacency(self) -> Dict[str, List[str]]:
+        """Legacy dict-of-lists view (KnowledgeStore.get_graph format)."""
+        adjacency: Dict[str, List[str]] = {}
+        for s in range(self.num_nodes):
+            start, end = self.offsets[s], self.offsets[s + 1]
+            if start != end:
+                adjacency[self.names[s]] = [self.names[t] for t in self.targets[start:end]]
+        return adjacency
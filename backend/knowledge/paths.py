@@ -0,0 +1,146 @@
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+# Match tiers, best first
+EXACT, SUFFIX, BASENAME, SUBSTRING = range(4)
+
+@dataclass
+class PathResolution:
+    target: str
+    candidates: List[str] = field(default_factory=list) # ranked, best first
+    tier: Optional[int] = None
+    ambiguous: bool = False
+
+    @property
+    def match(self) -> Optional[str]:
+        """The resolved path, or None when nothing matched or the best tier is ambiguous."""
+        return self.candidates[0] if self.candidates and not self.ambiguous else None
+
+class _TrieNode:
+    __slots__ = ("children", "paths")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.paths: Set[str] = set() # every path whose trailing components lead here
+
+class PathIndex:
+    """
+    M1 PATH INDEX
+    Resolves user-typed targets ('engine.py', 'core/engine.py', 'core.engine',
+    'engine') to ingested source paths. Paths are stored in a trie keyed on
+    their components in reverse (basename first), so a component-suffix lookup
+    walks one node per typed component; a basename map covers extensionless
+    names. Kept in step with the analyzer on every store/remove.
+    """
+    def __init__(self):
+        self._root = _TrieNode()
+        self._by_stem: Dict[str, Set[str]] = {}
+        self._paths: Set[str] = set()
+
+    @staticmethod
+    def _components(path: str) -> List[str]:
+        return [c for c in path.replace("\\", "/").lower().split("/") if c and c != "."]
+
+    @staticmethod
+    def _stem(component: str) -> str:
+        return component[:-3] if component.endswith(".py") else component
+
+    def add(self, path: str):
+        if path in self._paths:
+            return
+        self._paths.add(path)
+        components = self._components(path)
+        node = self._root
+        for component in reversed(components):
+            node = node.children.setdefault(component, _TrieNode())
+            node.paths.add(path)
+        if components:
+            self._by_stem.setdefault(self._stem(components[-1]), set()).add(path)
+
+    def remove(self, path: str):
+        if path not in self._paths:
+            return
+        self._paths.discard(path)
+        components = self._components(path)
+        trail = [self._root]
+        for component in reversed(components):
+            trail.append(trail[-1].children[component])
+            trail[-1].paths.discard(path)
+        # Prune branches that no longer lead to any path
+        for parent, component, child in zip(reversed(trail[:-1]), components, reversed(trail[1:])):
+            if not child.paths and not child.children:
+                del parent.children[component]
+        if components:
+            stem = self._stem(components[-1])
+            bucket = self._by_stem.get(stem)
+            if bucket is not None:
+                bucket.discard(path)
+                if not bucket:
+                    del self._by_stem[stem]
+
+    def copy(self) -> "PathIndex":
+        """Independent deep copy (copy-on-write corpus snapshots)."""
+        clone = PathIndex()
+        clone._paths = set(self._paths)
+        clone._by_stem = {stem: set(paths) for stem, paths in self._by_stem.items()}
+        stack = [(self._root, clone._root)]
+        while stack:
+            source, target = stack.pop()
+            target.paths = set(source.paths)
+            for component, child in source.children.items():
+                copied = target.children[component] = _TrieNode()
+                stack.append((child, copied))
+        return clone
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._paths
+
+    def resolve(self, target: str, limit: int = 10) -> PathResolution:
+        """
+        Ranked candidates for `target`. Tiers: exact path, component suffix
+        ('core/engine.py', or a dotted module name), basename without extension,
+        then plain substring as a last resort. Several candidates in the best
+        tier make the resolution ambiguous.
+        """
+        target = target.strip().strip("`'\"")
+        resolution = PathResolution(target)
+        if not target:
+            return resolution
+
+        if target in self._paths:
+            resolution.candidates, resolution.tier = [target], EXACT
+            return resolution
+
+        components = self._components(target)
+        found = self._suffix_lookup(components)
+        if not found and len(components) == 1 and "." in components[0]:
+            # Dotted module name: 'core.engine' -> core/engine.py or core/engine/__init__.py
+            parts = self._stem(components[0]).split(".")
+            found = self._suffix_lookup(parts[:-1] + [parts[-1] + ".py"]) or self._suffix_lookup(parts + ["__init__.py"])
+        tier = SUFFIX
+        if not found and len(components) == 1:
+            found, tier = self._by_stem.get(self._stem(components[0]), set()), BASENAME
+        if not found:
+            lowered = target.lower()
+            found, tier = {p for p in self._paths if lowered in p.lower()}, SUBSTRING
+        if not found:
+            return resolution
+
+        # Shallower paths first: 'engine.py' prefers core/engine.py over a/b/core/engine.py
+        ranked = sorted(found, key=lambda p: (len(self._components(p)), p))
+        resolution.candidates = ranked[:limit]
+        resolution.tier = tier
+        resolution.ambiguous = len(ranked) > 1
+        return resolution
+
+    def _suffix_lookup(self, components: List[str]) -> Set[str]:
+        node = self._root
+        for component in reversed(components):
+            node = node.children.get(component)
+            if node is None:
+                return set()
+        return node.paths if components else set()
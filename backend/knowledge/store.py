@@ -3,8 +3,18 @@ import sqlite3
 import json
 import hashlib
 import os
+import time
 from typing import Dict, Optional, Any, List
 from datetime import datetime
+from array import array
+from knowledge.graph import CompactGraph
+from knowledge.callgraph import CallGraphIndex
+from core.metrics import instrument_methods
+
+# Columns accepted by get_analysis_rows(sort=...); prefix with '-' for descending
+ANALYSIS_SORT_COLUMNS = ("file", "role", "health", "complexity", "confidence")
+# Number of analysis runs kept before the oldest are pruned
+ANALYSIS_RUN_RETENTION = 20
 
 class KnowledgeStore:
     def __init__(self, db_path: str = "primers_knowledge.db", enabled: bool = True):
@@ -101,9 +111,88 @@ class KnowledgeStore:
                     target TEXT,
                     type TEXT,
                     strength REAL,
+                    owner TEXT,
                     UNIQUE(source, target, type)
                 )
             """)
+            # Edge ownership: every relationship belongs to the source file that produced it
+            cursor.execute("PRAGMA table_info(relationships)")
+            if "owner" not in [col[1] for col in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE relationships ADD COLUMN owner TEXT")
+                cursor.execute("UPDATE relationships SET owner = source WHERE owner IS NULL")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_relationships_owner ON relationships(owner)")
+            # M2 Call Graph: integer-keyed symbols and call edges owned by their file
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS symbols (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS call_edges (
+                    caller INTEGER,
+                    callee INTEGER,
+                    owner INTEGER,
+                    PRIMARY KEY (owner, caller, callee)
+                ) WITHOUT ROWID
+            """)
+            # Memoized Layer 2/3 results (one row per source; see cognition.cache)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    source TEXT,
+                    payload TEXT,
+                    timestamp DATETIME
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_source ON result_cache(source)")
+            # Structured analysis runs: one summary row per run, one row per file
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_runs (
+                    run_id TEXT PRIMARY KEY,
+                    timestamp DATETIME,
+                    target TEXT,
+                    file_count INTEGER,
+                    health_score INTEGER,
+                    confidence REAL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_rows (
+                    run_id TEXT,
+                    file TEXT,
+                    role TEXT,
+                    judgement TEXT,
+                    smells TEXT,
+                    health INTEGER,
+                    complexity REAL,
+                    confidence REAL,
+                    PRIMARY KEY (run_id, file)
+                ) WITHOUT ROWID
+            """)
+            # M1 Spill: idle sessions, with long strings held once in session_blobs
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS session_spill (
+                    session_id TEXT PRIMARY KEY,
+                    payload TEXT,
+                    blobs TEXT,
+                    last_seen REAL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS session_blobs (
+                    digest TEXT PRIMARY KEY,
+                    content TEXT,
+                    refs INTEGER
+                )
+            """)
+            # Directories ingested so far: single-file re-analysis derives each file's owner path from these
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_roots (
+                    path TEXT PRIMARY KEY,
+                    last_ingested TEXT
+                )
+            """)
             cursor.execute("INSERT OR IGNORE INTO commercial_metrics (metric_id, value) VALUES ('total_debt_repaid', 0.0)")
             conn.commit()
 
@@ -144,26 +233,29 @@ class KnowledgeStore:
         return results
 
     def save_analysis(self, source: str, metrics: Dict[str, Any]):
-        if not self.enabled: return
+        self.save_analyses([(source, metrics)])
 
-        # Create deterministic ID from source name (or file content hash in real world)
-        repo_hash = hashlib.sha256(source.encode()).hexdigest()
-        blob = json.dumps(metrics)
-        timestamp = datetime.now().isoformat()
+    def save_analyses(self, entries: List[tuple]):
+        """Writes (source, metrics) pairs and their history snapshots in one transaction."""
+        if not self.enabled or not entries: return
 
+        timestamp = datetime.now().isoformat()
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            # Create deterministic ID from source name (or file content hash in real world)
+            cursor.executemany("""
                 INSERT OR REPLACE INTO repo_analysis 
                 (repo_hash, source_name, files_count, avg_complexity, last_analyzed, analysis_blob)
                 VALUES (?, ?, ?, ?, ?, ?)
-            """, (repo_hash, source, metrics.get('files', 1), metrics.get('complexity', 0), timestamp, blob))
+            """, ((hashlib.sha256(source.encode()).hexdigest(), source, metrics.get('files', 1),
+                   metrics.get('complexity', 0), timestamp, json.dumps(metrics)) for source, metrics in entries))
             
             # Record historical snapshot
-            cursor.execute("""
+            cursor.executemany("""
                 INSERT INTO analysis_history (source_name, timestamp, loc, complexity, health_score)
                 VALUES (?, ?, ?, ?, ?)
-            """, (source, timestamp, metrics.get('loc', 0), metrics.get('complexity', 0), metrics.get('health_score', 100)))
+            """, ((source, timestamp, metrics.get('loc', 0), metrics.get('complexity', 0), metrics.get('health_score', 100))
+                  for source, metrics in entries))
             conn.commit()
 
     def get_history(self, source_name: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -254,22 +346,283 @@ class KnowledgeStore:
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT OR REPLACE INTO relationships (source, target, type, strength)
-                VALUES (?, ?, ?, ?)
-            """, (source, target, rel_type, strength))
+                INSERT OR REPLACE INTO relationships (source, target, type, strength, owner)
+                VALUES (?, ?, ?, ?, ?)
+            """, (source, target, rel_type, strength, source))
+            conn.commit()
+
+    def replace_relationships(self, owned_edges: Dict[str, List[Dict[str, str]]]):
+        """
+        Atomically replaces the persisted edges of each owner (source file) with
+        the given list; owners not in the mapping are left untouched.
+        """
+        if not self.enabled or not owned_edges: return
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany("DELETE FROM relationships WHERE owner = ?", ((o,) for o in owned_edges))
+            cursor.executemany("""
+                INSERT OR REPLACE INTO relationships (source, target, type, strength, owner)
+                VALUES (?, ?, ?, 1.0, ?)
+            """, ((e["source"], e["target"], e["relation"], owner) for owner, edges in owned_edges.items() for e in edges))
             conn.commit()
 
     def get_graph(self) -> Dict[str, List[str]]:
         if not self.enabled: return {}
-        graph = {}
+        return self.load_graph().to_adjacency()
+
+    def load_graph(self) -> CompactGraph:
+        """
+        Reads the persisted topology in a single pass into a CSR graph.
+        Used at boot so graph-dependent features work without a re-ingest.
+        """
+        if not self.enabled: return CompactGraph.from_edges([])
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT source, target, type FROM relationships")
+                return CompactGraph.from_edges(cursor)
+        except Exception as e:
+            print(f"Failed to load graph: {e}")
+            return CompactGraph.from_edges([])
+
+    def save_call_graph(self, index: CallGraphIndex, owners: List[str], batch_size: int = 500):
+        """
+        Persists the call edges of `owners` in one transaction, replacing whatever
+        those files contributed before. Symbols and edges go in with executemany batches.
+        """
+        if not self.enabled or not owners: return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                names = set(owners)
+                for owner in owners:
+                    for caller, callee in index.edges_of(owner):
+                        names.add(caller)
+                        names.add(callee)
+                cursor.executemany("INSERT OR IGNORE INTO symbols (name) VALUES (?)", ((n,) for n in names))
+
+                ids: Dict[str, int] = {}
+                pending = list(names)
+                for i in range(0, len(pending), batch_size):
+                    chunk = pending[i:i + batch_size]
+                    cursor.execute(f"SELECT id, name FROM symbols WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+                    ids.update((name, sid) for sid, name in cursor.fetchall())
+
+                cursor.executemany("DELETE FROM call_edges WHERE owner = ?", ((ids[o],) for o in owners))
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO call_edges (caller, callee, owner) VALUES (?, ?, ?)",
+                    ((ids[caller], ids[callee], ids[owner]) for owner in owners for caller, callee in index.edges_of(owner))
+                )
+                conn.commit()
+        except Exception as e:
+            print(f"Failed to save call graph: {e}")
+
+    def load_call_graph(self) -> CallGraphIndex:
+        """Single pass over symbols and call_edges into an in-memory CallGraphIndex."""
+        index = CallGraphIndex()
+        if not self.enabled: return index
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name FROM symbols")
+                local = {sid: index.intern(name) for sid, name in cursor}
+                cursor.execute("SELECT owner, caller, callee FROM call_edges ORDER BY owner")
+                current, callers, callees = None, array("i"), array("i")
+                for owner, caller, callee in cursor:
+                    if owner != current:
+                        if current is not None:
+                            index.replace_file_ids(index.symbols[local[current]], callers, callees)
+                        current, callers, callees = owner, array("i"), array("i")
+                    callers.append(local[caller])
+                    callees.append(local[callee])
+                if current is not None:
+                    index.replace_file_ids(index.symbols[local[current]], callers, callees)
+        except Exception as e:
+            print(f"Failed to load call graph: {e}")
+        return index
+
+    def save_ingest_root(self, path: str):
+        if not self.enabled: return
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("INSERT OR REPLACE INTO ingest_roots (path, last_ingested) VALUES (?, ?)",
+                             (path, datetime.now().isoformat()))
+                conn.commit()
+        except Exception as e:
+            print(f"Failed to save ingest root: {e}")
+
+    def load_ingest_roots(self) -> List[str]:
+        if not self.enabled: return []
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT path FROM ingest_roots ORDER BY last_ingested")
+                return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Failed to load ingest roots: {e}")
+            return []
+
+    def load_cached_results(self, keys: List[str], batch_size: int = 500) -> Dict[str, str]:
+        """Serialized cache payloads for whichever of `keys` are persisted."""
+        if not self.enabled or not keys: return {}
+        found: Dict[str, str] = {}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                for i in range(0, len(keys), batch_size):
+                    chunk = keys[i:i + batch_size]
+                    cursor.execute(f"SELECT key, payload FROM result_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                    found.update(cursor.fetchall())
+        except Exception as e:
+            print(f"Failed to load cached results: {e}")
+        return found
+
+    def save_cached_results(self, rows: List[tuple]):
+        """
+        Persists (key, source, payload) rows in one transaction. Each source keeps
+        only its latest entry, so the table stays proportional to the corpus.
+        """
+        if not self.enabled or not rows: return
+        timestamp = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany("DELETE FROM result_cache WHERE source = ?", ((source,) for _, source, _ in rows))
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO result_cache (key, source, payload, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, ((key, source, payload, timestamp) for key, source, payload in rows))
+                conn.commit()
+        except Exception as e:
+            print(f"Failed to save cached results: {e}")
+
+    def save_analysis_run(self, run_id: str, target: str, health_score: int, confidence: float, rows: List[Dict[str, Any]]):
+        """
+        Persists one analysis run and its per-file rows in a single transaction,
+        pruning runs beyond ANALYSIS_RUN_RETENTION.
+        """
+        if not self.enabled: return
+        timestamp = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO analysis_runs (run_id, timestamp, target, file_count, health_score, confidence)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (run_id, timestamp, target, len(rows), health_score, confidence))
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO analysis_rows (run_id, file, role, judgement, smells, health, complexity, confidence)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, ((run_id, r["file"], r["role"], r["judgement"], json.dumps(r["smells"]),
+                       r["health"], r["complexity"], r["confidence"]) for r in rows))
+                cursor.execute("SELECT run_id FROM analysis_runs ORDER BY timestamp DESC LIMIT -1 OFFSET ?", (ANALYSIS_RUN_RETENTION,))
+                expired = cursor.fetchall()
+                cursor.executemany("DELETE FROM analysis_rows WHERE run_id = ?", expired)
+                cursor.executemany("DELETE FROM analysis_runs WHERE run_id = ?", expired)
+                conn.commit()
+        except Exception as e:
+            print(f"Failed to save analysis run: {e}")
+
+    def get_analysis_rows(self, run_id: str, page: int = 1, page_size: int = 50,
+                          sort: str = "-complexity", filter: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        One page of a stored analysis run. `sort` is a column from ANALYSIS_SORT_COLUMNS
+        ('-' prefix for descending); `filter` matches file, role or smells as a substring.
+        Returns None when the run does not exist.
+        """
+        if not self.enabled: return None
+        column = sort.lstrip("-")
+        if column not in ANALYSIS_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column '{column}'. Options: {', '.join(ANALYSIS_SORT_COLUMNS)}")
+        direction = "DESC" if sort.startswith("-") else "ASC"
+        page, page_size = max(1, page), max(1, min(page_size, 500))
+
+        where, params = "run_id = ?", [run_id]
+        if filter:
+            where += " AND (file LIKE ? OR role LIKE ? OR smells LIKE ?)"
+            params += [f"%{filter}%"] * 3
+
         with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
-            cursor.execute("SELECT source, target FROM relationships")
-            for row in cursor.fetchall():
-                src, tgt = row
-                if src not in graph: graph[src] = []
-                graph[src].append(tgt)
-        return graph
+            cursor.execute("SELECT * FROM analysis_runs WHERE run_id = ?", (run_id,))
+            run = cursor.fetchone()
+            if run is None:
+                return None
+            cursor.execute(f"SELECT COUNT(*) FROM analysis_rows WHERE {where}", params)
+            total = cursor.fetchone()[0]
+            cursor.execute(f"""
+                SELECT file, role, judgement, smells, health, complexity, confidence
+                FROM analysis_rows WHERE {where}
+                ORDER BY {column} {direction}, file ASC LIMIT ? OFFSET ?
+            """, params + [page_size, (page - 1) * page_size])
+            rows = [dict(row, smells=json.loads(row["smells"])) for row in cursor.fetchall()]
+
+        return {"run": dict(run), "page": page, "page_size": page_size, "total": total, "rows": rows}
+
+    def save_sessions(self, sessions: List[tuple], max_age: Optional[float] = None):
+        """
+        Spills (session_id, payload, blobs, last_seen) entries in one transaction;
+        last_seen is a Unix timestamp. Blobs are keyed by digest and
+        reference-counted, so shared payloads are stored once. Spilled sessions
+        idle for longer than `max_age` seconds are pruned.
+        """
+        if not self.enabled or not sessions: return
+        now = time.time()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                for session_id, _, _, _ in sessions:
+                    self._drop_spilled(cursor, session_id)
+                cursor.executemany(
+                    "INSERT INTO session_spill (session_id, payload, blobs, last_seen) VALUES (?, ?, ?, ?)",
+                    ((session_id, payload, ",".join(blobs), last_seen) for session_id, payload, blobs, last_seen in sessions)
+                )
+                cursor.executemany("""
+                    INSERT INTO session_blobs (digest, content, refs) VALUES (?, ?, 1)
+                    ON CONFLICT(digest) DO UPDATE SET refs = refs + 1
+                """, ((digest, content) for _, _, blobs, _ in sessions for digest, content in blobs.items()))
+                if max_age is not None:
+                    cursor.execute("SELECT session_id FROM session_spill WHERE last_seen < ?", (now - max_age,))
+                    for (session_id,) in cursor.fetchall():
+                        self._drop_spilled(cursor, session_id)
+                conn.commit()
+        except Exception as e:
+            print(f"Failed to spill sessions: {e}")
+
+    def pop_session(self, session_id: str) -> Optional[tuple]:
+        """Removes a spilled session and returns (payload, blobs), or None if it was never spilled."""
+        if not self.enabled: return None
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT payload, blobs FROM session_spill WHERE session_id = ?", (session_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                payload, digests = row
+                digests = [d for d in digests.split(",") if d]
+                blobs: Dict[str, str] = {}
+                if digests:
+                    cursor.execute(f"SELECT digest, content FROM session_blobs WHERE digest IN ({','.join('?' * len(digests))})", digests)
+                    blobs = dict(cursor.fetchall())
+                self._drop_spilled(cursor, session_id)
+                conn.commit()
+                return payload, blobs
+        except Exception as e:
+            print(f"Failed to load spilled session: {e}")
+            return None
+
+    @staticmethod
+    def _drop_spilled(cursor: sqlite3.Cursor, session_id: str):
+        cursor.execute("SELECT blobs FROM session_spill WHERE session_id = ?", (session_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return
+        digests = [(d,) for d in row[0].split(",") if d]
+        cursor.executemany("UPDATE session_blobs SET refs = refs - 1 WHERE digest = ?", digests)
+        cursor.executemany("DELETE FROM session_blobs WHERE digest = ? AND refs <= 0", digests)
+        cursor.execute("DELETE FROM session_spill WHERE session_id = ?", (session_id,))
 
     def save_risk_snapshot(self, source: str, s: float, v: float, k: float, c: float, total: float, classification: str):
         if not self.enabled: return
@@ -282,3 +635,6 @@ class KnowledgeStore:
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (source, timestamp, s, v, k, c, total, classification))
             conn.commit()
+
+# M2 latency by method, exported on /metrics
+instrument_methods(KnowledgeStore)
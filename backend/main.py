@@ -1,11 +1,14 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, File, UploadFile, Response
+from fastapi.responses import FileResponse, PlainTextResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from core.engine import PrimersEngine
 from core.report_generator import SovereignReportGenerator
 from core.auth import authenticate, validate_token, require_permission, revoke_token
 from core.compliance import get_compliance_report
+from core.metrics import REGISTRY, QUEUE_DEPTH
+from core.profiler import profile_call
+from core.workers import EngineWorkerPool, PoolSaturated
 from fastapi import Header
 import os
 import uvicorn
@@ -16,6 +19,9 @@ except ImportError:
     psutil = None
 import sqlite3
 import tempfile
+import hashlib
+import secrets
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -34,6 +40,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Client-Id"],
 )
 
 engine = PrimersEngine()
@@ -47,6 +54,12 @@ async def startup_event():
     else:
         print("Vercel detected: Skipping auto-ingest.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # M1: keep live conversations across restarts
+    engine_pool.shutdown()
+    engine.sessions.spill_all()
+
 class ChatRequest(BaseModel):
     message: str
     mode: str = "default"
@@ -63,14 +76,67 @@ def read_root():
 async def compliance_status():
     return get_compliance_report()
 
+CLIENT_ID_HEADER = "X-Client-Id"
+
+def session_key(authorization: str = None, client_id: str = None) -> Tuple[str, Optional[str]]:
+    """
+    M1 session key for a request: the bearer token if one is sent, else the
+    X-Client-Id header. Tokens are hashed so they never become store keys.
+    Callers sending neither are issued a fresh client id (returned second,
+    None otherwise) and must send it back; no two callers share a session.
+    """
+    token = authorization.replace("Bearer ", "") if authorization else ""
+    if token:
+        return "tok:" + hashlib.sha256(token.encode()).hexdigest()[:32], None
+    if client_id:
+        return "cid:" + client_id[:128], None
+    issued = secrets.token_urlsafe(18)
+    return "cid:" + issued, issued
+
+def _with_client_id(payload: dict, response: Response, issued: Optional[str]) -> dict:
+    # A newly issued id goes back in a header and in the body; the client stores and resends it
+    if issued:
+        response.headers[CLIENT_ID_HEADER] = issued
+        payload["client_id"] = issued
+    return payload
+
+# Engine calls run here, off the event loop; saturation is answered with 429/503
+engine_pool = EngineWorkerPool.from_env()
+QUEUE_DEPTH.add_source(lambda: {("engine",): engine_pool.queue_depth()})
+
+async def run_engine(intent: str, fn, *args, **kwargs):
+    try:
+        return await engine_pool.run(intent, fn, *args, **kwargs)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+PROFILE_PREFIX = "profile:"
+
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
-    response_obj = engine.process(request.message, mode=request.mode)
-    # Convert dataclass to dict for JSON serialization
-    return {"response": response_obj.to_dict()}
+async def chat_endpoint(request: ChatRequest, response: Response, authorization: str = Header(None),
+                        x_client_id: str = Header(None), x_primers_profile: str = Header(None)):
+    message = request.message
+    # Opt-in profiling: 'X-Primers-Profile: 1' or a 'profile:' prefix, tier 3 only
+    wants_profile = (x_primers_profile or "").strip().lower() in ("1", "true", "yes")
+    if message.strip().lower().startswith(PROFILE_PREFIX):
+        message = message.strip()[len(PROFILE_PREFIX):].strip()
+        wants_profile = True
+    session_id, issued = session_key(authorization, x_client_id)
+    intent = engine.router.route(message).name
+    if not wants_profile:
+        response_obj = await run_engine(intent, engine.process, message, mode=request.mode, session_id=session_id)
+        # Convert dataclass to dict for JSON serialization
+        return _with_client_id({"response": response_obj.to_dict()}, response, issued)
+
+    token = authorization.replace("Bearer ", "") if authorization else ""
+    if not require_permission(token, "profile_requests"):
+        raise HTTPException(status_code=403, detail="INSUFFICIENT_CLEARANCE")
+    response_obj, report = await run_engine(intent, profile_call, engine.process, message, mode=request.mode, session_id=session_id)
+    return _with_client_id({"response": response_obj.to_dict(), "profile": report.to_dict()}, response, issued)
 
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(response: Response, file: UploadFile = File(...), authorization: str = Header(None),
+                      x_client_id: str = Header(None)):
     content = await file.read()
     try:
         content_str = content.decode("utf-8")
@@ -79,8 +145,9 @@ async def upload_file(file: UploadFile = File(...)):
 
     # Route to engine as a special "upload" command
     msg = f"upload file: {file.filename}\ncontent: {content_str}"
-    response_obj = engine.process(msg)
-    return {"response": response_obj.to_dict()}
+    session_id, issued = session_key(authorization, x_client_id)
+    response_obj = await run_engine("UPLOAD", engine.process, msg, session_id=session_id)
+    return _with_client_id({"response": response_obj.to_dict()}, response, issued)
 
 @app.post("/emergency/witness")
 async def emergency_witness(file: UploadFile = File(...)):
@@ -163,11 +230,53 @@ async def ingest_endpoint(request: IngestRequest):
              raise HTTPException(400, "Username required")
         
         # Route through the core engine process
-        response_obj = engine.process(f"learn from github {username}")
+        response_obj = await run_engine("KNOWLEDGE_ACQUISITION", engine.process, f"learn from github {username}")
         return {"status": "success", "response": response_obj.to_dict()}
     
     return {"status": "error", "message": "Unknown target"}
 
+def _blueprint(level: str, expand: Optional[str], top_k: int) -> dict:
+    return {
+        "level": level,
+        "expand": expand,
+        "top_k": top_k,
+        "blueprint": engine.repo_analyst.get_blueprint(level=level, expand=expand, top_k=top_k),
+        "clusters": engine.repo_analyst.get_blueprint_clusters(level)
+    }
+
+# Read-only views, but they aggregate the graph or page through M2, so they run
+# on the engine pool like everything else; no intent cap applies to them.
+@app.get("/blueprint")
+async def blueprint_endpoint(level: str = "package", expand: str = None, top_k: int = 40):
+    return await run_engine("BLUEPRINT", _blueprint, level, expand, top_k)
+
+@app.get("/analysis/{run_id}")
+async def analysis_run_endpoint(run_id: str, page: int = 1, page_size: int = 50, sort: str = "-complexity", filter: str = None):
+    try:
+        result = await run_engine("ANALYSIS_ROWS", engine.m2.get_analysis_rows, run_id, page=page, page_size=page_size, sort=sort, filter=filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Analysis run '{run_id}' not found")
+    return result
+
+@app.get("/duplicates")
+async def duplicates_endpoint(kind: str = "function", threshold: float = 0.8, limit: int = 50):
+    try:
+        clusters = await run_engine("FIND_DUPLICATES", engine.find_duplicates, kind=kind, threshold=threshold, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"kind": kind, "threshold": threshold, "clusters": clusters, "excluded_lexical": engine.clones.excluded()}
+
+@app.get("/compare")
+async def compare_endpoint(pattern: str, offset: int = 0, limit: int = 100, delta_k: int = 10):
+    return await run_engine("COMPARATIVE_REASONING", engine.rank_targets, pattern, offset=offset, limit=limit, delta_k=delta_k)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    # Prometheus text exposition; scraped, not polled by the UI
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/stats")
 async def get_stats():
     # Knowledge stats
@@ -218,7 +327,9 @@ async def get_stats():
         "intelligence_mode": "SOVEREIGN_CLOUD_HYBRID" if engine.model else "HYBRID_HEURISTIC",
         "health_score": health_score,
         "proactive_alert": proactive_alert,
-        "emergency_status": emergency_status
+        "emergency_status": emergency_status,
+        "sessions": engine.sessions.stats(),
+        "engine_pool": engine_pool.stats()
     }
 
 if __name__ == "__main__":
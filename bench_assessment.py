@@ -0,0 +1,40 @@
+import sys
+import os
+import argparse
+import time
+
+# Set up paths for the Sovereign Engine
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from cognition.baseline import CorpusBaseline
+from cognition.parallel import AssessmentExecutor, EXECUTOR_MODES
+from bench_interpretation import synthetic_corpus
+
+parser = argparse.ArgumentParser(description="Layer 2/3 (interpret + assess) executor benchmark")
+parser.add_argument("--files", type=int, default=100_000)
+parser.add_argument("--executor", choices=EXECUTOR_MODES + ("all",), default="all")
+parser.add_argument("--workers", type=int, default=os.cpu_count())
+parser.add_argument("--chunk-size", type=int, default=2000)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    corpus = synthetic_corpus(args.files)
+    tracker = CorpusBaseline()
+    for result in corpus:
+        tracker.add(result)
+    baseline = tracker.stats()
+
+    print(f"## LAYER 2/3 ASSESSMENT BENCHMARK ({args.files} files, {args.workers} workers) ##\n")
+    modes = EXECUTOR_MODES if args.executor == "all" else ("serial", args.executor)
+    reference, serial = None, None
+    for mode in dict.fromkeys(modes):
+        executor = AssessmentExecutor(mode, workers=args.workers, chunk_size=args.chunk_size)
+        start = time.perf_counter()
+        output = executor.assess(corpus, baseline)
+        elapsed = time.perf_counter() - start
+        executor.shutdown()
+
+        if reference is None:
+            reference, serial = output, elapsed
+        identical = "identical" if output == reference else "MISMATCH"
+        print(f"{mode:<8} {elapsed:.3f}s  ({serial / elapsed:.1f}x, {identical})")
@@ -0,0 +1,54 @@
+import sys
+import os
+import random
+import time
+
+# Set up paths for the Sovereign Engine
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from cognition.models import AnalysisResult, ClassInfo, FunctionInfo
+from cognition.heuristics import HeuristicEngine
+from cognition.baseline import CorpusBaseline
+
+def synthetic_file(rng: random.Random, i: int) -> AnalysisResult:
+    def fn(name: str) -> FunctionInfo:
+        return FunctionInfo(name, [], rng.random() < 0.6, False, [], int(rng.lognormvariate(1.0, 0.8)) + 1)
+    classes = [
+        ClassInfo(f"C{c}", [], [fn(f"m{m}") for m in range(int(rng.expovariate(1 / 6)))], True, [])
+        for c in range(rng.choice((0, 0, 1, 1, 2, 3)))
+    ]
+    return AnalysisResult(
+        source=f"pkg{i % 500}/mod{i}.py",
+        classes=classes,
+        functions=[fn(f"f{f}") for f in range(int(rng.expovariate(1 / 5)))],
+        imports=[f"dep{d}" for d in range(int(rng.expovariate(1 / 6)))],
+        loc=int(rng.lognormvariate(4.5, 1.0))
+    )
+
+def synthetic_corpus(files: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [synthetic_file(rng, i) for i in range(files)]
+
+if __name__ == "__main__":
+    FILES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    corpus = synthetic_corpus(FILES)
+    tracker = CorpusBaseline()
+    for result in corpus:
+        tracker.add(result)
+    baseline = tracker.stats()
+    engine = HeuristicEngine()
+
+    print(f"## LAYER 2 INTERPRETATION BENCHMARK ({FILES} files) ##\n")
+
+    start = time.perf_counter()
+    per_file = [engine.interpret(result, baseline) for result in corpus]
+    serial = time.perf_counter() - start
+    print(f"interpret (per file): {serial:.3f}s")
+
+    start = time.perf_counter()
+    batch = engine.interpret_batch(corpus, baseline)
+    vectorized = time.perf_counter() - start
+    print(f"interpret_batch:      {vectorized:.3f}s  ({serial / vectorized:.1f}x)")
+
+    mismatches = sum(1 for a, b in zip(per_file, batch) if a != b)
+    print(f"\nIdentical Interpretations: {'YES' if mismatches == 0 else f'NO ({mismatches} differ)'}")
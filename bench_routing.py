@@ -0,0 +1,44 @@
+import sys
+import os
+import time
+
+# Set up paths for the Sovereign Engine
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from core.intent import IntentRouter, CommandSpec, COMMAND_TABLE, Intent
+from test_routing import GOLDEN
+
+def padded_table(extra: int):
+    """The real table plus `extra` synthetic commands with their own keywords."""
+    synthetic = tuple(CommandSpec(f"cmd{i}", Intent.FALLBACK, when=((f"verb{i}", f"alias{i}*"), (f"noun{i}",)))
+                      for i in range(extra))
+    return COMMAND_TABLE + synthetic
+
+def substring_chain(table, text: str):
+    """Reference: the previous style of routing, one substring test per keyword in order."""
+    normalized = text.lower().strip()
+    for spec in table:
+        if spec.leading and any(normalized.startswith(lead) for lead in spec.leading):
+            return spec.intent
+        if spec.when and all(any(kw.rstrip("*") in normalized for kw in clause) for clause in spec.when):
+            return spec.intent
+    return Intent.FALLBACK
+
+def per_route(fn, inputs, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+if __name__ == "__main__":
+    ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    inputs = [text for text, _, _, _ in GOLDEN]
+    print(f"## ROUTING BENCHMARK ({len(inputs)} golden inputs x {ROUNDS}) ##\n")
+    print(f"{'commands':>9} {'compiled us/route':>18} {'substring us/route':>19}")
+    for extra in (0, 100, 1000, 10000):
+        table = padded_table(extra)
+        router = IntentRouter(table)
+        compiled = per_route(router.route, inputs, ROUNDS)
+        chained = per_route(lambda t: substring_chain(table, t), inputs, max(1, ROUNDS // (1 + extra // 50)))
+        print(f"{len(table):>9} {compiled:>18.2f} {chained:>19.2f}")
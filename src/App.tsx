@@ -41,6 +41,17 @@ interface Message {
 
 const API_URL = import.meta.env.PROD ? "/api" : "http://localhost:8000";
 
+// M1 session key for this browser: issued by the backend on the first call, sent back on every call after
+const CLIENT_ID_KEY = 'primers_client_id';
+const clientHeaders = (): Record<string, string> => {
+  const id = localStorage.getItem(CLIENT_ID_KEY);
+  return id ? { 'X-Client-Id': id } : {};
+};
+const rememberClientId = (res: Response) => {
+  const id = res.headers.get('X-Client-Id');
+  if (id) localStorage.setItem(CLIENT_ID_KEY, id);
+};
+
 const SUGGESTIONS = [
   { label: "Executive Insights", prompt: "show executive report" },
   { label: "Analyze codebase", prompt: "analyze corpus" },
@@ -170,8 +181,10 @@ function App() {
     try {
       const res = await fetch(`${API_URL}/upload`, {
         method: 'POST',
+        headers: clientHeaders(),
         body: formData,
       });
+      rememberClientId(res);
       const data = await res.json();
       const userMsg: Message = { id: Date.now().toString(), role: 'user', content: `Uploaded file: ${file.name}` };
       const aiMsg: Message = {
@@ -205,9 +218,10 @@ function App() {
     try {
       const res = await fetch(`${API_URL}/chat`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json', ...clientHeaders() },
         body: JSON.stringify({ message: textToSend })
       });
+      rememberClientId(res);
       const data = await res.json();
       const engineRes: EngineResponse = data.response;
 
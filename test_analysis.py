@@ -0,0 +1,200 @@
+
+import sys
+import os
+import glob
+from dataclasses import asdict
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.abspath("backend"))
+
+from cognition.analyst import RepoAnalyst, entity_name
+from cognition.analyzer import CodeAnalyzer
+from cognition.baseline import CorpusBaseline
+from cognition.cache import ResultCache
+from cognition.clones import CloneDetector
+from knowledge.store import KnowledgeStore
+
+def test_blast_radius_is_transitive():
+    analyst = RepoAnalyst()
+    analyst.analyze_chunk("from pkg.b import helper\n", "pkg/a.py")
+    analyst.analyze_chunk("from pkg.c import core\n", "pkg/b.py")
+    analyst.analyze_chunk("def core():\n    pass\n", "pkg/c.py")
+
+    assert analyst.get_blast_radius("pkg.c") == {"pkg/a.py", "pkg/b.py"}
+    assert analyst.get_blast_radius("pkg.b") == {"pkg/a.py"}
+    assert analyst.get_blast_radius("pkg.a") == frozenset()
+
+def test_blast_radius_cache_follows_new_dependents():
+    analyst = RepoAnalyst()
+    analyst.analyze_chunk("from pkg.c import core\n", "pkg/b.py")
+    assert analyst.get_blast_radius("pkg.c") == {"pkg/b.py"}
+    # A new importer of pkg.b extends the radius of pkg.c
+    analyst.analyze_chunk("from pkg.b import helper\n", "pkg/a.py")
+    assert analyst.get_blast_radius("pkg.c") == {"pkg/a.py", "pkg/b.py"}
+    analyst.graph.remove_source("pkg/b.py")
+    assert analyst.get_blast_radius("pkg.c") == frozenset()
+
+def test_blueprint_ranks_corpus_edges_before_external_ones():
+    analyst = RepoAnalyst()
+    for name in ("a", "b", "c"):
+        analyst.analyze_chunk("import numpy\nimport pandas\n", f"pkg/{name}.py")
+    analyst.analyze_chunk("from pkg.a import helper\n", "app/main.py")
+    blueprint = analyst.get_blueprint(level="package", top_k=1)
+    assert 'n_app["app"]' in blueprint and "n_app --> n_pkg" in blueprint
+    assert "numpy" not in blueprint and "2 lighter edges omitted" in blueprint
+
+def test_same_named_definitions_keep_their_own_nodes():
+    analyst = RepoAnalyst()
+    analyst.analyze_chunk("class Config:\n    pass\ndef load():\n    pass\n", "pkg/a.py")
+    analyst.analyze_chunk("class Config:\n    pass\ndef load():\n    pass\n", "pkg/b.py")
+    nodes = analyst.graph.nodes
+    assert nodes[entity_name("pkg/a.py", "Config")]["meta"]["source"] == "pkg/a.py"
+    assert nodes[entity_name("pkg/b.py", "Config")]["meta"]["source"] == "pkg/b.py"
+    # Re-analysing one file leaves the other file's definitions alone
+    analyst.analyze_chunk("x = 1\n", "pkg/a.py")
+    assert entity_name("pkg/a.py", "load") not in analyst.graph.nodes
+    assert analyst.graph.nodes[entity_name("pkg/b.py", "load")]["type"] == "function"
+
+def test_relative_imports_in_package_init_resolve_from_the_package():
+    analyzer = CodeAnalyzer()
+    content = "from . import store\nfrom .graph import build\nfrom .. import shared\n\ndef load():\n    store.open()\n    build()\n    shared.run()\n"
+    calls = {callee for _, callee in analyzer.analyze(content, "pkg/knowledge/__init__.py").calls}
+    assert calls == {"pkg.knowledge.store.open", "pkg.knowledge.graph.build", "pkg.shared.run"}
+    # The same imports in a plain module resolve from its parent package
+    calls = {callee for _, callee in analyzer.analyze(content, "pkg/knowledge/loader.py").calls}
+    assert calls == {"pkg.knowledge.store.open", "pkg.knowledge.graph.build", "pkg.shared.run"}
+
+def test_lexical_tier_matches_ast_on_repo_files():
+    analyzer = CodeAnalyzer()
+    paths = sorted(glob.glob(os.path.join("backend", "**", "*.py"), recursive=True))
+    assert paths
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        exact = analyzer.analyze(content, path, tier="ast")
+        lexical = analyzer.analyze(content, path, tier="lexical")
+        assert [asdict(f) for f in lexical.functions] == [asdict(f) for f in exact.functions], path
+        assert [asdict(c) for c in lexical.classes] == [asdict(c) for c in exact.classes], path
+        # Same import lines; the AST tier lists them in walk order rather than source order
+        assert sorted(lexical.imports) == sorted(exact.imports), path
+
+def test_tier_size_limit_counts_utf8_bytes():
+    analyzer = CodeAnalyzer(lexical_size=100)
+    ascii_doc = '"""' + "a" * 80 + '"""\n'
+    wide_doc = '"""' + "\u00e9" * 80 + '"""\n' # 87 characters, 167 bytes
+    assert analyzer.choose_tier("doc.py", ascii_doc) == "ast"
+    assert analyzer.choose_tier("doc.py", wide_doc) == "lexical"
+
+def test_lexical_args_stop_only_at_a_star_parameter():
+    analyzer = CodeAnalyzer()
+    content = ("def spill(self, max_bytes: int = 64 * 1024 * 1024, spill_after=2 ** 10, store=None, *rest, key=1):\n"
+               "    pass\n"
+               "def positional(a, b, /, c, *, d):\n"
+               "    pass\n"
+               "async def drain(queue):\n"
+               "    async for item in queue:\n"
+               "        if item:\n"
+               "            pass\n")
+    exact = analyzer.analyze(content, "star.py", tier="ast")
+    lexical = analyzer.analyze(content, "star.py", tier="lexical")
+    assert lexical.functions[0].args == ["self", "max_bytes", "spill_after", "store"]
+    assert [f.args for f in lexical.functions] == [f.args for f in exact.functions]
+    assert [f.complexity for f in lexical.functions] == [f.complexity for f in exact.functions]
+
+def test_clone_pairs_are_verified_beyond_the_bucket_representative():
+    detector = CloneDetector(num_perm=64, bands=16)
+    # b and c agree on 52 of 64 rows, but every band they share is also shared
+    # by a, which comes first and resembles neither
+    a = np.arange(1000, 1064, dtype=np.int64)
+    a[:16] = 7
+    b = np.arange(2000, 2064, dtype=np.int64)
+    b[:16] = 7
+    c = b.copy()
+    c[16::4] = -1 # spoil one row in each of the other 12 bands
+    detector._entries = {name: ("", [("function", name, sig)]) for name, sig in (("a.py", a), ("b.py", b), ("c.py", c))}
+    clusters = detector.find_clusters("function", threshold=0.8)
+    assert [[m["source"] for m in cluster["members"]] for cluster in clusters] == [["b.py", "c.py"]]
+    assert clusters[0]["similarity"] == round(52 / 64, 3)
+
+def test_clone_detection_skips_lexical_tier_files():
+    analyzer = CodeAnalyzer()
+    body = "def total(items):\n    result = 0\n    for item in items:\n        if item > 0:\n            result += item * 2\n        else:\n            result -= item\n    return result\n"
+    detector = CloneDetector()
+    detector.refresh([analyzer.analyze(body, name, tier="lexical") for name in ("a.py", "b.py")])
+    assert detector.excluded() == 2
+    assert detector.find_clusters("function") == []
+    # Same content re-analysed on the AST tier is fingerprinted
+    detector.refresh([analyzer.analyze(body, name, tier="ast") for name in ("a.py", "b.py")])
+    assert detector.excluded() == 0
+    assert [m["source"] for m in detector.find_clusters("function")[0]["members"]] == ["a.py", "b.py"]
+
+def test_repeat_analysis_stays_within_reasoning_depth():
+    from core.engine import PrimersEngine
+    engine = PrimersEngine()
+    assert engine.process("ingest backend/knowledge").intent == "ingestion"
+    # The second run finds an M2 baseline for the target, which adds a reasoning step
+    for _ in range(2):
+        response = engine.process("analyze paths.py")
+        assert response.intent == "analysis", response.content
+    assert response.meta["reused"] == response.meta["files"]
+
+def test_baseline_replace_is_idempotent():
+    analyzer = CodeAnalyzer()
+    results = []
+    for path in sorted(glob.glob(os.path.join("backend", "**", "*.py"), recursive=True)):
+        with open(path, encoding="utf-8") as f:
+            results.append(analyzer.analyze(f.read(), path))
+    # exact_limit=10 drives the t-digest path, the default the exact one
+    for baseline in (CorpusBaseline(), CorpusBaseline(exact_limit=10)):
+        for res in results:
+            baseline.add(res)
+        before = dict(baseline.stats())
+        for _ in range(5):
+            baseline.replace(results[0])
+            assert baseline.stats() == before
+        baseline.remove(results[0].source)
+        baseline.add(results[0])
+        assert baseline.stats() == before
+
+def test_import_limit_drift_only_recomputes_files_it_crosses():
+    analyzer = CodeAnalyzer()
+    few = analyzer.analyze("import os\n", "few.py")
+    many = analyzer.analyze("".join(f"import m{i}\n" for i in range(35)), "many.py")
+    cache = ResultCache()
+    computed = []
+    def compute(results, baseline):
+        computed.append([r.source for r in results])
+        return [(r.source, baseline["p90_imports"]) for r in results]
+    n = len(many.imports)
+    baseline = {"avg_complexity": 12.0, "p90_imports": n + 0.2}
+    cache.resolve([few, many], baseline, compute)
+    # The limit drops below many.py's import count: only many.py changes role
+    cache.resolve([few, many], dict(baseline, p90_imports=n - 0.4), compute)
+    cache.resolve([few, many], dict(baseline, p90_imports=n - 5.0), compute)
+    assert computed == [["few.py", "many.py"], ["many.py"]]
+
+def test_ingest_roots_survive_restart(tmp_path):
+    db_path = str(tmp_path / "knowledge.db")
+    store = KnowledgeStore(db_path=db_path)
+    store.save_ingest_root("/work/repo")
+    store.save_ingest_root("/work/repo/vendored")
+    store.save_ingest_root("/work/repo")
+    # A fresh store over the same file stands in for a restarted engine
+    assert sorted(KnowledgeStore(db_path=db_path).load_ingest_roots()) == ["/work/repo", "/work/repo/vendored"]
+
+if __name__ == "__main__":
+    test_blast_radius_is_transitive()
+    test_blast_radius_cache_follows_new_dependents()
+    test_blueprint_ranks_corpus_edges_before_external_ones()
+    test_same_named_definitions_keep_their_own_nodes()
+    test_relative_imports_in_package_init_resolve_from_the_package()
+    test_lexical_tier_matches_ast_on_repo_files()
+    test_tier_size_limit_counts_utf8_bytes()
+    test_lexical_args_stop_only_at_a_star_parameter()
+    test_clone_pairs_are_verified_beyond_the_bucket_representative()
+    test_clone_detection_skips_lexical_tier_files()
+    test_repeat_analysis_stays_within_reasoning_depth()
+    test_baseline_replace_is_idempotent()
+    test_import_limit_drift_only_recomputes_files_it_crosses()
+    print("analysis OK")
@@ -0,0 +1,49 @@
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.append(os.path.abspath("backend"))
+
+from core.memory import SessionStore
+from knowledge.store import KnowledgeStore
+
+def _spill_idle(store: SessionStore, session_id: str, idle: float):
+    session = store.get(session_id)
+    session.add_message("user", f"hello from {session_id}")
+    session.last_seen -= idle
+    store.get("other") # max_sessions=1 pushes the idle session out to M2
+
+def test_spilled_sessions_expire_ttl_after_last_seen(tmp_path):
+    m2 = KnowledgeStore(db_path=str(tmp_path / "knowledge.db"))
+    sessions = SessionStore(max_sessions=1, ttl=60.0, spill_after=60.0, store=m2)
+
+    _spill_idle(sessions, "recent", idle=30.0)
+    assert "recent" not in sessions
+    assert sessions.get("recent").get_messages() == [{"role": "user", "content": "hello from recent"}]
+
+    # Idle past the ttl before it was spilled: expired, not kept for another ttl
+    _spill_idle(sessions, "stale", idle=90.0)
+    rehydrated = sessions.stats()["rehydrated"]
+    assert sessions.get("stale").get_messages() == []
+    assert sessions.stats()["rehydrated"] == rehydrated
+
+def test_anonymous_callers_get_their_own_sessions():
+    from fastapi.testclient import TestClient
+    import main
+    client = TestClient(main.app)
+    first = client.post("/chat", json={"message": "hello"})
+    second = client.post("/chat", json={"message": "hello"})
+    issued = first.headers["X-Client-Id"]
+    assert issued and first.json()["client_id"] == issued
+    assert second.headers["X-Client-Id"] != issued
+    # A caller that sends its id back keeps it and is not issued another
+    again = client.post("/chat", json={"message": "hello"}, headers={"X-Client-Id": issued})
+    assert "X-Client-Id" not in again.headers and "client_id" not in again.json()
+    assert f"cid:{issued}" in main.engine.sessions
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_spilled_sessions_expire_ttl_after_last_seen(pathlib.Path(tempfile.mkdtemp()))
+    test_anonymous_callers_get_their_own_sessions()
+    print("memory OK")
@@ -0,0 +1,53 @@
+import sys
+import os
+import threading
+import time
+
+# Add current directory to path
+sys.path.append(os.path.abspath("backend"))
+
+from core import profiler
+from core.profiler import profile_call
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def _profiled_request():
+    time.sleep(0.05)
+    _busy(0.05)
+    return "done"
+
+def _other_request(stop):
+    while not stop.is_set():
+        _busy(0.001)
+
+def test_cumulative_time_matches_wall_time(tmp_path=None):
+    saved_dir = profiler.PROFILE_DIR
+    profiler.PROFILE_DIR = str(tmp_path) if tmp_path else saved_dir
+    # A concurrent busy thread must not leak into the profile
+    stop = threading.Event()
+    noise = threading.Thread(target=_other_request, args=(stop,), daemon=True)
+    noise.start()
+    try:
+        result, report = profile_call(_profiled_request, interval=0.001)
+    finally:
+        stop.set()
+        noise.join()
+        profiler.PROFILE_DIR = saved_dir
+
+    assert result == "done"
+    assert report.samples > 0
+    rows = {row["function"]: row for row in report.top_functions}
+    entry = rows["test_profiler.py:_profiled_request"]
+    assert abs(entry["cumulative_ms"] - report.wall_ms) <= 0.1 * report.wall_ms, (entry, report.wall_ms)
+    # The sleep is attributed to its Python caller, the busy loop to _busy
+    assert rows["test_profiler.py:_busy"]["cumulative_ms"] < entry["cumulative_ms"]
+    assert entry["self_samples"] > 0
+    assert not any("_other_request" in name for name in rows)
+    assert "test_profiler.py:_profiled_request;test_profiler.py:_busy" in report.collapsed
+
+if __name__ == "__main__":
+    test_cumulative_time_matches_wall_time()
+    print("profiler OK")
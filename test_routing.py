@@ -0,0 +1,72 @@
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.append(os.path.abspath("backend"))
+
+from core.intent import IntentRouter, Intent
+
+# Golden corpus: input -> (intent, command, expected args subset)
+GOLDEN = [
+    ("teach: sqlite is embedded", Intent.TEACHING, "teach", {"knowledge": "sqlite is embedded"}),
+    ("upload file: notes.md\ncontent: # Notes", Intent.UPLOAD, "upload", {"filename": "notes.md", "content": "# Notes"}),
+    ("ingest backend", Intent.INGESTION, "ingest", {"path": "backend", "tier": None}),
+    ("ingest cognition/analyzer.py --fast", Intent.INGESTION, "ingest", {"path": "cognition/analyzer.py", "tier": "lexical"}),
+    ("ingest vendored --full", Intent.INGESTION, "ingest", {"path": "vendored", "tier": "ast"}),
+    ("please ingest src", Intent.INGESTION, "ingest_any", {"path": "src"}),
+    ("hello", Intent.FALLBACK, "filler", {}),
+    ("hi, can you analyze corpus", Intent.EMPIRICAL_ANALYSIS, "analyze", {"target": "corpus"}),
+    ("how are you", Intent.FALLBACK, "filler", {}),
+    ("history of the project", Intent.FALLBACK, "fallback", {}),
+    ("callers of core.engine.PrimersEngine.process", Intent.CALL_GRAPH, "call_graph", {"symbol": "core.engine.PrimersEngine.process", "callees": False}),
+    ("callees of `module_name`?", Intent.CALL_GRAPH, "call_graph", {"symbol": "module_name", "callees": True}),
+    ("who calls build_index", Intent.CALL_GRAPH, "call_graph", {"symbol": "build_index", "callees": False}),
+    ("who calls?", Intent.CALL_GRAPH, "call_graph", {"symbol": "", "callees": False}),
+    ("who calls: build_index", Intent.CALL_GRAPH, "call_graph", {"symbol": "build_index", "callees": False}),
+    ("find duplicate files 0.9", Intent.FIND_DUPLICATES, "duplicates", {"kind": "file", "threshold": 0.9}),
+    ("show clones", Intent.FIND_DUPLICATES, "duplicates", {"kind": "function", "threshold": 0.8}),
+    ("compare core/engine.py vs cognition/comparator.py", Intent.COMPARATIVE_REASONING, "compare", {"a": "core/engine.py", "b": "cognition/comparator.py"}),
+    ("Core/Engine.py vs b.py", Intent.COMPARATIVE_REASONING, "compare", {"a": "Core/Engine.py", "b": "b.py"}),
+    ("compare cognition/*.py", Intent.COMPARATIVE_REASONING, "compare", {"pattern": "cognition/*.py"}),
+    ("draw the canvas layout", Intent.FALLBACK, "fallback", {}),
+    ("show blueprint directory expand core top 5", Intent.EMPIRICAL_ANALYSIS, "blueprint", {"level": "directory", "expand": "core", "top_k": 5}),
+    ("Show Blueprint File EXPAND MyPkg.Core", Intent.EMPIRICAL_ANALYSIS, "blueprint", {"level": "file", "expand": "MyPkg.Core", "top_k": 40}),
+    ("check health", Intent.VALIDATION, "health", {}),
+    ("show health", Intent.VALIDATION, "health", {}),
+    ("run a proactive audit", Intent.EMPIRICAL_ANALYSIS, "audit", {}),
+    ("plan refactor core/engine.py", Intent.PLANNING, "plan", {"target": "core/engine.py"}),
+    ("explain the refactor", Intent.EXPLANATION, "explain", {}),
+    ("apply refactor to core/engine.py", Intent.APPLY_REFACTOR, "apply", {"target": "core/engine.py"}),
+    ("apply refactor to planner.py", Intent.APPLY_REFACTOR, "apply", {"target": "planner.py"}),
+    ("analyze corpus", Intent.EMPIRICAL_ANALYSIS, "analyze", {"target": "corpus"}),
+    ("review core/guard.py", Intent.EMPIRICAL_ANALYSIS, "analyze", {"target": "core/guard.py"}),
+    ("why", Intent.EXPLANATION, "explain", {}),
+    ("validate the config", Intent.VALIDATION, "validate", {}),
+    ("sync ecosystem", Intent.KNOWLEDGE_ACQUISITION, "ecosystem_sync", {}),
+    ("learn from github octocat", Intent.KNOWLEDGE_ACQUISITION, "learn", {"username": "octocat"}),
+    ("learn patterns", Intent.KNOWLEDGE_ACQUISITION, "learn", {"username": ""}),
+    ("executive summary", Intent.EXECUTIVE_INSIGHTS, "executive", {}),
+    ("give me the cto report", Intent.EXECUTIVE_INSIGHTS, "executive", {}),
+    ("triage fire on floor 3", Intent.EMERGENCY_TRIAGE, "triage", {"report": "fire on floor 3"}),
+    ("rescue two hikers stranded", Intent.RESCUE_LOGIC, "rescue", {"situation": "two hikers stranded"}),
+    ("scan witness image", Intent.VISION_WITNESS, "witness", {}),
+    ("listen to voice channel", Intent.VOICE_GUARDIAN, "voice", {}),
+    ("tell me a story", Intent.FALLBACK, "fallback", {}),
+]
+
+def test_golden_routing():
+    router = IntentRouter()
+    for text, intent, name, args in GOLDEN:
+        command = router.parse(text)
+        assert (command.intent, command.name) == (intent, name), f"{text!r} -> {command.intent.name}/{command.name}"
+        for key, value in args.items():
+            assert command.args.get(key) == value, f"{text!r}: {key}={command.args.get(key)!r}, expected {value!r}"
+
+def test_route_returns_intent():
+    assert IntentRouter().route("plan refactor engine.py") == Intent.PLANNING
+
+if __name__ == "__main__":
+    test_golden_routing()
+    test_route_returns_intent()
+    print(f"{len(GOLDEN)} golden routes OK")